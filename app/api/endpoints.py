@@ -1,68 +1,308 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+import asyncio
+import math
+import random
+import time
+from functools import partial
+from fastapi import APIRouter, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import uuid
 from datetime import datetime
 
 from app.models.schemas import (
     OutfitRecommendationRequest,
+    OutfitPageRequest,
+    OutfitPage,
     Outfit,
+    FeedbackEvent,
+    CompleteLookRequest,
+    CompleteLookResponse,
+    SlotSuggestions,
+    OutfitCountRequest,
+    OutfitCountResponse,
+    WeeklyPlanRequest,
+    WeeklyPlanResponse,
+    PlannedDay,
+    PackingRequest,
+    PackingResponse,
+    SessionUpdate,
+    PrecomputeRegistration,
+    JobSubmitRequest,
+    JobInfo,
+    JobResultsPage,
+    SearchRequest,
+    SimilarItemsRequest,
+    SimilarItemsResponse,
+    SimilarItem,
+    SearchResponse,
+    SearchHit,
     UserInfo,
     OccasionInfo,
     ClothingItem
 )
 from app.core.engine import OutfitCurationEngine
+from app.core.fingerprint import inventory_key, request_fingerprint
+from app.core.cache import LRUCache
+from app.core.search import InvalidQuery, SearchIndex
+from app.core.planner import WeeklyPlanner
+from app.core.packing import PackingOptimizer
+from app.core.jobs import FINISHED, UNFINISHED, JobManager
+from app.core.session import StylingSession
+from app.core.precompute import PrecomputeScheduler, RecommendationCache, parse_window
+from app.core.singleflight import SingleFlight
+from app.core.admission import AdmissionController, Overloaded
+from app.core.pagination import InvalidCursor
+from app.core.shadow import create_shadow_runner
+from app.core.learned import LearnedScorer
+from app.core.feedback import PreferenceStore
+from app.core import config
+from app.core import tags as garment_tags
+from app.core.items import item_table
+from app.core.httpcache import matching_etag, parse_if_none_match, recommendation_etag, state_digest
+from app.core.serialization import NegotiatedRoute, encode_response
 
-router = APIRouter()
-engine = OutfitCurationEngine()
+# Bodies may be JSON or MessagePack on every route (see app.core.serialization)
+router = APIRouter(route_class=NegotiatedRoute)
+preferences = PreferenceStore(
+    log_path=config.FEEDBACK_LOG_PATH,
+    snapshot_path=config.FEEDBACK_SNAPSHOT_PATH,
+    learning_rate=config.FEEDBACK_LEARNING_RATE,
+    snapshot_every=config.FEEDBACK_SNAPSHOT_EVERY
+)
+engine = OutfitCurationEngine(
+    learned_scorer=LearnedScorer.load(config.SCORER_MODEL_PATH) if config.SCORER_MODEL_PATH else None,
+    learned_blend=config.SCORER_BLEND,
+    preference_store=preferences
+)
+coalescer = SingleFlight(default_timeout=config.COALESCE_TIMEOUT_SECONDS)
+admission = AdmissionController(
+    max_concurrency=config.ENGINE_MAX_CONCURRENCY,
+    max_queue=config.ENGINE_MAX_QUEUE,
+    degrade_queue_depth=config.ENGINE_DEGRADE_QUEUE_DEPTH,
+    retry_after_seconds=config.RETRY_AFTER_SECONDS
+)
+planner = WeeklyPlanner(engine)
+packer = PackingOptimizer(engine, time_limit=config.PACKING_TIME_LIMIT_SECONDS)
+shadow = create_shadow_runner(config.SHADOW_ENGINE, config.SHADOW_FRACTION, config.SHADOW_REPORT_PATH)
+search_indexes = LRUCache(maxsize=config.SEARCH_INDEX_CACHE_SIZE)
+recommendations = RecommendationCache(
+    maxsize=config.RECOMMENDATION_CACHE_SIZE,
+    ttl_seconds=config.RECOMMENDATION_CACHE_TTL_SECONDS,
+    # Feedback changes the weights and so makes the user's precomputed entries stale
+    scoring_state=lambda user_id: state_digest(preferences.weights(user_id))
+)
 
 import logging
 from pprint import pformat
 
 logger = logging.getLogger(__name__)
 
+def _filter_keeping_pins(request: OutfitRecommendationRequest) -> List[ClothingItem]:
+    """Filter the inventory, keeping pinned items the filters would drop"""
+    # Share garment attributes (and their tags) with every other wardrobe holding the same item
+    request.inventory = item_table.canonicalize(request.inventory)
+    garment_tags.ingest(request.inventory)
+    filtered_inventory = engine.filter_inventory(
+        inventory=request.inventory,
+        user_info=request.user_info,
+        occasion=request.occasion
+    )
+    if request.include_item_ids:
+        kept = {item.item_id for item in filtered_inventory}
+        missing = set(request.include_item_ids) - {item.item_id for item in request.inventory}
+        if missing:
+            raise ValueError(f"Included items not in inventory: {sorted(missing)}")
+        filtered_inventory += [
+            item for item in request.inventory
+            if item.item_id in request.include_item_ids and item.item_id not in kept
+        ]
+    return filtered_inventory
+
+def _substitute_pins(
+    request: OutfitRecommendationRequest,
+    filtered_inventory: List[ClothingItem]
+) -> Tuple[List[str], List[str], Dict[str, ClothingItem]]:
+    """Included and excluded item ids after swapping unavailable pins, and the swaps made"""
+    if not request.substitute_unavailable or not request.include_item_ids:
+        return request.include_item_ids, request.exclude_item_ids, {}
+    substitutions = engine.substitute_unavailable(
+        request.inventory, filtered_inventory, request.include_item_ids, request.exclude_item_ids
+    )
+    if substitutions:
+        swaps = {original: substitute.item_id for original, substitute in substitutions.items()}
+        logger.info(f"Substituted unavailable pinned items: {swaps}")
+    include = [substitutions[i].item_id if i in substitutions else i for i in request.include_item_ids]
+    # The replaced items must not come back through the ordinary pools
+    return include, request.exclude_item_ids + list(substitutions), substitutions
+
+def _note_substitutions(outfits: List[Outfit], substitutions: Dict[str, ClothingItem], inventory: List[ClothingItem]) -> None:
+    if not substitutions:
+        return
+    names = {item.item_id: item.name for item in inventory}
+    for outfit in outfits:
+        ids = {item.item_id for item in outfit.items}
+        notes = [
+            f"{substitute.name} stands in for {names[original]}, which is not clean"
+            for original, substitute in substitutions.items() if substitute.item_id in ids
+        ]
+        if notes:
+            outfit.style_notes = "; ".join(filter(None, [outfit.style_notes] + notes))
+
+def _run_recommendation(request: OutfitRecommendationRequest, degraded: bool = False) -> List[Outfit]:
+    """Run the filter + generate pipeline for one request (blocking).
+
+    In degraded mode the engine makes fewer attempts and skips complementary
+    items so an overloaded service still answers quickly.
+    """
+    return _run_recommendation_with_constraints(request, degraded)[0]
+
+def _run_recommendation_with_constraints(
+    request: OutfitRecommendationRequest,
+    degraded: bool = False
+) -> Tuple[List[Outfit], Dict[str, Any]]:
+    """``_run_recommendation`` plus the seed and item constraints the engine was given"""
+    # Log the occasion type and weather being used
+    logger.info(f"Processing request for occasion: {request.occasion.occasion_type}, weather: {request.occasion.weather}")
+    logger.debug(f"Occasion type: {type(request.occasion.occasion_type).__name__}, value: {request.occasion.occasion_type}")
+    logger.debug(f"Weather type: {type(request.occasion.weather).__name__}, value: {request.occasion.weather}")
+
+    # Log inventory items
+    logger.info(f"Received {len(request.inventory)} items in inventory")
+    for i, item in enumerate(request.inventory[:3]):  # Log first 3 items to avoid too much output
+        logger.debug(f"Item {i+1}: {item.item_id} ({item.item_type}) - Occasions: {item.occasion_suitability}, Weather: {item.weather_suitability}")
+
+    # Filter inventory based on user and occasion
+    filtered_inventory = _filter_keeping_pins(request)
+    include_item_ids, exclude_item_ids, substitutions = _substitute_pins(request, filtered_inventory)
+
+    logger.info(f"Filtered inventory has {len(filtered_inventory)} items")
+    for i, item in enumerate(filtered_inventory[:3]):  # Log first 3 filtered items
+        logger.debug(f"Filtered item {i+1}: {item.item_id} ({item.item_type})")
+
+    # Generate outfit recommendations
+    if degraded:
+        logger.warning("Generating outfits in degraded mode")
+    constraints = {
+        'include_item_ids': include_item_ids,
+        'exclude_item_ids': exclude_item_ids,
+        'exclude_worn_within_days': request.exclude_worn_within_days,
+        'diversity_weight': request.diversity_weight,
+        'seed': request.seed,
+    }
+    outfits = engine.generate_outfits(
+        filtered_inventory=filtered_inventory,
+        user_info=request.user_info,
+        occasion=request.occasion,
+        max_outfits=request.max_outfits,
+        consider_previous=request.consider_previous_outfits,
+        max_attempts=request.max_outfits * config.DEGRADED_ATTEMPTS_PER_OUTFIT if degraded else None,
+        include_complementary=not degraded,
+        **constraints
+    )
+    _note_substitutions(outfits, substitutions, request.inventory)
+
+    logger.info(f"Generated {len(outfits)} outfit recommendations")
+    return outfits, constraints
+
+async def _admit_and_run(
+    request: OutfitRecommendationRequest,
+    deadline: float
+) -> Tuple[List[Outfit], bool, Optional[int]]:
+    # The run replaces request.inventory with canonical items; shadow the request as received
+    received = request.model_copy()
+    started = time.perf_counter()
+    # The slot is held until the engine thread returns, even if the coalescer stops waiting for it
+    (outfits, constraints), ticket = await admission.run(
+        lambda ticket: _run_recommendation_with_constraints(request, ticket.degraded), deadline=deadline
+    )
+    elapsed = time.perf_counter() - started - ticket.queue_seconds
+    # Degraded runs are not representative of the primary engine
+    if shadow is not None and not ticket.degraded:
+        shadow.maybe_submit(received, outfits, elapsed, constraints)
+    return outfits, ticket.degraded, request.seed
+
+def _revalidate(request: OutfitRecommendationRequest, if_none_match: Optional[str]) -> Tuple[str, str, Optional[Response]]:
+    """Fingerprint and scoring state of a request, plus a 304 if the client's tagged copy is still valid.
+
+    The scoring state is the user's learned preference weights, so feedback
+    invalidates earlier tags.
+    """
+    fingerprint = request_fingerprint(request)
+    state = state_digest(preferences.weights(request.user_info.user_id))
+    tag = matching_etag(parse_if_none_match(if_none_match), fingerprint, state, seed=request.seed)
+    if tag is None:
+        return fingerprint, state, None
+    return fingerprint, state, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": f'"{tag}"'})
+
 @router.post("/recommend-outfits", response_model=List[Outfit])
-async def recommend_outfits(request: OutfitRecommendationRequest):
+async def recommend_outfits(
+    request: OutfitRecommendationRequest,
+    x_request_deadline_ms: Optional[int] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None)
+):
     """
     Generate outfit recommendations based on user info, occasion, and inventory.
+
+    Responses carry a strong ``ETag`` built from the request fingerprint, the
+    seed the outfits were sampled with and the user's scoring state. Sending
+    it back in ``If-None-Match`` with the same body returns 304 without running
+    the engine (the endpoint is a safe query, so it answers like a GET).
+
+    Identical requests that arrive while one is already being computed share
+    that computation instead of running the engine again. Under overload the
+    request is either served in degraded mode (``X-Degraded: true``) or
+    rejected with 503 and ``Retry-After``.
+
+    Bodies may be JSON or MessagePack (``Content-Type: application/msgpack``);
+    the response format follows ``Accept``.
     """
     try:
         logger.info("Received outfit recommendation request")
         logger.debug(f"Request data type: {type(request)}")
         logger.debug(f"Request model_dump: {request.model_dump()}")
-        
-        # Log the occasion type and weather being used
-        logger.info(f"Processing request for occasion: {request.occasion.occasion_type}, weather: {request.occasion.weather}")
-        logger.debug(f"Occasion type: {type(request.occasion.occasion_type).__name__}, value: {request.occasion.occasion_type}")
-        logger.debug(f"Weather type: {type(request.occasion.weather).__name__}, value: {request.occasion.weather}")
-        
-        # Log inventory items
-        logger.info(f"Received {len(request.inventory)} items in inventory")
-        for i, item in enumerate(request.inventory[:3]):  # Log first 3 items to avoid too much output
-            logger.debug(f"Item {i+1}: {item.item_id} ({item.item_type}) - Occasions: {item.occasion_suitability}, Weather: {item.weather_suitability}")
-        
-        # Filter inventory based on user and occasion
-        filtered_inventory = engine.filter_inventory(
-            inventory=request.inventory,
-            user_info=request.user_info,
-            occasion=request.occasion
+
+        deadline = config.REQUEST_DEADLINE_SECONDS
+        if x_request_deadline_ms is not None:
+            deadline = min(deadline, max(0, x_request_deadline_ms) / 1000)
+
+        key, state, not_modified = _revalidate(request, if_none_match)
+        if not_modified is not None:
+            return not_modified
+
+        precomputed = recommendations.lookup(request)
+        if precomputed is not None:
+            return encode_response(precomputed, List[Outfit], accept, headers={"X-Precomputed": "true"})
+
+        # Unseeded requests get a seed here so the response can be tagged; coalesced
+        # callers share the leader's outfits and therefore its seed
+        seeded = request if request.seed is not None else request.model_copy(update={"seed": random.getrandbits(32)})
+        outfits, degraded, seed = await coalescer.do(key, lambda: _admit_and_run(seeded, deadline))
+        if degraded:
+            # Degraded runs differ from what the seed normally yields
+            headers = {"X-Degraded": "true"}
+        else:
+            headers = {"ETag": f'"{recommendation_etag(key, seed, state)}"'}
+        return encode_response(outfits, List[Outfit], accept, headers=headers)
+
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service overloaded: {e.reason}",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
         )
-        
-        logger.info(f"Filtered inventory has {len(filtered_inventory)} items")
-        for i, item in enumerate(filtered_inventory[:3]):  # Log first 3 filtered items
-            logger.debug(f"Filtered item {i+1}: {item.item_id} ({item.item_type})")
-        
-        # Generate outfit recommendations
-        outfits = engine.generate_outfits(
-            filtered_inventory=filtered_inventory,
-            user_info=request.user_info,
-            occasion=request.occasion,
-            max_outfits=request.max_outfits,
-            consider_previous=request.consider_previous_outfits
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except asyncio.TimeoutError:
+        logger.error("Outfit recommendation timed out")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Outfit recommendation timed out"
         )
-        
-        logger.info(f"Generated {len(outfits)} outfit recommendations")
-        return outfits
-        
     except Exception as e:
         logger.error(f"Error in recommend_outfits: {str(e)}", exc_info=True)
         logger.error(f"Error type: {type(e).__name__}", exc_info=True)
@@ -80,23 +320,471 @@ async def recommend_outfits(request: OutfitRecommendationRequest):
             detail=error_detail
         )
 
+def _run_outfit_page(request: OutfitPageRequest) -> OutfitPage:
+    filtered_inventory = _filter_keeping_pins(request)
+    include_item_ids, exclude_item_ids, substitutions = _substitute_pins(request, filtered_inventory)
+    outfits, next_cursor, total = engine.generate_outfit_page(
+        filtered_inventory=filtered_inventory,
+        user_info=request.user_info,
+        occasion=request.occasion,
+        page_size=request.page_size,
+        cursor=request.cursor,
+        seed=request.seed,
+        include_item_ids=include_item_ids,
+        exclude_item_ids=exclude_item_ids,
+        exclude_worn_within_days=request.exclude_worn_within_days
+    )
+    _note_substitutions(outfits, substitutions, request.inventory)
+    return OutfitPage(outfits=outfits, next_cursor=next_cursor, total_combinations=total)
+
+@router.post("/recommend-outfits/page", response_model=OutfitPage)
+async def recommend_outfit_page(
+    request: OutfitPageRequest,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Page through outfit recommendations without repeats.
+
+    Send the same request with the returned ``next_cursor`` to get the next
+    page; the cursor is only valid for the same inventory and occasion.
+    Pages are tagged and revalidated like ``/recommend-outfits``.
+    """
+    try:
+        key, state, not_modified = _revalidate(request, if_none_match)
+        if not_modified is not None:
+            return not_modified
+        if request.cursor is None and request.seed is None:
+            request = request.model_copy(update={"seed": random.getrandbits(32)})
+        page, _ = await admission.run(lambda ticket: _run_outfit_page(request), deadline=config.REQUEST_DEADLINE_SECONDS)
+        # Later pages are fixed by their cursor, which the fingerprint covers
+        response.headers["ETag"] = f'"{recommendation_etag(key, request.seed or 0, state)}"'
+        return page
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service overloaded: {e.reason}",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+async def _admitted(work: Callable[[], Any]) -> Any:
+    """Run blocking engine work on an admission slot; 503 with Retry-After when shed"""
+    try:
+        result, _ = await admission.run(lambda ticket: work(), deadline=config.REQUEST_DEADLINE_SECONDS)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service overloaded: {e.reason}",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    return result
+
+@router.post("/complete-look", response_model=CompleteLookResponse)
+async def complete_look(request: CompleteLookRequest):
+    """
+    Suggest the best complementary items for each remaining slot around a
+    chosen anchor item, plus one complete outfit built from them.
+    """
+    try:
+        anchor, outfit, suggestions = await _admitted(partial(
+            engine.complete_look,
+            request.inventory,
+            request.user_info,
+            request.occasion,
+            request.anchor_item_id,
+            request.suggestions_per_slot,
+            request.inventory_version
+        ))
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Anchor item {request.anchor_item_id} not found in inventory"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    return CompleteLookResponse(
+        anchor=anchor,
+        outfit=outfit,
+        suggestions=[SlotSuggestions(item_type=t, items=items) for t, items in suggestions.items()]
+    )
+
+def _run_count(request: OutfitCountRequest) -> OutfitCountResponse:
+    filtered_inventory = engine.filter_inventory(
+        inventory=request.inventory,
+        user_info=request.user_info,
+        occasion=request.occasion
+    )
+    result = engine.count_valid_outfits(filtered_inventory, request.occasion, request.include_optional)
+    return OutfitCountResponse(**result)
+
+@router.post("/count-outfits", response_model=OutfitCountResponse)
+async def count_outfits(request: OutfitCountRequest):
+    """
+    Count the valid outfits for a user, occasion and weather without
+    generating them: exact for most wardrobes, otherwise an estimate with 95%
+    bounds. ``missing_types`` lists required slots the wardrobe cannot fill.
+    """
+    try:
+        return await _admitted(partial(_run_count, request))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in count_outfits: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"{type(e).__name__}: {str(e)}"
+        )
+
+def _run_plan(request: WeeklyPlanRequest) -> WeeklyPlanResponse:
+    result = planner.plan(
+        request.inventory,
+        request.user_info,
+        [(entry.day, entry.occasion) for entry in request.schedule],
+        max_uses_per_item=request.max_uses_per_item,
+        laundry_gap_days=request.laundry_gap_days,
+        exclude_item_ids=request.exclude_item_ids,
+        seed=request.seed
+    )
+    logger.info(f"Planned {result.planned} of {len(request.schedule)} days ({result.nodes} search nodes)")
+    return WeeklyPlanResponse(
+        days=[
+            PlannedDay(day=entry.day, label=entry.label, occasion=entry.occasion, outfit=outfit)
+            for entry, outfit in zip(request.schedule, result.outfits)
+        ],
+        planned=result.planned,
+        unplanned=len(request.schedule) - result.planned,
+        item_uses=result.item_uses()
+    )
+
+@router.post("/plan-week", response_model=WeeklyPlanResponse)
+async def plan_week(request: WeeklyPlanRequest):
+    """
+    Plan one outfit per schedule entry in a single call. Each item is worn at
+    most ``max_uses_per_item`` times and rests ``laundry_gap_days`` days
+    between wears; entries the wardrobe cannot cover come back with
+    ``outfit: null``.
+    """
+    try:
+        plan, _ = await admission.run(lambda ticket: _run_plan(request), deadline=config.REQUEST_DEADLINE_SECONDS)
+        return plan
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service overloaded: {e.reason}",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+def _run_packing(request: PackingRequest) -> PackingResponse:
+    time_limit = config.PACKING_TIME_LIMIT_SECONDS
+    if request.time_limit_ms is not None:
+        time_limit = min(time_limit, request.time_limit_ms / 1000.0)
+    result = packer.optimize(
+        request.inventory,
+        request.user_info,
+        [(entry.day, entry.occasion) for entry in request.itinerary],
+        time_limit=time_limit
+    )
+    logger.info(
+        f"Packed {len(result.items)} items for {len(request.itinerary)} days "
+        f"(greedy {result.greedy_size}, {result.elapsed * 1000:.1f} ms)"
+    )
+    return PackingResponse(
+        items=result.items,
+        days=[
+            PlannedDay(day=entry.day, label=entry.label, occasion=entry.occasion, outfit=outfit)
+            for entry, outfit in zip(request.itinerary, result.outfits)
+        ],
+        uncovered=[
+            f"{request.itinerary[day].day.isoformat()}:{slot.value}" for day, slot in result.uncovered
+        ],
+        greedy_size=result.greedy_size,
+        timed_out=result.timed_out,
+        elapsed_ms=round(result.elapsed * 1000.0, 2)
+    )
+
+@router.post("/pack", response_model=PackingResponse)
+async def pack(request: PackingRequest):
+    """
+    Smallest packing list that dresses every itinerary day, with the outfit
+    for each day drawn only from the packed items.
+    """
+    try:
+        packing, _ = await admission.run(lambda ticket: _run_packing(request), deadline=config.REQUEST_DEADLINE_SECONDS)
+        return packing
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service overloaded: {e.reason}",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+@router.post("/similar-items", response_model=SimilarItemsResponse)
+async def similar_items(request: SimilarItemsRequest):
+    """
+    Closest substitutes for an item (by type, name, color, material, style and
+    suitability), e.g. to replace something that is dirty or unavailable.
+    """
+    try:
+        item, matches = await _admitted(partial(
+            engine.similar_items,
+            request.inventory,
+            request.item_id,
+            request.k,
+            request.same_type,
+            request.clean_only,
+            request.inventory_version
+        ))
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item {request.item_id} not found in inventory"
+        )
+    return SimilarItemsResponse(
+        item=item,
+        similar=[SimilarItem(item=match, similarity=similarity) for match, similarity in matches]
+    )
+
+def _run_search(request: SearchRequest) -> SearchResponse:
+    index = search_indexes.get_or_build(
+        inventory_key(request.inventory, request.inventory_version), lambda: SearchIndex(request.inventory)
+    )
+    hits, total = index.search(request.query, request.offset, request.limit, request.match_all)
+    end = request.offset + len(hits)
+    return SearchResponse(
+        hits=[SearchHit(item=item, score=score) for item, score in hits],
+        total=total,
+        offset=request.offset,
+        next_offset=end if end < total else None
+    )
+
+@router.post("/search", response_model=SearchResponse)
+async def search_inventory(request: SearchRequest):
+    """
+    Ranked search over an inventory by name words, color, material, style,
+    brand, type and occasion/weather suitability. Supports AND/OR/NOT,
+    ``field:word`` and ``prefix*`` queries; page with ``offset``/``limit``.
+    """
+    try:
+        return await _admitted(partial(_run_search, request))
+    except InvalidQuery as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid query: {str(e)}"
+        )
+
+# Not admission-controlled: precompute runs off-peak on its own OUTFIT_PRECOMPUTE_WORKERS
+# threads, and its entries are retried on the next pass rather than shed.
+precompute = PrecomputeScheduler(
+    recommendations,
+    compute=_run_recommendation,
+    window=parse_window(config.PRECOMPUTE_WINDOW),
+    workers=config.PRECOMPUTE_WORKERS,
+    horizon_days=config.PRECOMPUTE_HORIZON_DAYS,
+    interval_seconds=config.PRECOMPUTE_INTERVAL_SECONDS,
+    registry_path=config.PRECOMPUTE_REGISTRY_PATH
+)
+
+@router.post("/precompute/schedule", tags=["precompute"])
+async def register_precompute(registration: PrecomputeRegistration):
+    """
+    Register a user's upcoming occasions. During the off-peak window their
+    recommendations are computed ahead of time, and matching requests are
+    served from the cache (``X-Precomputed: true``) while the inventory is
+    unchanged. Replaces any schedule registered before for the user.
+    """
+    template = OutfitRecommendationRequest(
+        user_info=registration.user_info,
+        occasion=registration.schedule[0].occasion,
+        inventory=registration.inventory,
+        max_outfits=registration.max_outfits,
+        consider_previous_outfits=registration.consider_previous_outfits,
+        diversity_weight=registration.diversity_weight
+    )
+    entries = await run_in_threadpool(
+        precompute.register, template, [(entry.day, entry.occasion) for entry in registration.schedule]
+    )
+    return {"user_id": registration.user_info.user_id, "entries": entries}
+
+@router.post("/precompute/run", tags=["precompute"])
+async def run_precompute():
+    """Precompute everything due now, outside the off-peak window (e.g. after a deploy)."""
+    computed = await run_in_threadpool(precompute.run_once)
+    return {"computed": computed}
+
+@router.websocket("/styling-session")
+async def styling_session(websocket: WebSocket):
+    """
+    Interactive styling over one WebSocket. The first message is
+    ``{"type": "start", "request": {...recommend-outfits body...}}``; later
+    messages are deltas (``{"type": "update", "weather": "rainy"}``,
+    ``{"type": "update", "exclude_item_ids": ["top1"]}``, ...). Every message
+    is answered with the current outfits, recomputing only what the delta
+    invalidated; bad messages get ``{"type": "error"}`` and the session stays
+    open.
+    """
+    await websocket.accept()
+    session: Optional[StylingSession] = None
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+                if not isinstance(message, dict):
+                    raise ValueError("Messages must be JSON objects")
+                if session is None:
+                    if message.get("type") != "start":
+                        raise ValueError("The first message must be {\"type\": \"start\", \"request\": {...}}")
+                    session = StylingSession(
+                        engine,
+                        OutfitRecommendationRequest.model_validate(message.get("request")),
+                        _filter_keeping_pins
+                    )
+                    work = session.refresh
+                elif message.get("type") == "start":
+                    raise ValueError("Session already started")
+                else:
+                    work = partial(session.apply, SessionUpdate.model_validate(message))
+                result, _ = await admission.run(lambda ticket: work(), deadline=config.REQUEST_DEADLINE_SECONDS)
+                await websocket.send_json(result.model_dump(mode="json"))
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+            except Overloaded as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": f"Service overloaded: {e.reason}",
+                    "retry_after": math.ceil(e.retry_after)
+                })
+    except WebSocketDisconnect:
+        logger.info(f"Styling session closed after {session.version if session else 0} updates")
+
+def _run_job_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """One line of a bulk job: a recommendation request in, its outfits out.
+
+    Not admission-controlled: job records already run on the runner's
+    ``OUTFIT_JOB_WORKERS`` threads, one record per thread at a time, and
+    shedding one would fail the record instead of delaying it.
+    """
+    request = OutfitRecommendationRequest.model_validate(record)
+    return {"outfits": [outfit.model_dump(mode="json") for outfit in _run_recommendation(request)]}
+
+jobs = JobManager(
+    root=config.JOBS_DIR,
+    handler=_run_job_record,
+    workers=config.JOB_WORKERS,
+    input_root=config.JOB_INPUT_ROOT
+)
+
+@router.post("/jobs", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED, tags=["jobs"])
+async def submit_job(request: JobSubmitRequest):
+    """
+    Queue bulk recommendation work: inline ``requests`` or a local JSONL file
+    (``input_path``) with one recommendation request per line. Poll
+    ``/jobs/{job_id}`` for progress.
+    """
+    records = None
+    if request.requests is not None:
+        records = [r.model_dump(mode="json") for r in request.requests]
+    try:
+        return await run_in_threadpool(jobs.submit, records, request.input_path)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+@router.get("/jobs", response_model=List[JobInfo], tags=["jobs"])
+async def list_jobs():
+    return jobs.list_jobs()
+
+@router.get("/jobs/{job_id}", response_model=JobInfo, tags=["jobs"])
+async def get_job(job_id: str):
+    try:
+        return jobs.info(job_id)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown job: {job_id}")
+
+@router.delete("/jobs/{job_id}", response_model=JobInfo, tags=["jobs"])
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; results written so far stay readable."""
+    try:
+        return jobs.cancel(job_id)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown job: {job_id}")
+
+@router.get("/jobs/{job_id}/results", response_model=JobResultsPage, tags=["jobs"])
+async def get_job_results(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """A page of results in input order, available while the job is still running."""
+    try:
+        results, job = await run_in_threadpool(jobs.results, job_id, offset, limit)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown job: {job_id}")
+    next_offset = offset + len(results)
+    if job.status in FINISHED and len(results) < limit:
+        next_offset = None
+    return JobResultsPage(job=job, results=results, offset=offset, next_offset=next_offset)
+
+@router.get("/jobs/{job_id}/results/stream", tags=["jobs"])
+async def stream_job_results(job_id: str, offset: int = Query(0, ge=0), follow: bool = True):
+    """
+    Results as newline-delimited JSON. With ``follow`` the stream stays open
+    and delivers new results until the job finishes.
+    """
+    try:
+        jobs.info(job_id)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown job: {job_id}")
+    return StreamingResponse(jobs.stream(job_id, offset, follow=follow), media_type="application/x-ndjson")
+
 @router.post("/filter-inventory", response_model=List[ClothingItem])
 async def filter_inventory(
     inventory: List[ClothingItem],
     user_info: UserInfo,
-    occasion: OccasionInfo
+    occasion: OccasionInfo,
+    accept: Optional[str] = Header(None)
 ):
     """
     Filter inventory based on user attributes and occasion.
     """
     try:
-        return engine.filter_inventory(inventory, user_info, occasion)
+        return encode_response(engine.filter_inventory(inventory, user_info, occasion), List[ClothingItem], accept)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error filtering inventory: {str(e)}"
         )
 
+@router.post("/feedback", status_code=status.HTTP_202_ACCEPTED, tags=["feedback"])
+async def submit_feedback(event: FeedbackEvent):
+    """
+    Record that a user liked, wore, skipped or disliked an outfit.
+
+    The user's preference weights are updated immediately and used by
+    subsequent recommendations.
+    """
+    try:
+        preferences.record(event)
+    except OSError as e:
+        logger.error(f"Could not record feedback: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Could not record feedback: {str(e)}"
+        )
+    return {"status": "accepted", "user_id": event.user_id, "event": event.event}
+
+@router.get("/users/{user_id}/preferences", tags=["feedback"])
+async def get_preferences(user_id: str):
+    """Preference weights learned from a user's feedback."""
+    return {"user_id": user_id, "weights": preferences.weights(user_id)}
+
 @router.get("/health", tags=["health"])
 async def health_check():
     """Health check endpoint."""
@@ -105,3 +793,19 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat(),
         "version": "1.0.0"
     }
+
+@router.get("/metrics", tags=["health"])
+async def metrics():
+    """Runtime counters for the recommendation pipeline."""
+    return {
+        "coalescing": coalescer.stats(),
+        "admission": admission.stats(),
+        "shadow": shadow.stats() if shadow is not None else None,
+        "feedback": preferences.stats(),
+        "search_indexes": search_indexes.stats(),
+        "item_table": item_table.stats(),
+        "jobs": jobs.stats(),
+        "recommendation_cache": recommendations.stats(),
+        "precompute": precompute.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
@@ -0,0 +1,149 @@
+"""Admission control and load shedding for engine work.
+
+At most ``max_concurrency`` engine runs execute at once. Up to ``max_queue``
+further requests wait for a slot; anything beyond that, or anything whose
+deadline expires while queued, is shed with :class:`Overloaded`. Requests
+admitted while the queue is at least ``degrade_queue_depth`` deep are flagged
+as degraded so the caller can run a cheaper pipeline.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class Overloaded(Exception):
+    """Raised when a request is rejected by admission control"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class Ticket:
+    degraded: bool
+    queue_seconds: float
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        degrade_queue_depth: Optional[int] = None,
+        retry_after_seconds: float = 1.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.degrade_queue_depth = degrade_queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._active = 0
+        self._waiting = 0
+        self._stats = {
+            'admitted': 0,
+            'shed_queue_full': 0,
+            'shed_deadline': 0,
+            'degraded': 0,
+            'queue_seconds_total': 0.0,
+            'queue_seconds_max': 0.0,
+        }
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _acquire(self, deadline: Optional[float]) -> Ticket:
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self._waiting >= self.max_queue:
+            self._stats['shed_queue_full'] += 1
+            logger.warning(f"Shedding request: queue full ({self._waiting} waiting, {self._active} active)")
+            raise Overloaded("queue full", self.retry_after_seconds)
+
+        degraded = self.degrade_queue_depth is not None and self._waiting >= self.degrade_queue_depth
+        started = time.perf_counter()
+        if not semaphore.locked():
+            # Free slot: acquire() completes without suspending
+            await semaphore.acquire()
+        else:
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), deadline)
+            except asyncio.TimeoutError:
+                self._stats['shed_deadline'] += 1
+                logger.warning(f"Shedding request: deadline of {deadline}s expired while queued")
+                raise Overloaded("deadline exceeded while queued", self.retry_after_seconds)
+            finally:
+                self._waiting -= 1
+
+        queue_seconds = time.perf_counter() - started
+        self._active += 1
+        self._stats['admitted'] += 1
+        self._stats['queue_seconds_total'] += queue_seconds
+        self._stats['queue_seconds_max'] = max(self._stats['queue_seconds_max'], queue_seconds)
+        if degraded:
+            self._stats['degraded'] += 1
+        return Ticket(degraded=degraded, queue_seconds=queue_seconds)
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None) -> AsyncIterator[Ticket]:
+        """Hold an engine slot for the duration of the block.
+
+        ``deadline`` is the number of seconds this request is willing to wait
+        in the queue before being shed.
+        """
+        ticket = await self._acquire(deadline)
+        try:
+            yield ticket
+        finally:
+            self._release()
+
+    async def run(self, fn: Callable[[Ticket], T], deadline: Optional[float] = None) -> Tuple[T, Ticket]:
+        """Run blocking ``fn(ticket)`` in the threadpool on an engine slot.
+
+        Threads cannot be interrupted, so the slot is released when ``fn``
+        returns, not when the caller stops waiting: a caller cancelled by a
+        timeout leaves the slot held until the engine is actually done.
+        """
+        ticket = await self._acquire(deadline)
+        try:
+            work = asyncio.ensure_future(run_in_threadpool(fn, ticket))
+        except BaseException:
+            self._release()
+            raise
+        work.add_done_callback(self._finished)
+        return await asyncio.shield(work), ticket
+
+    def _finished(self, work: asyncio.Future) -> None:
+        self._release()
+        if not work.cancelled():
+            # Retrieved here too, so a failure nobody waits for any more is not reported as unhandled
+            work.exception()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of admission counters"""
+        admitted = self._stats['admitted']
+        return {
+            **self._stats,
+            'queue_seconds_avg': self._stats['queue_seconds_total'] / admitted if admitted else 0.0,
+            'active': self._active,
+            'waiting': self._waiting,
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+        }
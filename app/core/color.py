@@ -0,0 +1,214 @@
+"""Color harmony scoring with a precomputed palette table.
+
+Every known color name is mapped to a hue (``None`` for neutrals), a lightness
+and a saturation. Pairwise compatibility for all known colors is computed once
+into an N x N table, so scoring an outfit palette is a handful of table
+lookups and scoring many palettes at once is a single NumPy gather.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# name -> (hue in degrees or None for neutrals, lightness 0-1, saturation 0-1)
+COLOR_PROPERTIES: Dict[str, Tuple[Optional[float], float, float]] = {
+    'black': (None, 0.05, 0.0),
+    'charcoal': (None, 0.25, 0.0),
+    'gray': (None, 0.5, 0.0),
+    'silver': (None, 0.75, 0.0),
+    'white': (None, 0.97, 0.0),
+    'ivory': (None, 0.93, 0.1),
+    'cream': (None, 0.9, 0.15),
+    'beige': (None, 0.8, 0.2),
+    'khaki': (None, 0.65, 0.25),
+    'tan': (None, 0.6, 0.3),
+    'camel': (None, 0.55, 0.35),
+    'brown': (None, 0.3, 0.4),
+    'navy': (None, 0.2, 0.5),
+    'denim': (None, 0.4, 0.35),
+    'red': (0.0, 0.5, 0.9),
+    'burgundy': (345.0, 0.25, 0.6),
+    'maroon': (0.0, 0.25, 0.6),
+    'pink': (340.0, 0.8, 0.6),
+    'rose': (330.0, 0.65, 0.5),
+    'coral': (16.0, 0.65, 0.8),
+    'orange': (30.0, 0.5, 0.9),
+    'rust': (20.0, 0.4, 0.6),
+    'mustard': (48.0, 0.5, 0.7),
+    'gold': (45.0, 0.55, 0.8),
+    'yellow': (60.0, 0.55, 0.9),
+    'olive': (75.0, 0.35, 0.5),
+    'green': (120.0, 0.4, 0.7),
+    'mint': (150.0, 0.8, 0.4),
+    'emerald': (140.0, 0.4, 0.7),
+    'teal': (180.0, 0.35, 0.6),
+    'turquoise': (175.0, 0.55, 0.7),
+    'light_blue': (205.0, 0.8, 0.5),
+    'sky_blue': (200.0, 0.7, 0.6),
+    'blue': (220.0, 0.45, 0.8),
+    'cobalt': (215.0, 0.4, 0.9),
+    'purple': (280.0, 0.4, 0.6),
+    'lavender': (270.0, 0.8, 0.4),
+    'violet': (275.0, 0.5, 0.7),
+    'magenta': (300.0, 0.5, 0.9),
+}
+
+COLOR_ALIASES = {
+    'grey': 'gray',
+    'lightblue': 'light_blue',
+    'baby_blue': 'light_blue',
+    'skyblue': 'sky_blue',
+    'dark_blue': 'navy',
+    'navy_blue': 'navy',
+    'off_white': 'ivory',
+    'wine': 'burgundy',
+    'dark_green': 'emerald',
+    'forest_green': 'emerald',
+    'light_gray': 'silver',
+    'light_grey': 'silver',
+    'dark_gray': 'charcoal',
+    'dark_grey': 'charcoal',
+    'blush': 'pink',
+    'nude': 'beige',
+    'sand': 'beige',
+    'chocolate': 'brown',
+    'indigo': 'denim',
+}
+
+UNKNOWN = '__unknown__'
+
+NEUTRAL_SCORE = 0.9
+MONOCHROMATIC_SCORE = 0.85
+ANALOGOUS_SCORE = 0.8
+COMPLEMENTARY_SCORE = 0.75
+NAMED_COMPLEMENTARY_SCORE = 0.8
+TRIADIC_SCORE = 0.6
+CLASH_SCORE = 0.3
+UNKNOWN_SCORE = 0.6
+# Palettes scoring below this are rejected as clashing
+HARMONY_THRESHOLD = 0.45
+MAX_DISTINCT_COLORS = 4
+
+
+@lru_cache(maxsize=4096)
+def normalize_color(name: str) -> str:
+    """Map a free-form color name onto a known palette entry (or ``UNKNOWN``)"""
+    key = (name or '').strip().lower().replace('-', '_').replace(' ', '_')
+    key = COLOR_ALIASES.get(key, key)
+    if key in COLOR_PROPERTIES:
+        return key
+    # "dark green", "pale pink": fall back to the last known word
+    for token in reversed(key.split('_')):
+        token = COLOR_ALIASES.get(token, token)
+        if token in COLOR_PROPERTIES:
+            return token
+    return UNKNOWN
+
+
+def _hue_distance(a: float, b: float) -> float:
+    d = abs(a - b) % 360
+    return min(d, 360 - d)
+
+
+class ColorHarmony:
+    def __init__(self, color_rules: Optional[Dict] = None):
+        color_rules = color_rules or {}
+        self.names: List[str] = list(COLOR_PROPERTIES) + [UNKNOWN]
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.unknown_index = self.index[UNKNOWN]
+        self._named_complementary = {
+            frozenset(pair) for pair in color_rules.get('complementary', [])
+        }
+        # 'analogous' counts adjacent steps on a 12-step (30 degree) color wheel
+        self._analogous_span = 30.0 * max(1, color_rules.get('analogous', 3) - 1)
+        self._monochromatic = color_rules.get('monochromatic', True)
+        self.table = self._build_table()
+
+    def _pair_score(self, a: str, b: str) -> float:
+        if UNKNOWN in (a, b):
+            return UNKNOWN_SCORE
+        if a == b:
+            return 1.0
+        if frozenset((a, b)) in self._named_complementary:
+            return NAMED_COMPLEMENTARY_SCORE
+        hue_a, light_a, sat_a = COLOR_PROPERTIES[a]
+        hue_b, light_b, sat_b = COLOR_PROPERTIES[b]
+        if hue_a is None or hue_b is None:
+            return NEUTRAL_SCORE
+        distance = _hue_distance(hue_a, hue_b)
+        if distance <= 15:
+            # Same hue family reads as a tonal look only with enough lightness contrast
+            if self._monochromatic and abs(light_a - light_b) >= 0.2:
+                return MONOCHROMATIC_SCORE
+            return ANALOGOUS_SCORE - 0.1
+        if distance <= self._analogous_span:
+            return ANALOGOUS_SCORE
+        if distance >= 150:
+            return COMPLEMENTARY_SCORE
+        if abs(distance - 120) <= 15:
+            return TRIADIC_SCORE
+        # Two saturated, unrelated hues clash hardest; muted ones less so
+        return CLASH_SCORE + 0.3 * (1.0 - min(sat_a, sat_b))
+
+    def _build_table(self) -> np.ndarray:
+        size = len(self.names)
+        table = np.empty((size, size), dtype=np.float32)
+        for i, a in enumerate(self.names):
+            for j, b in enumerate(self.names):
+                table[i, j] = self._pair_score(a, b)
+        return table
+
+    def indices(self, colors: Iterable[str]) -> List[int]:
+        """Distinct palette indices for an outfit's colors"""
+        seen = {}
+        for color in colors:
+            key = normalize_color(color)
+            # Distinct unknown names are still distinct colors
+            if key == UNKNOWN:
+                key = (color or '').strip().lower()
+                seen.setdefault(key, self.unknown_index)
+            else:
+                seen.setdefault(key, self.index[key])
+        return list(seen.values())
+
+    def palette_score(self, colors: Sequence[str]) -> float:
+        """Harmony of a palette in [0, 1]: mean pairwise score pulled toward the worst pair"""
+        idx = self.indices(colors)
+        if len(idx) < 2:
+            return 1.0
+        pair_scores = self.table[np.ix_(idx, idx)][np.triu_indices(len(idx), k=1)]
+        return float(0.5 * pair_scores.mean() + 0.5 * pair_scores.min())
+
+    def is_harmonious(self, colors: Sequence[str]) -> bool:
+        idx = self.indices(colors)
+        if len(idx) > MAX_DISTINCT_COLORS:
+            return False
+        return self.palette_score(colors) >= HARMONY_THRESHOLD
+
+    def index_matrix(self, palettes: Sequence[Sequence[str]]) -> np.ndarray:
+        """Pack palettes into an (M, K) index matrix padded with -1"""
+        rows = [self.indices(colors) for colors in palettes]
+        width = max((len(r) for r in rows), default=0)
+        matrix = np.full((len(rows), max(width, 1)), -1, dtype=np.int32)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = row
+        return matrix
+
+    def score_palettes(self, index_matrix: np.ndarray) -> np.ndarray:
+        """Vectorized ``palette_score`` for every row of an index matrix"""
+        m, k = index_matrix.shape
+        if k < 2:
+            return np.ones(m, dtype=np.float32)
+        i, j = np.triu_indices(k, k=1)
+        left, right = index_matrix[:, i], index_matrix[:, j]
+        valid = (left >= 0) & (right >= 0)
+        pair_scores = self.table[np.maximum(left, 0), np.maximum(right, 0)]
+        counts = valid.sum(axis=1)
+        means = np.where(valid, pair_scores, 0.0).sum(axis=1) / np.maximum(counts, 1)
+        mins = np.where(valid, pair_scores, 1.0).min(axis=1)
+        return np.where(counts > 0, 0.5 * means + 0.5 * mins, 1.0).astype(np.float32)
+
+    def harmonious_mask(self, index_matrix: np.ndarray) -> np.ndarray:
+        """Vectorized ``is_harmonious`` for every row of an index matrix"""
+        distinct = (index_matrix >= 0).sum(axis=1)
+        return (distinct <= MAX_DISTINCT_COLORS) & (self.score_palettes(index_matrix) >= HARMONY_THRESHOLD)
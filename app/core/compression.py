@@ -0,0 +1,146 @@
+"""Negotiated response compression (brotli when installed, else gzip).
+
+Outfit responses repeat the same item JSON many times and shrink by an order
+of magnitude. Bodies under ``minimum_size`` are sent as is. Streamed bodies
+(NDJSON job results) are flushed chunk by chunk, so a following client still
+sees each line as it is produced. Strong ETags get an encoding suffix
+(``"tag-gzip"``) because the compressed bytes differ from the identity ones;
+``app.core.httpcache.parse_if_none_match`` strips it again.
+"""
+import zlib
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+ENCODING_ETAG_SUFFIXES = ('-br', '-gzip')
+# Formats that are already compressed
+INCOMPRESSIBLE_PREFIXES = ('image/', 'video/', 'audio/', 'application/zip', 'application/gzip', 'font/woff')
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._b = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._b.process(data)
+        return out + (self._b.finish() if final else self._b.flush())
+
+
+def negotiate(accept_encoding: str, available) -> Optional[str]:
+    """Best of ``available`` (in server preference order) the client accepts"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    wildcard = accepted.get('*', 0.0)
+    for coding in available:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders: Dict[str, Callable[[], object]] = {}
+        if brotli is not None:
+            self.encoders['br'] = lambda: _BrotliEncoder(brotli_quality)
+        self.encoders['gzip'] = lambda: _GzipEncoder(gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get('accept-encoding', ''), self.encoders)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self, coding)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, coding: str):
+        self.app = middleware.app
+        self.minimum_size = middleware.minimum_size
+        self.coding = coding
+        self.new_encoder = middleware.encoders[coding]
+        self.send: Optional[Send] = None
+        self.start: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self._send)
+
+    def _compressible(self, headers: Headers) -> bool:
+        if 'content-encoding' in headers or 'no-transform' in headers.get('cache-control', ''):
+            return False
+        return not headers.get('content-type', '').startswith(INCOMPRESSIBLE_PREFIXES)
+
+    def _set_headers(self, headers: MutableHeaders) -> None:
+        headers['Content-Encoding'] = self.coding
+        headers.add_vary_header('Accept-Encoding')
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/') and etag.endswith('"'):
+            headers['ETag'] = f'{etag[:-1]}-{self.coding}"'
+
+    async def _send(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            self.start = message
+            headers = Headers(raw=message['headers'])
+            self.passthrough = message['status'] in (204, 304) or not self._compressible(headers)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start['headers'])
+            if not more_body and len(body) < self.minimum_size:
+                # Too small to be worth it; still vary, as larger bodies of this resource may be compressed
+                headers.add_vary_header('Accept-Encoding')
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self._set_headers(headers)
+            self.encoder = self.new_encoder()
+            body = self.encoder.compress(body, final=not more_body)
+            if more_body:
+                del headers['Content-Length']
+            else:
+                headers['Content-Length'] = str(len(body))
+            await self.send(start)
+        else:
+            body = self.encoder.compress(body, final=not more_body)
+        await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
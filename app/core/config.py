@@ -0,0 +1,82 @@
+"""Runtime settings read from the environment (a ``.env`` file works too)."""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+# Request coalescing: how long the shared engine run may take before every
+# coalesced caller gets a 504.
+COALESCE_TIMEOUT_SECONDS = _float('OUTFIT_COALESCE_TIMEOUT_SECONDS', 30.0)
+
+# Admission control around the engine: concurrent runs, bounded wait queue,
+# and the queue depth from which admitted requests run in degraded mode.
+ENGINE_MAX_CONCURRENCY = _int('OUTFIT_ENGINE_MAX_CONCURRENCY', os.cpu_count() or 4)
+ENGINE_MAX_QUEUE = _int('OUTFIT_ENGINE_MAX_QUEUE', 64)
+ENGINE_DEGRADE_QUEUE_DEPTH = _int('OUTFIT_ENGINE_DEGRADE_QUEUE_DEPTH', 16)
+# Default time a request may wait for an engine slot; clients can lower it
+# per request with the X-Request-Deadline-Ms header.
+REQUEST_DEADLINE_SECONDS = _float('OUTFIT_REQUEST_DEADLINE_SECONDS', 10.0)
+RETRY_AFTER_SECONDS = _float('OUTFIT_RETRY_AFTER_SECONDS', 2.0)
+# Degraded mode: attempts per requested outfit, no complementary items
+DEGRADED_ATTEMPTS_PER_OUTFIT = _int('OUTFIT_DEGRADED_ATTEMPTS_PER_OUTFIT', 2)
+
+# Shadow mode: replay a fraction of requests through a candidate engine
+# ("package.module:ClassName") off the response path and log comparisons.
+SHADOW_ENGINE = os.getenv('OUTFIT_SHADOW_ENGINE')
+SHADOW_FRACTION = _float('OUTFIT_SHADOW_FRACTION', 0.0)
+SHADOW_REPORT_PATH = os.getenv('OUTFIT_SHADOW_REPORT_PATH', 'shadow_report.jsonl')
+
+# Learned scorer (see app.core.train_scorer); blend 1.0 replaces the heuristic
+SCORER_MODEL_PATH = os.getenv('OUTFIT_SCORER_MODEL_PATH')
+SCORER_BLEND = _float('OUTFIT_SCORER_BLEND', 0.5)
+
+# Feedback log and the weight snapshot that lets restarts skip most of it
+FEEDBACK_LOG_PATH = os.getenv('OUTFIT_FEEDBACK_LOG_PATH', 'feedback_events.jsonl')
+FEEDBACK_SNAPSHOT_PATH = os.getenv('OUTFIT_FEEDBACK_SNAPSHOT_PATH', 'feedback_weights.json')
+FEEDBACK_LEARNING_RATE = _float('OUTFIT_FEEDBACK_LEARNING_RATE', 0.1)
+FEEDBACK_SNAPSHOT_EVERY = _int('OUTFIT_FEEDBACK_SNAPSHOT_EVERY', 1000)
+
+# Search: inverted indexes kept for recently seen inventories
+SEARCH_INDEX_CACHE_SIZE = _int('OUTFIT_SEARCH_INDEX_CACHE_SIZE', 8)
+
+# Image ingestion (python -m app.core.images): analysis cache, thumbnails, worker processes
+IMAGE_CACHE_DIR = os.getenv('OUTFIT_IMAGE_CACHE_DIR', '.image_cache')
+THUMBNAIL_DIR = os.getenv('OUTFIT_THUMBNAIL_DIR', 'thumbnails')
+IMAGE_WORKERS = _int('OUTFIT_IMAGE_WORKERS', os.cpu_count() or 4)
+
+# Packing optimizer: upper bound on the local-search phase per request
+PACKING_TIME_LIMIT_SECONDS = _float('OUTFIT_PACKING_TIME_LIMIT_SECONDS', 2.0)
+
+# Background jobs: state directory, worker threads, and the directory input_path
+# files are read from (unset disables input_path; it must not hold service state)
+JOBS_DIR = os.getenv('OUTFIT_JOBS_DIR', 'jobs')
+JOB_WORKERS = _int('OUTFIT_JOB_WORKERS', 2)
+JOB_INPUT_ROOT = os.getenv('OUTFIT_JOB_INPUT_ROOT')
+
+# Off-peak precompute (local time window, may wrap past midnight) and the cache it fills
+PRECOMPUTE_WINDOW = os.getenv('OUTFIT_PRECOMPUTE_WINDOW', '01:00-05:00')
+PRECOMPUTE_WORKERS = _int('OUTFIT_PRECOMPUTE_WORKERS', 2)
+PRECOMPUTE_HORIZON_DAYS = _int('OUTFIT_PRECOMPUTE_HORIZON_DAYS', 1)
+PRECOMPUTE_INTERVAL_SECONDS = _float('OUTFIT_PRECOMPUTE_INTERVAL_SECONDS', 300.0)
+PRECOMPUTE_REGISTRY_PATH = os.getenv('OUTFIT_PRECOMPUTE_REGISTRY_PATH', 'precompute_registry.json')
+RECOMMENDATION_CACHE_SIZE = _int('OUTFIT_RECOMMENDATION_CACHE_SIZE', 10000)
+RECOMMENDATION_CACHE_TTL_SECONDS = _float('OUTFIT_RECOMMENDATION_CACHE_TTL_SECONDS', 36 * 3600.0)
+
+# Shared item table: garments kept for reuse beyond those held by registered wardrobes
+ITEM_TABLE_SIZE = _int('OUTFIT_ITEM_TABLE_SIZE', 100000)
+
+# Response compression: smallest body worth compressing, gzip level and brotli
+# quality (brotli is used when the package is installed and the client accepts it)
+COMPRESSION_MINIMUM_SIZE = _int('OUTFIT_COMPRESSION_MINIMUM_SIZE', 1024)
+GZIP_LEVEL = _int('OUTFIT_GZIP_LEVEL', 6)
+BROTLI_QUALITY = _int('OUTFIT_BROTLI_QUALITY', 4)
@@ -0,0 +1,187 @@
+"""Counting valid outfits without enumerating them.
+
+An outfit picks one item per slot (the occasion's required types, plus
+optionally "none or one" outerwear/accessory). Validity decomposes into
+per-item weather checks, which just shrink each slot's pool, and two
+outfit-level rules that only depend on an aggregate state: the formal/casual
+style flags and the set of distinct colors. Items in a slot are therefore
+grouped by ``(style flags, color)`` and a dynamic program over the slots
+carries ``{(flags, color set): count}``, pruning states that already break a
+monotone rule (formal+casual, more than 4 colors). The palette harmony check
+is applied to the surviving color sets at the end.
+
+When the number of DP states would exceed a budget the count is estimated by
+uniform sampling with a Wilson confidence interval instead.
+"""
+import math
+import random
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.schemas import ClothingItem, ClothingType, OccasionInfo
+from .color import MAX_DISTINCT_COLORS, UNKNOWN, normalize_color
+
+FORMAL = 1
+CASUAL = 2
+CLASH = FORMAL | CASUAL
+ABSENT = None  # group key for "no item in this optional slot"
+
+
+def _style_flags(item: ClothingItem) -> int:
+    return (FORMAL if 'formal' in item.style else 0) | (CASUAL if 'casual' in item.style else 0)
+
+
+def _color_key(color: str) -> str:
+    key = normalize_color(color)
+    # Distinct unknown names are distinct colors (matches ColorHarmony.indices)
+    return (color or '').strip().lower() if key == UNKNOWN else key
+
+
+def _bits(mask: int) -> List[int]:
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+def _wilson(successes: int, trials: int, z: float = 1.96) -> Tuple[float, float]:
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denom = 1 + z * z / trials
+    centre = p + z * z / (2 * trials)
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials))
+    return max(0.0, (centre - margin) / denom), min(1.0, (centre + margin) / denom)
+
+
+class OutfitCounter:
+    def __init__(self, engine, max_states: int = 200_000, samples: int = 20_000, seed: Optional[int] = None):
+        self.engine = engine
+        self.max_states = max_states
+        self.samples = samples
+        self.seed = seed
+
+    def slot_pools(
+        self,
+        items: Sequence[ClothingItem],
+        occasion: OccasionInfo,
+        include_optional: bool = False
+    ) -> Tuple[List[Tuple[ClothingType, List[int], bool]], List[ClothingType]]:
+        """Per-slot item positions, built by AND-ing per-attribute bitsets"""
+        weather = self.engine._enum_value(occasion.weather)
+        type_bits: Dict[ClothingType, int] = defaultdict(int)
+        weather_ok = 0
+        for i, item in enumerate(items):
+            type_bits[item.item_type] |= 1 << i
+            if self.engine._is_item_weather_appropriate(item, weather):
+                weather_ok |= 1 << i
+
+        slots, missing = [], []
+        for item_type in self.engine._required_types(occasion):
+            pool = type_bits.get(item_type, 0) & weather_ok
+            if pool:
+                slots.append((item_type, _bits(pool), False))
+            else:
+                missing.append(item_type)
+        if include_optional:
+            for item_type in (ClothingType.OUTERWEAR, ClothingType.ACCESSORY):
+                if any(t == item_type for t, _, _ in slots):
+                    continue
+                pool = type_bits.get(item_type, 0) & weather_ok
+                if pool:
+                    slots.append((item_type, _bits(pool), True))
+        return slots, missing
+
+    def count(
+        self,
+        items: Sequence[ClothingItem],
+        occasion: OccasionInfo,
+        include_optional: bool = False
+    ) -> Dict:
+        """Exact or estimated number of valid outfits"""
+        items = list(items)
+        slots, missing = self.slot_pools(items, occasion, include_optional)
+        total = 1
+        for _, pool, optional in slots:
+            total *= len(pool) + (1 if optional else 0)
+        result = {
+            'total_combinations': total if slots else 0,
+            'missing_types': missing,
+            'slots': {item_type.value: len(pool) for item_type, pool, _ in slots},
+        }
+        if not slots:
+            return {**result, 'exact': True, 'count': 0, 'lower': 0, 'upper': 0, 'method': 'empty'}
+
+        exact = self._count_exact(items, slots)
+        if exact is not None:
+            return {**result, 'exact': True, 'count': exact, 'lower': exact, 'upper': exact, 'method': 'dp'}
+        return {**result, **self._estimate(items, slots, total)}
+
+    def _count_exact(self, items: List[ClothingItem], slots) -> Optional[int]:
+        states: Dict[Tuple[int, FrozenSet[str]], int] = {(0, frozenset()): 1}
+        for _, pool, optional in slots:
+            groups = Counter((_style_flags(items[i]), _color_key(items[i].color)) for i in pool)
+            if optional:
+                groups[ABSENT] = 1
+            next_states: Dict[Tuple[int, FrozenSet[str]], int] = defaultdict(int)
+            for (flags, colors), count in states.items():
+                for group, size in groups.items():
+                    if group is ABSENT:
+                        next_states[(flags, colors)] += count
+                        continue
+                    new_flags = flags | group[0]
+                    if new_flags & CLASH == CLASH:
+                        continue
+                    new_colors = colors | {group[1]}
+                    if len(new_colors) > MAX_DISTINCT_COLORS:
+                        continue
+                    next_states[(new_flags, new_colors)] += count * size
+            if len(next_states) > self.max_states:
+                return None
+            states = next_states
+
+        harmonious: Dict[FrozenSet[str], bool] = {}
+        valid = 0
+        for (_, colors), count in states.items():
+            if colors not in harmonious:
+                harmonious[colors] = self.engine._check_color_compatibility(sorted(colors))
+            if harmonious[colors]:
+                valid += count
+        return valid
+
+    def _estimate(self, items: List[ClothingItem], slots, total: int) -> Dict:
+        rng = np.random.default_rng(self.seed)
+        harmony = self.engine.color_harmony
+        flags = np.array([_style_flags(item) for item in items], dtype=np.int8)
+        color_idx = np.array([harmony.indices([item.color])[0] for item in items], dtype=np.int32)
+
+        picks = []
+        for _, pool, optional in slots:
+            choices = np.array(pool + ([-1] if optional else []), dtype=np.int64)
+            picks.append(choices[rng.integers(0, len(choices), self.samples)])
+        picks = np.stack(picks, axis=1)
+        present = picks >= 0
+        safe = np.maximum(picks, 0)
+
+        combined = np.bitwise_or.reduce(np.where(present, flags[safe], 0), axis=1)
+        style_ok = (combined & CLASH) != CLASH
+        # Distinct colors per sample: sort, blank repeats, then score the padded palette
+        colors = np.where(present, color_idx[safe], -1)
+        colors.sort(axis=1)
+        colors[:, 1:][colors[:, 1:] == colors[:, :-1]] = -1
+        color_ok = harmony.harmonious_mask(colors)
+
+        successes = int((style_ok & color_ok).sum())
+        low, high = _wilson(successes, self.samples)
+        return {
+            'exact': False,
+            'count': round(total * successes / self.samples),
+            'lower': math.floor(total * low),
+            'upper': math.ceil(total * high),
+            'method': 'sampling',
+            'samples': self.samples,
+        }
@@ -1,6 +1,6 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import random
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import numpy as np
 from ..models.schemas import (
     ClothingItem,
@@ -11,10 +11,38 @@ from ..models.schemas import (
     WeatherType,
     OccasionType
 )
+from .cache import LRUCache
+from .color import ColorHarmony
+from .counting import OutfitCounter
+from .diversity import OVERGENERATE as DIVERSITY_OVERGENERATE, incidence_matrix, mmr_order
+from .feedback import item_preference_keys, preference_score
+from .fingerprint import inventory_key
+from .neighbors import CompatibilityIndex
+from .similar import SimilarItemsIndex
+from .tags import HEAVY_OUTERWEAR, RAIN_GEAR, SHORT_SLEEVE, SHORTS, garment_tags
+from .pagination import (
+    InvalidCursor,
+    OutfitCursor,
+    decode_cursor,
+    encode_cursor,
+    permutation_params,
+    space_digest,
+    unrank
+)
 
 class OutfitCurationEngine:
-    def __init__(self):
+    def __init__(self, learned_scorer=None, learned_blend: float = 0.5, preference_store=None):
         self.compatibility_rules = self._initialize_compatibility_rules()
+        self.color_harmony = ColorHarmony(self.compatibility_rules['color'])
+        # Optional app.core.learned.LearnedScorer; learned_blend=1.0 replaces the heuristic score
+        self.learned_scorer = learned_scorer
+        self.learned_blend = learned_blend
+        # Optional app.core.feedback.PreferenceStore with per-user weights learned from feedback
+        self.preference_store = preference_store
+        # CompatibilityIndex per (inventory, style preferences, occasion, weather)
+        self._neighbor_indexes = LRUCache(maxsize=32)
+        # SimilarItemsIndex per inventory
+        self._similar_indexes = LRUCache(maxsize=16)
         
     def _initialize_compatibility_rules(self) -> Dict[str, List[str]]:
         """Initialize rules for clothing compatibility"""
@@ -171,9 +199,25 @@ class OutfitCurationEngine:
         user_info: UserInfo,
         occasion: OccasionInfo,
         max_outfits: int = 5,
-        consider_previous: bool = True
+        consider_previous: bool = True,
+        max_attempts: Optional[int] = None,
+        include_complementary: bool = True,
+        include_item_ids: Optional[List[str]] = None,
+        exclude_item_ids: Optional[List[str]] = None,
+        exclude_worn_within_days: Optional[int] = None,
+        diversity_weight: float = 0.0,
+        seed: Optional[int] = None
     ) -> List[Outfit]:
-        """Generate outfit recommendations based on filtered inventory"""
+        """Generate outfit recommendations based on filtered inventory.
+
+        ``max_attempts`` and ``include_complementary`` let callers under load
+        trade recommendation quality for a cheaper run. Item constraints are
+        applied to the type pools before sampling (see ``_constrained_pools``).
+        With a ``diversity_weight`` above 0, ``DIVERSITY_OVERGENERATE`` times as
+        many candidates are sampled and the result is picked by MMR over
+        their item sets instead of by confidence alone. A ``seed`` makes the
+        sampling reproducible: the same seed and inputs give the same outfits.
+        """
         import logging
         logger = logging.getLogger(__name__)
         
@@ -183,25 +227,28 @@ class OutfitCurationEngine:
             
         logger.info(f"Generating outfits from {len(filtered_inventory)} filtered items")
             
-        # Categorize items by type
-        items_by_type = self._categorize_items(filtered_inventory)
+        # Categorize items by type, pruned by the request's item constraints
+        items_by_type, pinned_extras = self._constrained_pools(
+            filtered_inventory, occasion, include_item_ids, exclude_item_ids, exclude_worn_within_days
+        )
         
         # Get required item types for this occasion
-        required_types = self.compatibility_rules['occasion_specific'].get(
-            occasion.occasion_type, 
-            {}
-        ).get('required_types', [ClothingType.TOP, ClothingType.BOTTOM])
+        required_types = self._required_types(occasion)
         
         # Generate possible combinations (with deduplication and light diversity)
         outfits = []
+        candidates: List[List[ClothingItem]] = []
         seen_combos = set()
+        rng = random.Random(seed) if seed is not None else random
         # Shuffle item pools a bit for diversity
         for k in list(items_by_type.keys()):
-            random.shuffle(items_by_type[k])
+            rng.shuffle(items_by_type[k])
 
+        wanted = max_outfits * DIVERSITY_OVERGENERATE if diversity_weight > 0 else max_outfits
         attempts = 0
-        max_attempts = max(10, max_outfits * 5)
-        while len(outfits) < max_outfits and attempts < max_attempts:
+        if max_attempts is None:
+            max_attempts = max(10, wanted * 5)
+        while len(candidates) < wanted and attempts < max_attempts:
             attempts += 1
             outfit_items = []
 
@@ -209,11 +256,14 @@ class OutfitCurationEngine:
             for item_type in required_types:
                 pool = items_by_type.get(item_type, [])
                 if pool:
-                    item = random.choice(pool)
+                    item = rng.choice(pool)
                     outfit_items.append(item)
+            for pins in pinned_extras.values():
+                outfit_items.append(rng.choice(pins))
 
             # Add complementary items (like accessories, outerwear)
-            self._add_complementary_items(outfit_items, items_by_type)
+            if include_complementary:
+                self._add_complementary_items(outfit_items, items_by_type, rng=rng)
 
             # Check if outfit is valid
             is_valid = self._is_valid_outfit(outfit_items, occasion)
@@ -227,7 +277,16 @@ class OutfitCurationEngine:
                 continue
 
             seen_combos.add(combo_key)
-            conf = round(self._calculate_confidence(outfit_items, user_info, occasion), 2)
+            candidates.append(outfit_items)
+
+        # Score all accepted candidates in one batch
+        scores = self._score_candidates(candidates, user_info, occasion)
+        reranked = diversity_weight > 0 and len(candidates) > max_outfits
+        if reranked:
+            order = mmr_order(scores, incidence_matrix(candidates)[0], max_outfits, diversity_weight)
+            candidates = [candidates[i] for i in order]
+            scores = [scores[i] for i in order]
+        for outfit_items, conf in zip(candidates, scores):
             outfit = Outfit(
                 outfit_id=f"outfit_{len(outfits) + 1}",
                 items=outfit_items,
@@ -236,10 +295,368 @@ class OutfitCurationEngine:
             )
             outfits.append(outfit)
         
+        if reranked:
+            return outfits  # already in MMR order
         # Sort by confidence score (desc)
         outfits.sort(key=lambda x: (x.confidence_score or 0), reverse=True)
         return outfits[:max_outfits]
     
+    def generate_outfit_page(
+        self,
+        filtered_inventory: List[ClothingItem],
+        user_info: UserInfo,
+        occasion: OccasionInfo,
+        page_size: int = 5,
+        cursor: Optional[str] = None,
+        seed: Optional[int] = None,
+        max_scan: Optional[int] = None,
+        include_item_ids: Optional[List[str]] = None,
+        exclude_item_ids: Optional[List[str]] = None,
+        exclude_worn_within_days: Optional[int] = None
+    ) -> Tuple[List[Outfit], Optional[str], int]:
+        """Return one page of outfits, the cursor for the next page and the
+        size of the combination space.
+
+        Base outfits (one item per required type) are enumerated lazily in a
+        seeded permutation of the combination space, so successive pages never
+        repeat a combination and no server-side state is kept between calls.
+        ``next_cursor`` is ``None`` once the space is exhausted.
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        # Pools are ordered by item id so positions mean the same thing on every call
+        items_by_type, pinned_extras = self._constrained_pools(
+            filtered_inventory, occasion, include_item_ids, exclude_item_ids, exclude_worn_within_days
+        )
+        for pool in list(items_by_type.values()) + list(pinned_extras.values()):
+            pool.sort(key=lambda it: it.item_id)
+        pools = [
+            items_by_type[item_type]
+            for item_type in self._required_types(occasion)
+            if items_by_type.get(item_type)
+        ]
+        radices = [len(pool) for pool in pools]
+        total = 1
+        for radix in radices:
+            total *= radix
+        if not pools:
+            total = 0
+
+        context = f"{occasion.occasion_type.value}|{occasion.weather.value}"
+        digest = space_digest([[it.item_id for it in pool] for pool in pools], context)
+        if cursor is not None:
+            state = decode_cursor(cursor)
+            if state.space_digest != digest:
+                raise InvalidCursor("Cursor does not match this inventory or occasion")
+        else:
+            if seed is None:
+                seed = random.getrandbits(32)
+            state = OutfitCursor(seed=seed & 0xFFFFFFFF, position=0, space_digest=digest)
+
+        multiplier, offset = permutation_params(state.seed, total)
+        if max_scan is None:
+            max_scan = max(1000, page_size * 50)
+
+        candidates: List[List[ClothingItem]] = []
+        outfit_ids: List[str] = []
+        position = state.position
+        scanned = 0
+        while position < total and len(candidates) < page_size and scanned < max_scan:
+            index = (multiplier * position + offset) % total
+            position += 1
+            scanned += 1
+            outfit_items = [pool[digit] for pool, digit in zip(pools, unrank(index, radices))]
+            # Complementary picks are derived from the position so a page is reproducible
+            rng = random.Random(state.seed * 1_000_003 + index)
+            for pins in pinned_extras.values():
+                outfit_items.append(rng.choice(pins))
+            self._add_complementary_items(outfit_items, items_by_type, rng=rng)
+            if not self._is_valid_outfit(outfit_items, occasion):
+                continue
+            candidates.append(outfit_items)
+            outfit_ids.append(f"outfit_{position}")
+
+        outfits = [
+            Outfit(
+                outfit_id=outfit_id,
+                items=outfit_items,
+                occasion=occasion.occasion_type,
+                confidence_score=conf
+            )
+            for outfit_id, outfit_items, conf in zip(
+                outfit_ids, candidates, self._score_candidates(candidates, user_info, occasion)
+            )
+        ]
+
+        logger.info(f"Outfit page: {len(outfits)} outfits, scanned {scanned} of {total} combinations")
+        next_cursor = None
+        if position < total:
+            next_cursor = encode_cursor(OutfitCursor(seed=state.seed, position=position, space_digest=digest))
+        outfits.sort(key=lambda x: (x.confidence_score or 0), reverse=True)
+        return outfits, next_cursor, total
+
+    def complete_look(
+        self,
+        inventory: List[ClothingItem],
+        user_info: UserInfo,
+        occasion: OccasionInfo,
+        anchor_item_id: str,
+        suggestions_per_slot: int = 3,
+        inventory_version: Optional[str] = None
+    ) -> Tuple[ClothingItem, Optional[Outfit], Dict[ClothingType, List[ClothingItem]]]:
+        """Complete an outfit around a chosen anchor item.
+
+        Returns the anchor, the best valid outfit built around it (or ``None``)
+        and ranked suggestions for every remaining slot. Raises ``KeyError``
+        if the anchor is not in the inventory and ``ValueError`` if it is not
+        suitable for this occasion/weather. ``inventory_version`` keys the
+        neighbor index (see ``inventory_key``).
+        """
+        anchor = next((item for item in inventory if item.item_id == anchor_item_id), None)
+        if anchor is None:
+            raise KeyError(anchor_item_id)
+
+        key = (
+            inventory_key(inventory, inventory_version),
+            tuple(sorted(user_info.style_preferences)),
+            self._enum_value(occasion.occasion_type),
+            self._enum_value(occasion.weather),
+        )
+        index = self._neighbor_indexes.get_or_build(
+            key,
+            lambda: CompatibilityIndex(self.filter_inventory(inventory, user_info, occasion), self, occasion)
+        )
+        if anchor_item_id not in index.position:
+            raise ValueError(f"Item {anchor_item_id} is not suitable for this occasion and weather")
+
+        # A dress covers both the top and bottom slots
+        covered = {anchor.item_type}
+        if anchor.item_type == ClothingType.DRESS:
+            covered |= {ClothingType.TOP, ClothingType.BOTTOM}
+        slots = [t for t in self._required_types(occasion) if t not in covered]
+        optional_slots = [
+            t for t in (ClothingType.OUTERWEAR, ClothingType.ACCESSORY)
+            if t not in covered and t not in slots
+        ]
+        result = index.complete(anchor_item_id, slots, optional_slots, suggestions_per_slot)
+
+        outfit = None
+        if result['outfit']:
+            conf = self._score_candidates([result['outfit']], user_info, occasion)[0]
+            outfit = Outfit(
+                outfit_id=f"look_{anchor_item_id}",
+                items=result['outfit'],
+                occasion=occasion.occasion_type,
+                confidence_score=conf
+            )
+        return anchor, outfit, result['suggestions']
+
+    def count_valid_outfits(
+        self,
+        filtered_inventory: List[ClothingItem],
+        occasion: OccasionInfo,
+        include_optional: bool = False,
+        max_states: int = 200_000,
+        samples: int = 20_000
+    ) -> Dict:
+        """Count valid outfits (one item per required type) without enumerating them.
+
+        Exact for inventories whose DP state space stays under ``max_states``,
+        otherwise a sampling estimate with 95% bounds (``exact`` is False).
+        With ``include_optional`` each outerwear/accessory slot may be empty
+        or hold one item.
+        """
+        counter = OutfitCounter(self, max_states=max_states, samples=samples)
+        return counter.count(filtered_inventory, occasion, include_optional)
+
+    def _similar_index(self, inventory: List[ClothingItem], inventory_version: Optional[str] = None) -> SimilarItemsIndex:
+        return self._similar_indexes.get_or_build(
+            inventory_key(inventory, inventory_version), lambda: SimilarItemsIndex(inventory)
+        )
+
+    def similar_items(
+        self,
+        inventory: List[ClothingItem],
+        item_id: str,
+        k: int = 5,
+        same_type: bool = True,
+        clean_only: bool = False,
+        inventory_version: Optional[str] = None
+    ) -> Tuple[ClothingItem, List[Tuple[ClothingItem, float]]]:
+        """The item and its ``k`` most similar inventory items with their similarity.
+
+        Raises ``KeyError`` if the item is not in the inventory.
+        ``inventory_version`` keys the LSH index (see ``inventory_key``).
+        """
+        item = next((it for it in inventory if it.item_id == item_id), None)
+        if item is None:
+            raise KeyError(item_id)
+        predicate = (lambda it: it.is_clean) if clean_only else None
+        return item, self._similar_index(inventory, inventory_version).similar(item, k, same_type, predicate)
+
+    def substitute_unavailable(
+        self,
+        inventory: List[ClothingItem],
+        candidates: List[ClothingItem],
+        include_item_ids: Optional[List[str]],
+        exclude_item_ids: Optional[List[str]] = None
+    ) -> Dict[str, ClothingItem]:
+        """Closest clean stand-in for every pinned item that is not clean.
+
+        Substitutes are of the same type and drawn from ``candidates`` (the
+        filtered inventory), never excluded or pinned themselves. Returns
+        ``{pinned item_id: substitute}``; pins without a usable substitute are
+        left out and stay pinned.
+        """
+        include = set(include_item_ids or ())
+        unavailable = [it for it in inventory if it.item_id in include and not it.is_clean]
+        if not unavailable:
+            return {}
+        blocked = include | set(exclude_item_ids or ())
+        allowed = {it.item_id for it in candidates if it.is_clean and it.item_id not in blocked}
+        index = self._similar_index(inventory)
+        substitutions: Dict[str, ClothingItem] = {}
+        for item in unavailable:
+            matches = index.similar(item, k=1, predicate=lambda it: it.item_id in allowed)
+            if matches:
+                substitutions[item.item_id] = matches[0][0]
+                allowed.discard(matches[0][0].item_id)
+        return substitutions
+
+    def _score_candidates(
+        self,
+        candidates: List[List[ClothingItem]],
+        user_info: UserInfo,
+        occasion: OccasionInfo
+    ) -> List[float]:
+        """Confidence scores (rounded) for a batch of candidate outfits"""
+        if not candidates:
+            return []
+        palette_scores = self.color_harmony.score_palettes(
+            self.color_harmony.index_matrix([[item.color for item in items] for items in candidates])
+        )
+        preference_weights = self.preference_store.weights(user_info.user_id) if self.preference_store else None
+        scores = self._confidence_matrix(candidates, user_info, occasion, palette_scores, preference_weights)
+        if self.learned_scorer is not None:
+            learned = self.learned_scorer.score(candidates, user_info, occasion, palette_scores)
+            scores = (1.0 - self.learned_blend) * scores + self.learned_blend * learned
+        return [round(float(score), 2) for score in np.clip(scores, 0.0, 1.0)]
+
+    def _confidence_matrix(
+        self,
+        candidates: List[List[ClothingItem]],
+        user_info: UserInfo,
+        occasion: OccasionInfo,
+        palette_scores: np.ndarray,
+        preference_weights: Optional[Dict[str, float]] = None
+    ) -> np.ndarray:
+        """Vectorized ``_calculate_confidence`` for every candidate.
+
+        Per-item terms are computed once per distinct item and gathered
+        through an (M, K) item index matrix padded with a zero row.
+        """
+        unique: Dict[int, int] = {}
+        items_by_row: List[ClothingItem] = []
+        rows = []
+        for items in candidates:
+            row = []
+            for item in items:
+                index = unique.get(id(item))
+                if index is None:
+                    index = unique[id(item)] = len(items_by_row)
+                    items_by_row.append(item)
+                row.append(index)
+            rows.append(row)
+        pad = len(items_by_row)
+        width = max(len(row) for row in rows) or 1
+        matrix = np.full((len(rows), width), pad, dtype=np.int64)
+        for i, row in enumerate(rows):
+            matrix[i, :len(row)] = row
+
+        # Per-item terms; the padding row contributes nothing
+        preferred_colors = {c.lower() for c in user_info.color_preferences or ()}
+        item_terms = np.zeros(pad + 1)
+        preference_sums = np.zeros(pad + 1)
+        preference_counts = np.zeros(pad + 1)
+        for i, item in enumerate(items_by_row):
+            item_terms[i] = (
+                0.1 * (occasion.occasion_type in item.occasion_suitability)
+                + 0.05 * (item.color.lower() in preferred_colors)
+            )
+            if preference_weights:
+                keys = item_preference_keys(item)
+                preference_sums[i] = sum(preference_weights.get(key, 0.0) for key in keys)
+                preference_counts[i] = len(keys)
+
+        counts = preference_counts[matrix].sum(axis=1)
+        preference = np.where(counts > 0, preference_sums[matrix].sum(axis=1) / np.maximum(counts, 1), 0.0)
+        scores = (
+            0.5
+            + 0.2 * (np.asarray(palette_scores, dtype=np.float64) - 0.5)
+            + item_terms[matrix].sum(axis=1)
+            + 0.2 * preference
+        )
+        empty = np.array([not items for items in candidates])
+        return np.where(empty, 0.0, np.clip(scores, 0.0, 1.0))
+
+    def _constrained_pools(
+        self,
+        items: List[ClothingItem],
+        occasion: OccasionInfo,
+        include_item_ids: Optional[List[str]] = None,
+        exclude_item_ids: Optional[List[str]] = None,
+        exclude_worn_within_days: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> Tuple[Dict[ClothingType, List[ClothingItem]], Dict[ClothingType, List[ClothingItem]]]:
+        """Categorize items into type pools after applying item constraints.
+
+        Excluded items and (unless pinned) items worn within the last
+        ``exclude_worn_within_days`` days are dropped. A pinned item replaces
+        the whole pool of its required type, so sampling only ever draws it;
+        pins of non-required types are returned separately and added to every
+        outfit. Several pins of one type are alternatives: each outfit gets one.
+        """
+        include = set(include_item_ids or ())
+        exclude = set(exclude_item_ids or ())
+        conflicting = include & exclude
+        if conflicting:
+            raise ValueError(f"Items both included and excluded: {sorted(conflicting)}")
+
+        cutoff = None
+        if exclude_worn_within_days is not None:
+            cutoff = (now or datetime.utcnow()) - timedelta(days=exclude_worn_within_days)
+
+        def worn_recently(item: ClothingItem) -> bool:
+            if cutoff is None or item.last_worn is None:
+                return False
+            last_worn = item.last_worn
+            if last_worn.tzinfo is not None:
+                last_worn = last_worn.astimezone(timezone.utc).replace(tzinfo=None)
+            return last_worn >= cutoff
+
+        kept = [
+            item for item in items
+            if item.item_id not in exclude and (item.item_id in include or not worn_recently(item))
+        ]
+        items_by_type = self._categorize_items(kept)
+        pinned_extras: Dict[ClothingType, List[ClothingItem]] = {}
+        if include:
+            required = set(self._required_types(occasion))
+            for item_type, pins in self._categorize_items([it for it in kept if it.item_id in include]).items():
+                if item_type in required:
+                    items_by_type[item_type] = pins
+                else:
+                    pinned_extras[item_type] = pins
+        return items_by_type, pinned_extras
+
+    def _required_types(self, occasion: OccasionInfo) -> List[ClothingType]:
+        """Item types every outfit for this occasion must contain"""
+        return self.compatibility_rules['occasion_specific'].get(
+            occasion.occasion_type,
+            {}
+        ).get('required_types', [ClothingType.TOP, ClothingType.BOTTOM])
+
     def _categorize_items(self, items: List[ClothingItem]) -> Dict[ClothingType, List[ClothingItem]]:
         """Categorize items by their type"""
         categorized = {}
@@ -252,18 +669,20 @@ class OutfitCurationEngine:
     def _add_complementary_items(
         self, 
         outfit_items: List[ClothingItem],
-        available_items: Dict[ClothingType, List[ClothingItem]]
+        available_items: Dict[ClothingType, List[ClothingItem]],
+        rng=random
     ) -> None:
         """Add complementary items to the outfit"""
+        present = {item.item_type for item in outfit_items}
         # Example: Add outerwear if it's cold
-        if ClothingType.OUTERWEAR in available_items and len(outfit_items) >= 2:
-            if random.random() > 0.7:  # 30% chance to add outerwear
-                outfit_items.append(random.choice(available_items[ClothingType.OUTERWEAR]))
+        if ClothingType.OUTERWEAR in available_items and ClothingType.OUTERWEAR not in present and len(outfit_items) >= 2:
+            if rng.random() > 0.7:  # 30% chance to add outerwear
+                outfit_items.append(rng.choice(available_items[ClothingType.OUTERWEAR]))
         
         # Example: Add accessories
-        if ClothingType.ACCESSORY in available_items and len(outfit_items) > 0:
-            if random.random() > 0.5:  # 50% chance to add an accessory
-                outfit_items.append(random.choice(available_items[ClothingType.ACCESSORY]))
+        if ClothingType.ACCESSORY in available_items and ClothingType.ACCESSORY not in present and len(outfit_items) > 0:
+            if rng.random() > 0.5:  # 50% chance to add an accessory
+                outfit_items.append(rng.choice(available_items[ClothingType.ACCESSORY]))
     
     def _is_valid_outfit(
         self, 
@@ -278,76 +697,87 @@ class OutfitCurationEngine:
         styles = [style for item in items for style in item.style]
         if 'formal' in styles and 'casual' in styles:
             return False
-            
-        # Weather-aware sanity checks (shoes stricter than other items)
-        def enum_value(x):
-            try:
-                return x.value
-            except AttributeError:
-                return str(x)
-
-        current_weather = enum_value(occasion.weather)
 
+        current_weather = self._enum_value(occasion.weather)
         for item in items:
-            # Avoid rain-specific footwear unless it's rainy
-            if item.item_type == ClothingType.SHOES:
-                name_lower = (item.name or '').lower()
-                if 'rain' in name_lower and current_weather != 'rainy':
-                    return False
-                # Enforce shoes match current weather for practicality
-                allowed_weathers = [enum_value(w) for w in item.weather_suitability]
-                if current_weather not in allowed_weathers:
-                    return False
-
-            # For all non-accessory items, require weather suitability to include current weather
-            if item.item_type.name.lower() != 'accessory':
-                allowed_weathers = [enum_value(w) for w in item.weather_suitability]
-                if current_weather not in allowed_weathers:
-                    return False
-
-            name_lower = (item.name or '').lower()
-            # Heuristics: avoid clearly unsuitable garments for extremes
-            if current_weather == 'cold':
-                # Avoid T-shirts/Tees in cold
-                if item.item_type == ClothingType.TOP and ('tee' in name_lower or 't-shirt' in name_lower):
-                    return False
-                # Avoid shorts in cold
-                if item.item_type == ClothingType.BOTTOM and ('short' in name_lower):
-                    return False
-            if current_weather == 'hot':
-                # Avoid heavy overcoats in hot
-                if item.item_type == ClothingType.OUTERWEAR and ('coat' in name_lower or 'jacket' in name_lower) and 'rain' not in name_lower:
-                    return False
+            if not self._is_item_weather_appropriate(item, current_weather):
+                return False
 
         # Check color compatibility
         if not self._check_color_compatibility([item.color for item in items]):
             return False
             
         return True
+
+    @staticmethod
+    def _enum_value(x) -> str:
+        try:
+            return x.value
+        except AttributeError:
+            return str(x)
+
+    def _is_item_weather_appropriate(self, item: ClothingItem, current_weather: str) -> bool:
+        """Per-item weather sanity checks (shoes stricter than other items)"""
+        enum_value = self._enum_value
+
+        tags = garment_tags(item)
+
+        # Avoid rain-specific footwear unless it's rainy
+        if item.item_type == ClothingType.SHOES:
+            if RAIN_GEAR in tags and current_weather != 'rainy':
+                return False
+            # Enforce shoes match current weather for practicality
+            allowed_weathers = [enum_value(w) for w in item.weather_suitability]
+            if current_weather not in allowed_weathers:
+                return False
+
+        # For all non-accessory items, require weather suitability to include current weather
+        if item.item_type.name.lower() != 'accessory':
+            allowed_weathers = [enum_value(w) for w in item.weather_suitability]
+            if current_weather not in allowed_weathers:
+                return False
+
+        # Heuristics: avoid clearly unsuitable garments for extremes (tags from app.core.tags)
+        if current_weather == 'cold':
+            # Avoid T-shirts/Tees in cold
+            if item.item_type == ClothingType.TOP and SHORT_SLEEVE in tags:
+                return False
+            # Avoid shorts in cold
+            if item.item_type == ClothingType.BOTTOM and SHORTS in tags:
+                return False
+        if current_weather == 'hot':
+            # Avoid heavy overcoats in hot (rain jackets are not tagged heavy)
+            if item.item_type == ClothingType.OUTERWEAR and HEAVY_OUTERWEAR in tags:
+                return False
+
+        return True
     
     def _check_color_compatibility(self, colors: List[str]) -> bool:
         """Check if colors in the outfit are compatible"""
         if not colors:
             return True
-            
-        # Simple compatibility check - avoid too many different colors
-        if len(set(colors)) > 4:  # More than 4 different colors is probably too much
-            return False
-            
-        # Additional color theory checks could be added here
-        return True
+
+        # At most 4 distinct colors, and no clashing palette (see app.core.color)
+        return self.color_harmony.is_harmonious(colors)
     
     def _calculate_confidence(
         self, 
         items: List[ClothingItem], 
         user_info: UserInfo, 
-        occasion: OccasionInfo
+        occasion: OccasionInfo,
+        palette_score: Optional[float] = None,
+        preference_weights: Optional[Dict[str, float]] = None
     ) -> float:
         """Calculate a confidence score for the outfit (0.0 to 1.0)"""
         if not items:
             return 0.0
             
         score = 0.5  # Base score
+
+        # Reward harmonious palettes, penalise ones that only just pass validation
+        if palette_score is None:
+            palette_score = self.color_harmony.palette_score([item.color for item in items])
+        score += 0.2 * (palette_score - 0.5)
         
         # Increase score based on occasion matching
         for item in items:
@@ -359,6 +789,9 @@ class OutfitCurationEngine:
             for item in items:
                 if item.color.lower() in [c.lower() for c in user_info.color_preferences]:
                     score += 0.05
+
+        # Preferences learned from the user's feedback (see app.core.feedback)
+        score += 0.2 * preference_score(items, preference_weights)
         
         # Normalize score to be between 0 and 1
         return min(1.0, max(0.0, score))
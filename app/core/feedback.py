@@ -0,0 +1,144 @@
+"""Feedback ingestion and incremental per-user preference weights.
+
+Every feedback event is appended as one compact JSON line to a local log and
+immediately folded into the user's weight vector with an exponential moving
+average, touching only the attributes of the items in the event. Scoring
+reads the in-memory weights directly. Weights are snapshotted periodically
+together with the log offset they cover, so a restart loads the snapshot and
+replays only the tail of the log written after it.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+
+from ..models.schemas import ClothingItem, FeedbackEvent, FeedbackType
+from .color import normalize_color
+
+logger = logging.getLogger(__name__)
+
+# How strongly each event type pulls preferences toward (+) or away from (-) its items
+EVENT_SIGNALS = {
+    FeedbackType.LIKED: 1.0,
+    FeedbackType.WORN: 0.5,
+    FeedbackType.SKIPPED: -0.3,
+    FeedbackType.DISLIKED: -1.0,
+}
+
+
+def item_preference_keys(item: ClothingItem) -> List[str]:
+    """Attributes a user can develop a preference for"""
+    keys = [f"color:{normalize_color(item.color)}", f"material:{(item.material or '').lower()}"]
+    keys += [f"style:{s.lower()}" for s in item.style]
+    return keys
+
+
+class PreferenceStore:
+    def __init__(
+        self,
+        log_path: str,
+        snapshot_path: str,
+        learning_rate: float = 0.1,
+        snapshot_every: int = 1000
+    ):
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path
+        self.learning_rate = learning_rate
+        self.snapshot_every = snapshot_every
+        self._weights: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._log_offset = 0
+        self._since_snapshot = 0
+        self._events = 0
+        self._load()
+
+    def _load(self) -> None:
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            self._weights = snapshot['weights']
+            self._log_offset = snapshot['log_offset']
+            self._events = snapshot.get('events', 0)
+        if not os.path.exists(self.log_path):
+            return
+        replayed = 0
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self._log_offset += len(line)
+                try:
+                    event = FeedbackEvent.model_validate_json(line)
+                except ValidationError as e:
+                    # A corrupt line must not keep the API from starting; skip it
+                    logger.warning(f"Skipping malformed feedback log line at offset {self._log_offset - len(line)}: {e}")
+                    continue
+                self._apply(event)
+                replayed += 1
+        if self._log_offset != os.path.getsize(self.log_path):
+            # Cut off a torn write from a crash so appends start on a line boundary
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(self._log_offset)
+        self._events += replayed
+        self._since_snapshot = replayed
+        if replayed:
+            logger.info(f"Replayed {replayed} feedback events written after the last snapshot")
+
+    def _apply(self, event: FeedbackEvent) -> None:
+        signal = EVENT_SIGNALS[event.event]
+        weights = self._weights.setdefault(event.user_id, {})
+        rate = self.learning_rate
+        for item in event.items:
+            for key in item_preference_keys(item):
+                weights[key] = (1.0 - rate) * weights.get(key, 0.0) + rate * signal
+
+    def record(self, event: FeedbackEvent) -> None:
+        """Append an event to the log and update the user's weights"""
+        line = (event.model_dump_json(exclude_none=True) + '\n').encode('utf-8')
+        with self._lock:
+            with open(self.log_path, 'ab') as f:
+                f.write(line)
+            self._log_offset += len(line)
+            self._apply(event)
+            self._events += 1
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_every:
+                self._write_snapshot()
+
+    def record_many(self, events: Iterable[FeedbackEvent]) -> int:
+        count = 0
+        for event in events:
+            self.record(event)
+            count += 1
+        return count
+
+    def _write_snapshot(self) -> None:
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'weights': self._weights, 'log_offset': self._log_offset, 'events': self._events}, f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._since_snapshot = 0
+
+    def snapshot(self) -> None:
+        with self._lock:
+            self._write_snapshot()
+
+    def weights(self, user_id: str) -> Dict[str, float]:
+        """Current weights for a user (empty if no feedback yet)"""
+        with self._lock:
+            return dict(self._weights.get(user_id, {}))
+
+    def stats(self) -> Dict[str, int]:
+        return {'users': len(self._weights), 'events': self._events, 'since_snapshot': self._since_snapshot}
+
+
+def preference_score(items: Iterable[ClothingItem], weights: Optional[Dict[str, float]]) -> float:
+    """Mean learned preference over an outfit's attributes, in [-1, 1]"""
+    if not weights:
+        return 0.0
+    values = [weights.get(key, 0.0) for item in items for key in item_preference_keys(item)]
+    return sum(values) / len(values) if values else 0.0
@@ -0,0 +1,58 @@
+"""Canonical fingerprints for requests and inventories.
+
+Two payloads that describe the same request must hash to the same key no matter
+how the client ordered JSON fields, so everything is dumped through pydantic in
+JSON mode and re-serialised with sorted keys before hashing.
+"""
+import hashlib
+import json
+from typing import Any, Iterable, List, Optional, Sequence
+
+from pydantic import BaseModel, TypeAdapter
+
+from ..models.schemas import ClothingItem
+
+_INVENTORY = TypeAdapter(List[ClothingItem])
+
+
+def _canonical_json(data: Any) -> bytes:
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def model_fingerprint(model: BaseModel, exclude: Iterable[str] = ()) -> str:
+    """Return a stable sha256 hex digest for a pydantic model"""
+    data = model.model_dump(mode='json', exclude=set(exclude) or None)
+    return hashlib.sha256(_canonical_json(data)).hexdigest()
+
+
+def request_fingerprint(request: BaseModel) -> str:
+    """Fingerprint of a recommendation request used as the coalescing key"""
+    return model_fingerprint(request)
+
+
+def inventory_digest(items: Iterable[ClothingItem]) -> str:
+    """Order-insensitive digest of an inventory (including per-item state).
+
+    Uses pydantic's native JSON dump per item, which is several times faster
+    than the sorted-key canonical form; items only differing in the key order
+    of ``metadata`` then hash differently, which merely costs a cache miss.
+    """
+    hasher = hashlib.sha256()
+    for item_hash in sorted(hashlib.sha256(item.model_dump_json().encode('utf-8')).digest() for item in items):
+        hasher.update(item_hash)
+    return hasher.hexdigest()
+
+
+def inventory_key(items: Sequence[ClothingItem], version: Optional[str] = None) -> str:
+    """Cache key for indexes built over an inventory.
+
+    With a client-supplied ``version`` (which must change whenever the
+    inventory does) the key is the version plus the item count and first and
+    last ids, so it costs the same for any inventory size. Otherwise it is a digest of the whole list dumped in one
+    pydantic-core call; unlike ``inventory_digest`` it depends on item order,
+    which merely costs a cache miss for a reordered inventory.
+    """
+    if version is not None:
+        ends = (items[0].item_id, items[-1].item_id) if items else ()
+        return f"v:{version}:{len(items)}:{hash(ends)}"
+    return hashlib.blake2b(_INVENTORY.dump_json(list(items)), digest_size=16).hexdigest()
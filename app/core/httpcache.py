@@ -0,0 +1,185 @@
+"""HTTP caching helpers: recommendation ETags and content-hashed static assets.
+
+Recommendation ETags are derived from the request fingerprint, the sampling
+seed and the user's scoring state. The seed travels inside the tag
+(``"<seed>.<digest>"``), so a client revalidating an unseeded request can be
+answered from its own tag: the server is free to pick any seed, and picks the
+one the client already has. Matching is done without running the engine.
+
+``HashedStaticFiles`` serves the UI with every asset reference rewritten to a
+content-hashed name (``app.js`` -> ``app.1a2b3c4d5e.js``). Hashed names never
+change content, so they are cached for a year; entry points (``index.html``
+and the unhashed names) must be revalidated.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from .compression import ENCODING_ETAG_SUFFIXES
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+REWRITTEN_TYPES = ('.html', '.js', '.css')
+
+
+def parse_if_none_match(header: Optional[str]) -> Set[str]:
+    """Opaque tags listed in If-None-Match (weakness and encoding suffixes removed)"""
+    tags = set()
+    for part in (header or '').split(','):
+        tag = part.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for suffix in ENCODING_ETAG_SUFFIXES:
+            if tag.endswith(suffix):
+                tag = tag[:-len(suffix)]
+                break
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+def state_digest(state: Dict[str, float]) -> str:
+    """Digest of scoring state (e.g. a user's learned preference weights)"""
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def recommendation_etag(fingerprint: str, seed: int, state: str = '') -> str:
+    """Opaque tag (unquoted) for the outfits one request yields with one seed"""
+    digest = hashlib.sha256(f"{fingerprint}:{seed}:{state}".encode('utf-8')).hexdigest()[:32]
+    return f"{seed}.{digest}"
+
+
+def etag_seed(tag: str) -> Optional[int]:
+    """The seed carried by a recommendation tag, if it is one"""
+    seed, _, digest = tag.partition('.')
+    if not digest:
+        return None
+    try:
+        return int(seed)
+    except ValueError:
+        return None
+
+
+def matching_etag(tags: Iterable[str], fingerprint: str, state: str, seed: Optional[int] = None) -> Optional[str]:
+    """The client tag still valid for this request, if any.
+
+    With an explicit ``seed`` only that seed's tag matches; otherwise any
+    tag whose carried seed reproduces it does.
+    """
+    for tag in tags:
+        carried = etag_seed(tag)
+        if carried is None or (seed is not None and carried != seed):
+            continue
+        if recommendation_etag(fingerprint, carried, state) == tag:
+            return tag
+    return None
+
+
+class _Asset:
+    __slots__ = ('content', 'media_type', 'digest', 'hashed_name')
+
+    def __init__(self, name: str, content: bytes):
+        self.content = content
+        self.media_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.digest = hashlib.sha256(content).hexdigest()[:10]
+        stem, ext = os.path.splitext(name)
+        self.hashed_name = f"{stem}.{self.digest}{ext}"
+
+
+class HashedStaticFiles(StaticFiles):
+    """StaticFiles serving content-hashed asset names with long-lived caching.
+
+    References of the form ``<prefix>/<file>`` inside HTML, JS and CSS files
+    are rewritten to the hashed name of the referenced file (recursively, so
+    a changed leaf changes the names of everything pointing at it). The
+    table is rebuilt when a file in the directory changes.
+    """
+
+    def __init__(self, *, directory: str, prefix: str = '/ui', html: bool = True):
+        super().__init__(directory=directory, html=html)
+        self.prefix = prefix.rstrip('/')
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple] = None
+        self._assets: Dict[str, _Asset] = {}
+        self._hashed: Dict[str, str] = {}  # hashed name -> name
+
+    def _scan(self) -> Tuple:
+        entries = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path):
+                st = os.stat(path)
+                entries.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(entries)
+
+    def _build(self, names: Iterable[str]) -> None:
+        names = set(names)
+        reference = re.compile(re.escape(self.prefix) + r'/([\w.-]+)')
+        assets: Dict[str, _Asset] = {}
+
+        def build(name: str, visiting: Set[str]) -> _Asset:
+            if name in assets:
+                return assets[name]
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                content = f.read()
+            if name.endswith(REWRITTEN_TYPES):
+                visiting = visiting | {name}
+
+                def rewrite(match: 're.Match') -> str:
+                    target = match.group(1)
+                    if target not in names or target in visiting:
+                        return match.group(0)
+                    return f"{self.prefix}/{build(target, visiting).hashed_name}"
+
+                content = reference.sub(rewrite, content.decode('utf-8')).encode('utf-8')
+            assets[name] = _Asset(name, content)
+            return assets[name]
+
+        for name in names:
+            build(name, set())
+        self._assets = assets
+        self._hashed = {asset.hashed_name: name for name, asset in assets.items()}
+
+    def _refresh(self) -> None:
+        version = self._scan()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._build(name for name, _, _ in version)
+                    self._version = version
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope['method'] not in ('GET', 'HEAD'):
+            raise HTTPException(status_code=405)
+        self._refresh()
+        name = os.path.normpath(path).lstrip('/')
+        if name in ('', '.') and self.html:
+            if not scope['path'].endswith('/'):
+                return await super().get_response(path, scope)  # redirects to the trailing slash
+            name = 'index.html'
+        if name in self._hashed:
+            asset, cache_control = self._assets[self._hashed[name]], IMMUTABLE
+        elif name in self._assets:
+            asset, cache_control = self._assets[name], REVALIDATE
+        else:
+            return await super().get_response(path, scope)
+
+        etag = f'"{asset.digest}"'
+        headers = {'ETag': etag, 'Cache-Control': cache_control}
+        if etag.strip('"') in parse_if_none_match(Headers(scope=scope).get('if-none-match')):
+            return Response(status_code=304, headers=headers)
+        body = asset.content if scope['method'] == 'GET' else b''
+        response = Response(body, media_type=asset.media_type, headers=headers)
+        response.headers['Content-Length'] = str(len(asset.content))
+        return response
@@ -0,0 +1,391 @@
+"""
+Image ingestion: dominant colors and thumbnails for local item photos.
+
+Each photo is decoded once (Pillow), downsampled, clustered in CIE Lab with a
+small k-means, and the clusters are named after the nearest known color
+(``app.core.color``). A cluster that owns most of the image border is treated
+as the studio background and dropped. A thumbnail is written next to the
+analysis.
+
+Results are cached on disk by the SHA-256 of the image bytes, so a renamed or
+re-uploaded photo is not analysed twice, and a manifest of (size, mtime) per
+path lets re-ingests skip unchanged files without even reading them. Images
+are processed in a process pool; hashing and cache lookups happen in the
+workers too.
+
+Usage:
+    python -m app.core.images photos/ --inventory inventory.json --out enriched.json
+    python -m app.core.images photos/ --mode verify --workers 8
+
+With ``--inventory``, images are matched to items by ``metadata.image_path``
+or by file name (``<item_id>.jpg``). ``--mode fill`` sets ``color`` where it
+is missing or unrecognised; ``--mode verify`` only flags items whose color is
+not among the detected ones. Either way the analysis is stored under
+``metadata.image``.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from ..models.schemas import ClothingItem
+from . import config
+from .color import UNKNOWN, normalize_color
+
+logger = logging.getLogger(__name__)
+
+# Bump when the analysis changes so cached results are recomputed
+PIPELINE_VERSION = 1
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff'}
+ANALYSIS_SIZE = 64
+N_CLUSTERS = 4
+MIN_COLOR_SHARE = 0.08
+
+# Typical sRGB value for every named color in app.core.color
+REFERENCE_RGB: Dict[str, Tuple[int, int, int]] = {
+    'black': (20, 20, 20),
+    'charcoal': (54, 58, 64),
+    'gray': (128, 128, 128),
+    'silver': (192, 192, 192),
+    'white': (248, 248, 248),
+    'ivory': (255, 255, 240),
+    'cream': (255, 250, 210),
+    'beige': (225, 205, 170),
+    'khaki': (195, 176, 145),
+    'tan': (210, 180, 140),
+    'camel': (193, 154, 107),
+    'brown': (101, 67, 33),
+    'navy': (20, 30, 80),
+    'denim': (70, 95, 140),
+    'red': (200, 30, 30),
+    'burgundy': (128, 0, 32),
+    'maroon': (110, 20, 20),
+    'pink': (255, 182, 193),
+    'rose': (225, 100, 140),
+    'coral': (255, 127, 80),
+    'orange': (255, 140, 0),
+    'rust': (183, 65, 14),
+    'mustard': (225, 173, 1),
+    'gold': (212, 175, 55),
+    'yellow': (250, 220, 40),
+    'olive': (107, 112, 40),
+    'green': (40, 140, 60),
+    'mint': (170, 240, 200),
+    'emerald': (0, 120, 80),
+    'teal': (0, 128, 128),
+    'turquoise': (64, 224, 208),
+    'light_blue': (173, 216, 230),
+    'sky_blue': (135, 206, 235),
+    'blue': (30, 80, 200),
+    'cobalt': (0, 71, 171),
+    'purple': (110, 40, 150),
+    'lavender': (200, 180, 230),
+    'violet': (140, 70, 200),
+    'magenta': (220, 0, 160),
+}
+
+
+def _require_pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise RuntimeError("Image ingestion requires Pillow: pip install -r requirements.txt")
+    return Image, ImageOps
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """sRGB (0-255, ... x 3) to CIE Lab (D65)"""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = linear @ np.array([
+        [0.4124, 0.2126, 0.0193],
+        [0.3576, 0.7152, 0.1192],
+        [0.1805, 0.0722, 0.9505],
+    ]) / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+_REFERENCE_NAMES = list(REFERENCE_RGB)
+_REFERENCE_LAB = rgb_to_lab(np.array([REFERENCE_RGB[name] for name in _REFERENCE_NAMES]))
+
+
+def nearest_color_name(rgb: Sequence[float]) -> str:
+    distances = np.linalg.norm(_REFERENCE_LAB - rgb_to_lab(np.array(rgb)), axis=1)
+    return _REFERENCE_NAMES[int(np.argmin(distances))]
+
+
+def _kmeans(points: np.ndarray, k: int, iterations: int = 12) -> Tuple[np.ndarray, np.ndarray]:
+    """Deterministic k-means (k-means++ init with a fixed seed)"""
+    rng = np.random.default_rng(0)
+    centers = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        d = np.min(((points[:, None, :] - np.array(centers)[None]) ** 2).sum(-1), axis=1)
+        if d.sum() == 0:
+            break  # fewer distinct colors than clusters
+        centers.append(points[rng.choice(len(points), p=d / d.sum())])
+    centers = np.array(centers)
+    k = len(centers)
+    for _ in range(iterations):
+        labels = ((points[:, None, :] - centers[None]) ** 2).sum(-1).argmin(axis=1)
+        for j in range(k):
+            members = points[labels == j]
+            if len(members):
+                centers[j] = members.mean(axis=0)
+    labels = ((points[:, None, :] - centers[None]) ** 2).sum(-1).argmin(axis=1)
+    return centers, labels
+
+
+def dominant_colors(pixels: np.ndarray, n_clusters: int = N_CLUSTERS) -> List[Dict]:
+    """Named dominant colors of an ``H x W x 3`` RGB array, largest share first"""
+    height, width, _ = pixels.shape
+    rgb = pixels.reshape(-1, 3).astype(np.float64)
+    _, labels = _kmeans(rgb_to_lab(rgb), n_clusters)
+    labels = labels.reshape(height, width)
+
+    keep = np.ones(labels.max() + 1, dtype=bool)
+    border = np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]])
+    background = np.bincount(border).argmax()
+    # Drop the background only if the garment itself is still visible
+    if (border == background).mean() >= 0.6 and (labels != background).mean() >= 0.1:
+        keep[background] = False
+
+    kept = np.isin(labels, np.flatnonzero(keep))
+    colors: Dict[str, Dict] = {}
+    for cluster in np.flatnonzero(keep):
+        mask = labels == cluster
+        share = mask.sum() / kept.sum()
+        mean_rgb = rgb.reshape(height, width, 3)[mask].mean(axis=0)
+        name = nearest_color_name(mean_rgb)
+        entry = colors.setdefault(name, {'name': name, 'rgb': [0, 0, 0], 'share': 0.0})
+        # Clusters mapping to the same name are merged, weighting their RGB by share
+        total = entry['share'] + share
+        entry['rgb'] = [(entry['share'] * a + share * b) / total for a, b in zip(entry['rgb'], mean_rgb)]
+        entry['share'] = total
+    result = [
+        {'name': c['name'], 'rgb': [int(round(v)) for v in c['rgb']], 'share': round(float(c['share']), 3)}
+        for c in colors.values() if c['share'] >= MIN_COLOR_SHARE
+    ]
+    return sorted(result, key=lambda c: -c['share'])
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _cache_path(cache_dir: str, content_hash: str) -> Path:
+    return Path(cache_dir) / content_hash[:2] / f"{content_hash}.json"
+
+
+def analyze_image(path: str, cache_dir: str, thumbnail_dir: str, thumbnail_size: int = 256) -> Dict:
+    """Analyse one image (or return its cached analysis); runs in a worker process"""
+    try:
+        data = Path(path).read_bytes()
+        content_hash = hashlib.sha256(data).hexdigest()
+        cached = _cache_path(cache_dir, content_hash)
+        if cached.exists():
+            result = json.loads(cached.read_text())
+            if result.get('version') == PIPELINE_VERSION and result.get('thumbnail_size') == thumbnail_size:
+                return {**result, 'path': path, 'status': 'cached'}
+
+        Image, ImageOps = _require_pillow()
+        with Image.open(BytesIO(data)) as image:
+            width, height = image.size
+            # JPEGs can be decoded directly at a reduced scale, which is most of the cost
+            image.draft('RGB', (thumbnail_size, thumbnail_size))
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            image.thumbnail((thumbnail_size, thumbnail_size))
+            colors = dominant_colors(np.asarray(image.resize((ANALYSIS_SIZE, ANALYSIS_SIZE), Image.BILINEAR)))
+            buffer = BytesIO()
+            image.save(buffer, format='JPEG', quality=85)
+        thumbnail = Path(thumbnail_dir) / f"{content_hash}.jpg"
+        _atomic_write(thumbnail, buffer.getvalue())
+
+        result = {
+            'version': PIPELINE_VERSION,
+            'content_hash': content_hash,
+            'width': width,
+            'height': height,
+            'colors': colors,
+            'thumbnail': str(thumbnail),
+            'thumbnail_size': thumbnail_size,
+        }
+        _atomic_write(cached, json.dumps(result).encode('utf-8'))
+        return {**result, 'path': path, 'status': 'analyzed'}
+    except Exception as e:
+        return {'path': path, 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+
+
+def _analyze_job(job: Tuple[str, str, str, int]) -> Dict:
+    return analyze_image(*job)
+
+
+class ImageIngestor:
+    def __init__(
+        self,
+        cache_dir: str = config.IMAGE_CACHE_DIR,
+        thumbnail_dir: str = config.THUMBNAIL_DIR,
+        workers: int = config.IMAGE_WORKERS,
+        thumbnail_size: int = 256
+    ):
+        self.cache_dir = cache_dir
+        self.thumbnail_dir = thumbnail_dir
+        self.workers = workers
+        self.thumbnail_size = thumbnail_size
+        self.manifest_path = Path(cache_dir) / 'manifest.json'
+
+    def _load_manifest(self) -> Dict[str, List]:
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text())
+        return {}
+
+    def ingest(self, paths: Iterable[str]) -> Dict[str, Dict]:
+        """Analysis per path; unchanged files are answered from the cache.
+
+        ``workers=0`` runs in-process (useful for tests and tiny batches).
+        """
+        manifest = self._load_manifest()
+        results: Dict[str, Dict] = {}
+        pending: List[str] = []
+        for path in dict.fromkeys(str(Path(p).resolve()) for p in paths):
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                results[path] = {'path': path, 'status': 'error', 'error': str(e)}
+                continue
+            entry = manifest.get(path)
+            if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+                cached = _cache_path(self.cache_dir, entry[2])
+                if cached.exists():
+                    result = json.loads(cached.read_text())
+                    if result.get('version') == PIPELINE_VERSION and result.get('thumbnail_size') == self.thumbnail_size:
+                        results[path] = {**result, 'path': path, 'status': 'unchanged'}
+                        continue
+            pending.append(path)
+
+        jobs = [(path, self.cache_dir, self.thumbnail_dir, self.thumbnail_size) for path in pending]
+        if self.workers == 0 or len(jobs) <= 1:
+            analysed = [_analyze_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                chunksize = max(1, len(jobs) // (self.workers * 4))
+                analysed = list(executor.map(_analyze_job, jobs, chunksize=chunksize))
+        for result in analysed:
+            results[result['path']] = result
+            if result['status'] != 'error':
+                stat = os.stat(result['path'])
+                manifest[result['path']] = [stat.st_size, stat.st_mtime_ns, result['content_hash']]
+
+        _atomic_write(self.manifest_path, json.dumps(manifest).encode('utf-8'))
+        return results
+
+
+def apply_to_items(
+    items: Sequence[ClothingItem],
+    results: Dict[str, Dict],
+    image_paths: Dict[str, str],
+    mode: str = 'fill'
+) -> List[ClothingItem]:
+    """Copies of the items with image analysis applied.
+
+    ``image_paths`` maps item_id to a path in ``results``. In ``fill`` mode a
+    missing or unrecognised ``color`` is replaced by the dominant color; in
+    ``verify`` mode the color is kept and ``metadata.image.color_matches``
+    records whether it is among the detected colors.
+    """
+    updated = []
+    for item in items:
+        result = results.get(image_paths.get(item.item_id, ''))
+        if not result or result['status'] == 'error' or not result['colors']:
+            updated.append(item)
+            continue
+        detected = [c['name'] for c in result['colors']]
+        declared = normalize_color(item.color)
+        info = {
+            'content_hash': result['content_hash'],
+            'thumbnail': result['thumbnail'],
+            'dominant_colors': result['colors'],
+            'color_matches': declared in detected,
+        }
+        update = {'metadata': {**item.metadata, 'image': info}}
+        if mode == 'fill' and declared == UNKNOWN:
+            update['color'] = detected[0]
+            info['color_matches'] = True
+        updated.append(item.model_copy(update=update))
+    return updated
+
+
+def _image_files(paths: Sequence[str]) -> List[str]:
+    files = []
+    for path in paths:
+        p = Path(path)
+        if p.is_dir():
+            files += [str(f) for f in sorted(p.rglob('*')) if f.suffix.lower() in IMAGE_EXTENSIONS]
+        else:
+            files.append(str(p))
+    return files
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='image files or directories')
+    parser.add_argument('--inventory', help='JSON list of ClothingItem to enrich')
+    parser.add_argument('--out', help='where to write the enriched inventory (default: stdout)')
+    parser.add_argument('--mode', choices=['fill', 'verify'], default='fill')
+    parser.add_argument('--workers', type=int, default=config.IMAGE_WORKERS)
+    parser.add_argument('--cache-dir', default=config.IMAGE_CACHE_DIR)
+    parser.add_argument('--thumbnails', default=config.THUMBNAIL_DIR, help='thumbnail output directory')
+    parser.add_argument('--thumbnail-size', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    files = _image_files(args.paths)
+    ingestor = ImageIngestor(args.cache_dir, args.thumbnails, args.workers, args.thumbnail_size)
+    results = ingestor.ingest(files)
+    counts: Dict[str, int] = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        if result['status'] == 'error':
+            logger.warning(f"{result['path']}: {result['error']}")
+    logger.info(f"Processed {len(results)} images: {counts}")
+
+    if not args.inventory:
+        output = [{k: v for k, v in r.items() if k != 'version'} for r in results.values()]
+    else:
+        with open(args.inventory) as f:
+            items = [ClothingItem(**item) for item in json.load(f)]
+        by_stem = {Path(path).stem: path for path in results}
+        image_paths = {}
+        for item in items:
+            explicit = item.metadata.get('image_path')
+            if explicit:
+                image_paths[item.item_id] = str(Path(explicit).resolve())
+            elif item.item_id in by_stem:
+                image_paths[item.item_id] = by_stem[item.item_id]
+        items = apply_to_items(items, results, image_paths, args.mode)
+        mismatched = [i.item_id for i in items if not i.metadata.get('image', {}).get('color_matches', True)]
+        if mismatched:
+            logger.warning(f"{len(mismatched)} items' color does not match their photo: {mismatched[:20]}")
+        output = [item.model_dump(mode='json') for item in items]
+
+    text = json.dumps(output, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
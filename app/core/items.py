@@ -0,0 +1,233 @@
+"""Content-addressed item table shared by every wardrobe.
+
+Catalog-backed deployments see the same retail SKU in many wardrobes. Items
+are split into the immutable garment attributes (type, name, brand, color,
+pattern, material, size, style, suitability, image) and a thin per-owner
+overlay (``item_id``, ``last_worn``, ``is_clean``, ``metadata``). The garment
+part is hashed and interned once in the process-wide ``ItemTable`` under a
+small integer id. A ``Wardrobe`` is an id array plus overlays, and
+``canonicalize`` rebuilds request items so that the field values of equal
+garments are the same objects. The per-request copies can then be freed, and
+anything derived from the garment alone (tags, embedding rows) is computed
+once per canonical id instead of once per owner.
+
+Canonical field values are shared, so they must be treated as read-only. No
+code mutates an item's lists in place; use ``model_copy(update=...)``.
+"""
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.schemas import ClothingItem
+from . import config
+from . import tags as garment_tags
+
+GARMENT_FIELDS = (
+    'item_type', 'name', 'brand', 'color', 'pattern', 'material', 'size',
+    'style', 'weather_suitability', 'occasion_suitability', 'image_url',
+)
+OVERLAY_FIELDS = ('item_id', 'last_worn', 'is_clean', 'metadata')
+# Materialized items set every field; one set object is shared by all of them (pydantic copies it on model_copy)
+_FIELDS_SET = set(GARMENT_FIELDS + OVERLAY_FIELDS)
+
+
+def garment_hash(item: ClothingItem) -> str:
+    """Hash of every attribute that is the same for all owners of a garment"""
+    parts = []
+    for name in GARMENT_FIELDS:
+        value = getattr(item, name)
+        if isinstance(value, list):
+            value = '\x1e'.join(getattr(v, 'value', v) for v in value)
+        parts.append(str(getattr(value, 'value', value) if value is not None else ''))
+    return hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ItemOverlay:
+    """Per-owner state of a canonical item"""
+    __slots__ = OVERLAY_FIELDS
+
+    def __init__(self, item_id: str, last_worn=None, is_clean: bool = True, metadata: Optional[Dict[str, Any]] = None):
+        self.item_id = item_id
+        self.last_worn = last_worn
+        self.is_clean = is_clean
+        self.metadata = metadata if metadata is not None else {}
+
+    @classmethod
+    def of(cls, item: ClothingItem) -> 'ItemOverlay':
+        return cls(item.item_id, item.last_worn, item.is_clean, item.metadata)
+
+
+class ItemTable:
+    """Table of canonical garments addressed by integer id.
+
+    Garments held by a ``Wardrobe`` are pinned. The others (interned from
+    request inventories) are kept for reuse in least-recently-interned order,
+    at most ``capacity`` of them; evicting one drops its derived values too.
+    Ids are never reused, so items still carrying an evicted id are simply
+    no longer canonical.
+    """
+
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self._ids: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}
+        self._garments: Dict[int, Dict[str, Any]] = {}
+        self._pins: Dict[int, int] = {}
+        self._unpinned: 'OrderedDict[int, None]' = OrderedDict()
+        self._derived: Dict[Hashable, Dict[int, Any]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.shared = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._garments)
+
+    def _intern(self, item: ClothingItem, pin: bool) -> Tuple[int, Dict[str, Any]]:
+        key = garment_hash(item)
+        with self._lock:
+            self.lookups += 1
+            cid = self._ids.get(key)
+            if cid is not None:
+                self.shared += 1
+            else:
+                cid = self._next_id
+                self._next_id += 1
+                self._ids[key] = cid
+                self._keys[cid] = key
+                self._garments[cid] = {name: getattr(item, name) for name in GARMENT_FIELDS}
+            if pin:
+                self._pins[cid] = self._pins.get(cid, 0) + 1
+                self._unpinned.pop(cid, None)
+            elif cid not in self._pins:
+                self._unpinned[cid] = None
+                self._unpinned.move_to_end(cid)
+            garment = self._garments[cid]
+            self._evict()
+            return cid, garment
+
+    def intern(self, item: ClothingItem, pin: bool = False) -> int:
+        """Canonical id of the item's garment, adding it on first sight.
+
+        A pinned id stays in the table until ``release`` is called for it.
+        """
+        return self._intern(item, pin)[0]
+
+    def release(self, ids: Iterable[int]) -> None:
+        """Drop one pin from each id; unpinned garments become evictable"""
+        with self._lock:
+            for cid in ids:
+                cid = int(cid)
+                count = self._pins.get(cid, 0) - 1
+                if count > 0:
+                    self._pins[cid] = count
+                elif cid in self._pins:
+                    del self._pins[cid]
+                    self._unpinned[cid] = None
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._unpinned) > self.capacity:
+            cid, _ = self._unpinned.popitem(last=False)
+            del self._ids[self._keys.pop(cid)]
+            del self._garments[cid]
+            for values in self._derived.values():
+                values.pop(cid, None)
+            self.evicted += 1
+
+    def garment(self, cid: int) -> Dict[str, Any]:
+        return self._garments[cid]
+
+    def canonical_id(self, item: ClothingItem) -> Optional[int]:
+        """The item's canonical id if it still shares its garment values.
+
+        ``model_copy`` keeps the id, so a copy with a changed garment
+        attribute is caught by an identity check on the shared values.
+        """
+        cid = item._canonical_id
+        garment = self._garments.get(cid) if cid is not None else None
+        if garment is not None and all(getattr(item, name) is garment[name] for name in GARMENT_FIELDS):
+            return cid
+        return None
+
+    def materialize(self, cid: int, overlay: ItemOverlay) -> ClothingItem:
+        """A ClothingItem sharing the canonical garment values (no validation)"""
+        return self._materialize(cid, self._garments[cid], overlay)
+
+    def _materialize(self, cid: int, garment: Dict[str, Any], overlay: ItemOverlay) -> ClothingItem:
+        item = ClothingItem.model_construct(
+            **garment,
+            item_id=overlay.item_id,
+            last_worn=overlay.last_worn,
+            is_clean=overlay.is_clean,
+            metadata=overlay.metadata,
+            _fields_set=_FIELDS_SET
+        )
+        item._canonical_id = cid
+        # Tags depend on the garment only, so they are extracted once per canonical id
+        tags = self.derived('tags', cid, lambda: garment_tags.extract_tags(item.name))
+        item._garment_tags = (item.name, tags)
+        return item
+
+    def canonicalize(self, items: Sequence[ClothingItem]) -> List[ClothingItem]:
+        """Equivalent items whose garment attributes are shared with every other owner"""
+        canonical = []
+        for item in items:
+            if self.canonical_id(item) is None:
+                cid, garment = self._intern(item, pin=False)
+                item = self._materialize(cid, garment, ItemOverlay.of(item))
+            canonical.append(item)
+        return canonical
+
+    def derived(self, kind: Hashable, cid: int, build: Callable[[], Any]) -> Any:
+        """Per-garment value (e.g. tags, an embedding row) computed once per canonical id"""
+        values = self._derived.setdefault(kind, {})
+        value = values.get(cid)
+        if value is None:
+            value = build()
+            with self._lock:
+                # Not kept for a garment evicted meanwhile
+                if cid in self._garments:
+                    values[cid] = value
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'garments': len(self._garments),
+            'pinned': len(self._pins),
+            'lookups': self.lookups,
+            'shared': self.shared,
+            'evicted': self.evicted,
+        }
+
+
+class Wardrobe:
+    """One owner's items as canonical ids plus overlays"""
+    __slots__ = ('table', 'ids', 'overlays', '__weakref__')
+
+    def __init__(self, table: ItemTable, ids: np.ndarray, overlays: List[ItemOverlay]):
+        """Takes over one pin of each id; they are released when the wardrobe is freed"""
+        self.table = table
+        self.ids = ids
+        self.overlays = overlays
+        weakref.finalize(self, table.release, ids)
+
+    @classmethod
+    def from_items(cls, table: ItemTable, items: Sequence[ClothingItem]) -> 'Wardrobe':
+        ids = np.fromiter((table.intern(item, pin=True) for item in items), dtype=np.int32, count=len(items))
+        return cls(table, ids, [ItemOverlay.of(item) for item in items])
+
+    def __len__(self) -> int:
+        return len(self.overlays)
+
+    def items(self) -> List[ClothingItem]:
+        return [self.table.materialize(int(cid), overlay) for cid, overlay in zip(self.ids, self.overlays)]
+
+
+# Process-wide table shared by every request, session and index
+item_table = ItemTable(config.ITEM_TABLE_SIZE)
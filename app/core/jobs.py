@@ -0,0 +1,317 @@
+"""Persistent background jobs for bulk recommendation work.
+
+A job is a sequence of input records (a JSONL file: either a local path given
+at submit time or a copy of an inline payload) handled one at a time by a
+small pool of worker threads. Each job has its own directory holding
+``job.json`` (status and checkpoint) and ``results.jsonl`` (one line per
+input record, in input order). Results are appended and flushed as they are
+produced and the checkpoint is rewritten atomically every few records, so
+after a restart a job resumes at its last complete result line: the lines
+written after the checkpoint are recounted and a torn final line is cut off.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ..models.schemas import JobInfo, JobStatus
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_EVERY = 20
+UNFINISHED = (JobStatus.QUEUED, JobStatus.RUNNING)
+FINISHED = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobManager:
+    def __init__(
+        self,
+        root: str,
+        handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+        workers: int = 2,
+        checkpoint_every: int = CHECKPOINT_EVERY,
+        input_root: Optional[str] = None
+    ):
+        """``handler`` turns one input record into its result payload; an
+        exception fails that record only. Input paths are resolved against
+        ``input_root`` and must lie under it; without one, only inline
+        records are accepted.
+        """
+        self.root = root
+        self.handler = handler
+        self.workers = workers
+        self.checkpoint_every = checkpoint_every
+        self.input_root = os.path.realpath(input_root) if input_root else None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._line_offsets: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._active: Set[str] = set()
+        self._load()
+
+    # -- persistence ---------------------------------------------------------
+
+    def _dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def _results_path(self, job_id: str) -> str:
+        return os.path.join(self._dir(job_id), 'results.jsonl')
+
+    def _load(self) -> None:
+        if not os.path.isdir(self.root):
+            return
+        for job_id in sorted(os.listdir(self.root)):
+            path = os.path.join(self._dir(job_id), 'job.json')
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._jobs[job_id] = json.load(f)
+
+    def _save(self, job_id: str) -> None:
+        state = self._jobs[job_id]
+        state['updated_at'] = datetime.utcnow().isoformat()
+        path = os.path.join(self._dir(job_id), 'job.json')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    # -- public API ----------------------------------------------------------
+
+    def submit(self, records: Optional[Sequence[Dict[str, Any]]] = None, input_path: Optional[str] = None) -> JobInfo:
+        """Queue a job over inline ``records`` or the JSONL file at ``input_path``"""
+        if (records is None) == (input_path is None):
+            raise ValueError("Provide exactly one of inline records or input_path")
+        # Before registering the job, so start() does not requeue it as a leftover
+        self.start()
+        job_id = uuid.uuid4().hex
+        os.makedirs(self._dir(job_id), exist_ok=True)
+        if records is not None:
+            input_path = os.path.join(self._dir(job_id), 'input.jsonl')
+            with open(input_path, 'w') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+            total = len(records)
+        else:
+            input_path = self._check_input_path(input_path)
+            total = None  # counted when the job starts
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': JobStatus.QUEUED.value,
+                'total': total,
+                'completed': 0,
+                'failed': 0,
+                'created_at': now,
+                'updated_at': now,
+                'error': None,
+                'input_path': input_path,
+                'results_offset': 0,
+            }
+            self._save(job_id)
+        self._queue.put(job_id)
+        logger.info(f"Queued job {job_id} ({total if total is not None else 'file'} records)")
+        return self.info(job_id)
+
+    def _check_input_path(self, input_path: str) -> str:
+        if self.input_root is None:
+            raise ValueError("input_path is disabled; set an input root to submit files")
+        path = os.path.realpath(os.path.join(self.input_root, input_path))
+        if os.path.commonpath([path, self.input_root]) != self.input_root:
+            raise ValueError(f"input_path must be under {self.input_root}")
+        if not os.path.isfile(path):
+            raise ValueError(f"input_path not found: {input_path}")
+        return path
+
+    def info(self, job_id: str) -> JobInfo:
+        with self._lock:
+            state = self._jobs.get(job_id)
+            if state is None:
+                raise KeyError(job_id)
+            return JobInfo.model_validate(state)
+
+    def list_jobs(self) -> List[JobInfo]:
+        with self._lock:
+            return [JobInfo.model_validate(state) for state in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> JobInfo:
+        """Stop a queued or running job after its current record"""
+        with self._lock:
+            state = self._jobs.get(job_id)
+            if state is None:
+                raise KeyError(job_id)
+            if JobStatus(state['status']) in UNFINISHED:
+                state['status'] = JobStatus.CANCELLED.value
+                self._save(job_id)
+        return self.info(job_id)
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> Tuple[List[Dict[str, Any]], JobInfo]:
+        """Result lines ``offset .. offset + limit`` written so far"""
+        info = self.info(job_id)
+        path = self._results_path(job_id)
+        if not os.path.exists(path):
+            return [], info
+        with self._lock:
+            offsets = self._index_lines(job_id, path)
+            if offset >= len(offsets) - 1:
+                return [], info
+            start, end = offsets[offset], offsets[min(offset + limit, len(offsets) - 1)]
+        with open(path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return [json.loads(line) for line in data.splitlines()], info
+
+    def _index_lines(self, job_id: str, path: str) -> List[int]:
+        """Byte offset of every complete result line plus the end of the last.
+
+        Extended incrementally, so paging through a large result file is not
+        quadratic.
+        """
+        offsets = self._line_offsets.setdefault(job_id, [0])
+        with open(path, 'rb') as f:
+            f.seek(offsets[-1])
+            position = offsets[-1]
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                position += len(line)
+                offsets.append(position)
+        return offsets
+
+    def stream(self, job_id: str, offset: int = 0, follow: bool = True, poll_interval: float = 0.2) -> Iterator[bytes]:
+        """Result lines from ``offset`` as NDJSON, waiting for new ones until the job finishes"""
+        while True:
+            lines, info = self.results(job_id, offset, limit=500)
+            for line in lines:
+                yield (json.dumps(line) + '\n').encode('utf-8')
+            offset += len(lines)
+            if lines:
+                continue
+            if not follow or info.status in FINISHED:
+                return
+            time.sleep(poll_interval)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {status.value: 0 for status in JobStatus}
+            for state in self._jobs.values():
+                counts[state['status']] += 1
+        counts['workers'] = sum(thread.is_alive() for thread in self._threads)
+        return counts
+
+    # -- workers -------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker threads (once) and requeue jobs left unfinished by a previous run"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            pending = [
+                job_id for job_id, state in sorted(self._jobs.items(), key=lambda kv: kv[1]['created_at'])
+                if JobStatus(state['status']) in UNFINISHED
+            ]
+        for job_id in pending:
+            logger.info(f"Resuming job {job_id} from record {self._jobs[job_id]['completed']}")
+            self._queue.put(job_id)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current record; unfinished jobs resume on the next start"""
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+                with self._lock:
+                    self._active.discard(job_id)
+                    self._jobs[job_id].update(status=JobStatus.FAILED.value, error=f"{type(e).__name__}: {e}")
+                    self._save(job_id)
+
+    def _recover(self, job_id: str) -> None:
+        """Count result lines written after the checkpoint and cut off a torn last line"""
+        state = self._jobs[job_id]
+        path = self._results_path(job_id)
+        if not os.path.exists(path):
+            return
+        position = state['results_offset']
+        with open(path, 'rb') as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                state['completed'] += 1
+                state['failed'] += 'error' in json.loads(line)
+                position += len(line)
+        if position != os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(position)
+        state['results_offset'] = position
+        self._line_offsets.pop(job_id, None)
+
+    def _run(self, job_id: str) -> None:
+        with self._lock:
+            state = self._jobs[job_id]
+            if JobStatus(state['status']) not in UNFINISHED or job_id in self._active:
+                return
+            self._active.add(job_id)
+            self._recover(job_id)
+            if state['total'] is None:
+                with open(state['input_path'], 'rb') as f:
+                    state['total'] = sum(1 for line in f if line.strip())
+            state['status'] = JobStatus.RUNNING.value
+            self._save(job_id)
+            skip = state['completed']
+
+        since_checkpoint = 0
+        with open(state['input_path']) as source, open(self._results_path(job_id), 'ab') as results:
+            records = (line for line in source if line.strip())
+            for index, line in enumerate(records):
+                if index < skip:
+                    continue
+                if self._stopping.is_set() or JobStatus(state['status']) is JobStatus.CANCELLED:
+                    break
+                try:
+                    result = {'index': index, **self.handler(json.loads(line))}
+                except Exception as e:
+                    result = {'index': index, 'error': f"{type(e).__name__}: {e}"}
+                data = (json.dumps(result) + '\n').encode('utf-8')
+                results.write(data)
+                results.flush()
+                with self._lock:
+                    state['completed'] += 1
+                    state['failed'] += 'error' in result
+                    state['results_offset'] += len(data)
+                    since_checkpoint += 1
+                    if since_checkpoint >= self.checkpoint_every:
+                        os.fsync(results.fileno())
+                        self._save(job_id)
+                        since_checkpoint = 0
+
+        with self._lock:
+            self._active.discard(job_id)
+            if JobStatus(state['status']) is JobStatus.RUNNING and state['completed'] >= state['total']:
+                state['status'] = JobStatus.COMPLETED.value
+                logger.info(f"Job {job_id} completed: {state['completed']} records, {state['failed']} failed")
+            self._save(job_id)
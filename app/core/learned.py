@@ -0,0 +1,164 @@
+"""Optional learned compatibility scorer.
+
+Items are embedded once per request into hashed feature vectors (type, color,
+material, style, occasion and weather suitability, plus type-qualified
+crosses). An outfit's features are the mean of its item vectors plus a few
+request-level context features, so featurizing every candidate of a request
+is one sparse-incidence matrix product. The model is a logistic regression
+stored as plain NumPy arrays, so serving does not need scikit-learn; only the
+offline trainer (``python -m app.core.train_scorer``) does.
+"""
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..models.schemas import ClothingItem, OccasionInfo, UserInfo
+from .color import normalize_color
+
+FEATURE_VERSION = 1
+DEFAULT_DIM = 512
+CONTEXT_FEATURES = 6
+
+# Feedback events treated as positive / negative training labels
+POSITIVE_EVENTS = {'liked', 'worn'}
+NEGATIVE_EVENTS = {'skipped', 'disliked'}
+
+
+def _enum_value(x) -> str:
+    try:
+        return x.value
+    except AttributeError:
+        return str(x)
+
+
+def _bucket(token: str, dim: int) -> int:
+    # crc32 is stable across processes, unlike the builtin hash()
+    return zlib.crc32(token.encode('utf-8')) % dim
+
+
+class OutfitFeatureExtractor:
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+
+    @property
+    def n_features(self) -> int:
+        return self.dim + CONTEXT_FEATURES
+
+    def item_tokens(self, item: ClothingItem) -> List[str]:
+        item_type = _enum_value(item.item_type)
+        color = normalize_color(item.color)
+        material = (item.material or '').lower()
+        tokens = [
+            f"type={item_type}",
+            f"color={color}",
+            f"material={material}",
+            f"{item_type}:color={color}",
+            f"{item_type}:material={material}",
+        ]
+        tokens += [f"style={s.lower()}" for s in item.style]
+        tokens += [f"{item_type}:style={s.lower()}" for s in item.style]
+        tokens += [f"occasion={_enum_value(o)}" for o in item.occasion_suitability]
+        tokens += [f"weather={_enum_value(w)}" for w in item.weather_suitability]
+        if item.pattern:
+            tokens.append(f"pattern={item.pattern.lower()}")
+        return tokens
+
+    def item_matrix(self, items: Sequence[ClothingItem]) -> np.ndarray:
+        """Hashed bag-of-attributes vector for each item (rows L2-normalised)"""
+        matrix = np.zeros((len(items), self.dim), dtype=np.float32)
+        for row, item in enumerate(items):
+            for token in self.item_tokens(item):
+                matrix[row, _bucket(token, self.dim)] += 1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-6)
+
+    def transform(
+        self,
+        candidates: Sequence[Sequence[ClothingItem]],
+        user_info: Optional[UserInfo],
+        occasion: OccasionInfo,
+        palette_scores: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Feature matrix (one row per candidate outfit)"""
+        # Embed each distinct item once, then average rows through an incidence matrix
+        positions: Dict[int, int] = {}
+        unique_items: List[ClothingItem] = []
+        rows, cols = [], []
+        for r, items in enumerate(candidates):
+            for item in items:
+                key = id(item)
+                if key not in positions:
+                    positions[key] = len(unique_items)
+                    unique_items.append(item)
+                rows.append(r)
+                cols.append(positions[key])
+        if not candidates:
+            return np.zeros((0, self.n_features), dtype=np.float32)
+
+        incidence = np.zeros((len(candidates), len(unique_items)), dtype=np.float32)
+        np.add.at(incidence, (np.array(rows), np.array(cols)), 1.0)
+        counts = np.maximum(incidence.sum(axis=1, keepdims=True), 1.0)
+        outfit_vectors = (incidence @ self.item_matrix(unique_items)) / counts
+
+        # Per-item context flags, combined through the same incidence matrix
+        occasion_value = _enum_value(occasion.occasion_type)
+        weather_value = _enum_value(occasion.weather)
+        preferred_colors = {c.lower() for c in (user_info.color_preferences if user_info else [])}
+        preferred_styles = {s.lower() for s in (user_info.style_preferences if user_info else [])}
+        flags = np.array([
+            [
+                any(_enum_value(o) == occasion_value for o in item.occasion_suitability),
+                any(_enum_value(w) == weather_value for w in item.weather_suitability),
+                item.color.lower() in preferred_colors,
+                any(s.lower() in preferred_styles for s in item.style),
+            ]
+            for item in unique_items
+        ], dtype=np.float32)
+        context = np.zeros((len(candidates), CONTEXT_FEATURES), dtype=np.float32)
+        context[:, :4] = (incidence @ flags) / counts
+        context[:, 4] = counts[:, 0] / 5.0
+        context[:, 5] = 1.0 if palette_scores is None else palette_scores
+        return np.hstack([outfit_vectors, context])
+
+
+class LearnedScorer:
+    def __init__(self, weights: np.ndarray, bias: float, dim: int = DEFAULT_DIM):
+        self.extractor = OutfitFeatureExtractor(dim)
+        if weights.shape != (self.extractor.n_features,):
+            raise ValueError(f"Expected {self.extractor.n_features} weights, got {weights.shape}")
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Probability that each outfit is a good match"""
+        return 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+
+    def score(
+        self,
+        candidates: Sequence[Sequence[ClothingItem]],
+        user_info: Optional[UserInfo],
+        occasion: OccasionInfo,
+        palette_scores: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Score every candidate outfit of a request in one batch"""
+        if not candidates:
+            return np.zeros(0, dtype=np.float32)
+        return self.predict(self.extractor.transform(candidates, user_info, occasion, palette_scores))
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            weights=self.weights,
+            bias=np.array(self.bias),
+            dim=np.array(self.extractor.dim),
+            version=np.array(FEATURE_VERSION),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'LearnedScorer':
+        data = np.load(path)
+        version = int(data['version'])
+        if version != FEATURE_VERSION:
+            raise ValueError(f"Model {path} uses feature version {version}, expected {FEATURE_VERSION}")
+        return cls(weights=data['weights'], bias=float(data['bias']), dim=int(data['dim']))
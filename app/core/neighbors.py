@@ -0,0 +1,141 @@
+"""Per-item compatibility neighbor lists for "complete the look".
+
+For a filtered inventory and occasion, every item gets a ranked list of its
+most compatible partners in each clothing slot. Pair scores combine the color
+harmony table, style overlap and shared occasion suitability; pairs that break
+the formal/casual rule are excluded outright. The lists are built once in
+row blocks (bounded memory) and cached, so completing a look from an anchor
+only walks a few short arrays.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..models.schemas import ClothingItem, ClothingType, OccasionInfo
+from .color import normalize_color
+
+COLOR_WEIGHT = 0.6
+STYLE_WEIGHT = 0.3
+OCCASION_WEIGHT = 0.1
+BLOCK_SIZE = 512
+
+
+class CompatibilityIndex:
+    def __init__(
+        self,
+        items: Sequence[ClothingItem],
+        engine,
+        occasion: OccasionInfo,
+        max_neighbors: int = 25
+    ):
+        weather = engine._enum_value(occasion.weather)
+        occasion_value = engine._enum_value(occasion.occasion_type)
+        self.engine = engine
+        self.occasion = occasion
+        # Items that can never be worn in this weather are left out entirely
+        self.items: List[ClothingItem] = [
+            item for item in items if engine._is_item_weather_appropriate(item, weather)
+        ]
+        self.position: Dict[str, int] = {item.item_id: i for i, item in enumerate(self.items)}
+        harmony = engine.color_harmony
+
+        self._colors = np.array(
+            [harmony.index[normalize_color(item.color)] for item in self.items], dtype=np.int32
+        )
+        vocabulary = sorted({s.lower() for item in self.items for s in item.style})
+        style_pos = {s: i for i, s in enumerate(vocabulary)}
+        self._styles = np.zeros((len(self.items), max(len(vocabulary), 1)), dtype=np.float32)
+        for row, item in enumerate(self.items):
+            for s in item.style:
+                self._styles[row, style_pos[s.lower()]] = 1.0
+        self._style_counts = self._styles.sum(axis=1)
+        self._formal = np.array(['formal' in item.style for item in self.items])
+        self._casual = np.array(['casual' in item.style for item in self.items])
+        self._occasion_match = np.array([
+            any(engine._enum_value(o) == occasion_value for o in item.occasion_suitability)
+            for item in self.items
+        ], dtype=np.float32)
+        self._color_table = harmony.table
+
+        self.type_members: Dict[ClothingType, np.ndarray] = {}
+        for item_type in ClothingType:
+            members = [i for i, item in enumerate(self.items) if item.item_type == item_type]
+            if members:
+                self.type_members[item_type] = np.array(members, dtype=np.int32)
+
+        self.neighbors: List[Dict[ClothingType, np.ndarray]] = [dict() for _ in self.items]
+        self._build(max_neighbors)
+
+    def pair_scores(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Compatibility of every (row, col) item pair; -inf where incompatible"""
+        color = self._color_table[self._colors[rows][:, None], self._colors[cols][None, :]]
+        overlap = self._styles[rows] @ self._styles[cols].T
+        union = self._style_counts[rows][:, None] + self._style_counts[cols][None, :] - overlap
+        style = np.where(union > 0, overlap / np.maximum(union, 1.0), 0.0)
+        occasion = self._occasion_match[rows][:, None] * self._occasion_match[cols][None, :]
+        scores = COLOR_WEIGHT * color + STYLE_WEIGHT * style + OCCASION_WEIGHT * occasion
+        clash = (
+            (self._formal[rows][:, None] & self._casual[cols][None, :])
+            | (self._casual[rows][:, None] & self._formal[cols][None, :])
+        )
+        scores = np.where(clash, -np.inf, scores)
+        scores[rows[:, None] == cols[None, :]] = -np.inf
+        return scores
+
+    def _build(self, max_neighbors: int) -> None:
+        n = len(self.items)
+        for start in range(0, n, BLOCK_SIZE):
+            rows = np.arange(start, min(start + BLOCK_SIZE, n))
+            for item_type, members in self.type_members.items():
+                block = self.pair_scores(rows, members)
+                k = min(max_neighbors, len(members))
+                top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+                for r, row in enumerate(rows):
+                    candidates = top[r][np.argsort(-block[r, top[r]], kind='stable')]
+                    candidates = candidates[np.isfinite(block[r, candidates])]
+                    self.neighbors[row][item_type] = members[candidates]
+
+    def complete(
+        self,
+        anchor_id: str,
+        slots: Sequence[ClothingType],
+        optional_slots: Sequence[ClothingType] = (),
+        suggestions_per_slot: int = 3
+    ) -> Optional[Dict]:
+        """Best partner items for an anchor.
+
+        Returns ``{'outfit': [...items], 'suggestions': {slot: [...items]}}``
+        where the outfit fills the required slots only (``None`` if no valid
+        outfit could be assembled), or ``None`` when the anchor itself is not
+        usable for this occasion/weather.
+        """
+        anchor = self.position.get(anchor_id)
+        if anchor is None:
+            return None
+        chosen = [anchor]
+        suggestions: Dict[ClothingType, List[ClothingItem]] = {}
+
+        for slot in list(slots) + list(optional_slots):
+            candidates = self.neighbors[anchor].get(slot)
+            if candidates is None or not len(candidates):
+                continue
+            # Rank the anchor's neighbors by fit with everything chosen so far
+            total = self.pair_scores(np.array(chosen), candidates).sum(axis=0)
+            ranked = np.argsort(-total, kind='stable')
+            ranked = ranked[np.isfinite(total[ranked])]
+            order = [int(c) for c in candidates[ranked]]
+            suggestions[slot] = [self.items[c] for c in order[:suggestions_per_slot]]
+            if slot in optional_slots:
+                continue
+
+            # Required slots are filled with the best partner that keeps the palette valid
+            colors = [self.items[c].color for c in chosen]
+            for c in order:
+                if self.engine._check_color_compatibility(colors + [self.items[c].color]):
+                    chosen.append(c)
+                    break
+
+        outfit = [self.items[c] for c in chosen]
+        if not self.engine._is_valid_outfit(outfit, self.occasion):
+            outfit = None
+        return {'outfit': outfit, 'suggestions': suggestions}
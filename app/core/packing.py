@@ -0,0 +1,241 @@
+"""Packing-list optimizer: the fewest items that dress every day of a trip.
+
+Each (day, required slot) pair of the itinerary is one bit of the universe;
+every item gets a bitmask of the pairs it can fill (right type, suitable for
+that day's occasion and weather). A greedy set cover over the masks gives a
+first packing list. Covering every slot is not enough, since the items of a
+day must also form a valid outfit (style and color rules). Days whose packed
+items do not combine are repaired by adding the fewest extra items. Local
+search then removes items, or swaps two for one, while every day keeps a
+valid outfit and until the time limit is reached.
+"""
+import itertools
+import time
+from datetime import date
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from ..models.schemas import ClothingItem, ClothingType, OccasionInfo, Outfit, UserInfo
+
+TIME_LIMIT_SECONDS = 2.0
+# Item combinations examined per day when assembling or repairing an outfit
+MAX_COMBINATIONS = 400
+REPAIR_CANDIDATES_PER_SLOT = 8
+
+
+class PackingResult:
+    def __init__(
+        self,
+        items: List[ClothingItem],
+        outfits: List[Optional[Outfit]],
+        uncovered: List[Tuple[int, ClothingType]],
+        greedy_size: int,
+        elapsed: float,
+        timed_out: bool
+    ):
+        self.items = items
+        self.outfits = outfits
+        self.uncovered = uncovered
+        self.greedy_size = greedy_size
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+
+class PackingOptimizer:
+    def __init__(self, engine, time_limit: float = TIME_LIMIT_SECONDS, max_combinations: int = MAX_COMBINATIONS):
+        self.engine = engine
+        self.time_limit = time_limit
+        self.max_combinations = max_combinations
+
+    def optimize(
+        self,
+        inventory: List[ClothingItem],
+        user_info: UserInfo,
+        itinerary: Sequence[Tuple[date, OccasionInfo]],
+        time_limit: Optional[float] = None
+    ) -> PackingResult:
+        started = time.perf_counter()
+        deadline = started + (self.time_limit if time_limit is None else time_limit)
+        engine = self.engine
+
+        # Items usable on each day, filtered once per distinct occasion/weather
+        contexts: Dict[Tuple[str, str], List[ClothingItem]] = {}
+        day_keys: List[Tuple[str, str]] = []
+        for _, occasion in itinerary:
+            key = (engine._enum_value(occasion.occasion_type), engine._enum_value(occasion.weather))
+            if key not in contexts:
+                weather = key[1]
+                contexts[key] = [
+                    item for item in engine.filter_inventory(inventory, user_info, occasion)
+                    if engine._is_item_weather_appropriate(item, weather)
+                ]
+            day_keys.append(key)
+        by_id = {item.item_id: item for pool in contexts.values() for item in pool}
+
+        # Bit per (day, slot); mask per item of the bits it can fill
+        slots: List[List[ClothingType]] = [engine._required_types(occasion) for _, occasion in itinerary]
+        masks: Dict[str, int] = {}
+        bit = 0
+        bits: List[Dict[ClothingType, int]] = []
+        for day, key in enumerate(day_keys):
+            day_bits = {}
+            for slot in slots[day]:
+                day_bits[slot] = 1 << bit
+                for item in contexts[key]:
+                    if item.item_type == slot:
+                        masks[item.item_id] = masks.get(item.item_id, 0) | (1 << bit)
+                bit += 1
+            bits.append(day_bits)
+        coverable = 0
+        for mask in masks.values():
+            coverable |= mask
+        uncovered = [
+            (day, slot) for day, day_bits in enumerate(bits)
+            for slot, b in day_bits.items() if not coverable & b
+        ]
+
+        # Greedy cover: most new bits, then most bits overall, then id for determinism
+        packed: Set[str] = set()
+        covered = 0
+        while covered != coverable:
+            best = max(
+                (item_id for item_id in masks if item_id not in packed),
+                key=lambda item_id: ((masks[item_id] & ~covered).bit_count(), masks[item_id].bit_count(), item_id)
+            )
+            packed.add(best)
+            covered |= masks[best]
+        greedy_size = len(packed)
+
+        memo: Dict[Tuple[Tuple[str, str], FrozenSet[str]], Optional[List[ClothingItem]]] = {}
+
+        def assemble(day: int, available: Set[str]) -> Optional[List[ClothingItem]]:
+            """Best valid outfit for a day from the available items (memoised per context)"""
+            key = day_keys[day]
+            usable = frozenset(i for i in available if masks.get(i, 0) & sum(bits[day].values()))
+            if (key, usable) in memo:
+                return memo[(key, usable)]
+            choices = [
+                sorted((by_id[i] for i in usable if by_id[i].item_type == slot), key=lambda it: it.item_id)
+                for slot in slots[day] if bits[day][slot] & coverable
+            ]
+            outfit = self._best_outfit(choices, user_info, itinerary[day][1]) if all(choices) else None
+            memo[(key, usable)] = outfit
+            return outfit
+
+        outfits: List[Optional[List[ClothingItem]]] = [assemble(day, packed) for day in range(len(itinerary))]
+
+        # Repair days whose packed items do not combine into a valid outfit
+        for day in range(len(itinerary)):
+            fillable = [slot for slot in slots[day] if bits[day][slot] & coverable]
+            if outfits[day] is not None or not fillable:
+                continue
+            choices = []
+            for slot in fillable:
+                pool = [item for item in contexts[day_keys[day]] if item.item_type == slot]
+                inside = [item for item in pool if item.item_id in packed]
+                outside = sorted(
+                    (item for item in pool if item.item_id not in packed),
+                    key=lambda item: (-masks[item.item_id].bit_count(), item.item_id)
+                )[:REPAIR_CANDIDATES_PER_SLOT]
+                choices.append(inside + outside)
+            repaired = self._best_outfit(choices, user_info, itinerary[day][1], prefer=packed)
+            if repaired is not None:
+                packed |= {item.item_id for item in repaired}
+                # The new items may also let later failing days combine
+                outfits = [assemble(d, packed) if o is None else o for d, o in enumerate(outfits)]
+
+        # Local search: drop items, then swap two for one, while every dressed day stays dressed
+        dressed = [day for day, outfit in enumerate(outfits) if outfit is not None]
+
+        def feasible(candidate: Set[str]) -> Optional[List[Optional[List[ClothingItem]]]]:
+            result = list(outfits)
+            for day in dressed:
+                if not {item.item_id for item in outfits[day]} <= candidate:
+                    result[day] = assemble(day, candidate)
+                    if result[day] is None:
+                        return None
+            return result
+
+        # Swap-in candidates, most versatile first
+        ranked = sorted(masks, key=lambda i: (-masks[i].bit_count(), i))
+        timed_out = False
+        improved = True
+        while improved:
+            improved = False
+            for item_id in sorted(packed, key=lambda i: (masks.get(i, 0).bit_count(), i)):
+                if time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                result = feasible(packed - {item_id})
+                if result is not None:
+                    packed.discard(item_id)
+                    outfits = result
+                    improved = True
+            if improved or timed_out:
+                continue
+            for a, b in itertools.combinations(sorted(packed), 2):
+                if time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                rest = packed - {a, b}
+                needed = 0
+                for day in dressed:
+                    for slot in slots[day]:
+                        if not any(masks.get(i, 0) & bits[day][slot] for i in rest):
+                            needed |= bits[day][slot]
+                for c in ranked:
+                    if c in packed or masks[c] & needed != needed:
+                        continue
+                    result = feasible(rest | {c})
+                    if result is not None:
+                        packed = rest | {c}
+                        outfits = result
+                        improved = True
+                        break
+                if improved:
+                    break
+
+        items = sorted((by_id[i] for i in packed), key=lambda it: (it.item_type.value, it.item_id))
+        final: List[Optional[Outfit]] = []
+        for day, outfit_items in enumerate(outfits):
+            if outfit_items is None:
+                final.append(None)
+                continue
+            occasion = itinerary[day][1]
+            confidence = engine._score_candidates([outfit_items], user_info, occasion)[0]
+            final.append(Outfit(
+                outfit_id=f"pack_{itinerary[day][0].isoformat()}_{day + 1}",
+                items=outfit_items,
+                occasion=occasion.occasion_type,
+                confidence_score=confidence
+            ))
+        return PackingResult(items, final, uncovered, greedy_size, time.perf_counter() - started, timed_out)
+
+    def _best_outfit(
+        self,
+        choices: List[List[ClothingItem]],
+        user_info: UserInfo,
+        occasion: OccasionInfo,
+        prefer: Optional[Set[str]] = None
+    ) -> Optional[List[ClothingItem]]:
+        """Highest-scoring valid combination (one item per slot list).
+
+        With ``prefer``, combinations needing the fewest items outside it win
+        first.
+        """
+        if not choices or not all(choices):
+            return None
+        valid = []
+        for combo in itertools.islice(itertools.product(*choices), self.max_combinations):
+            items = list(combo)
+            if self.engine._is_valid_outfit(items, occasion):
+                valid.append(items)
+        if not valid:
+            return None
+        scores = self.engine._score_candidates(valid, user_info, occasion)
+
+        def rank(pair):
+            items, score = pair
+            extra = sum(item.item_id not in prefer for item in items) if prefer is not None else 0
+            return (-extra, score)
+
+        return max(zip(valid, scores), key=rank)[0]
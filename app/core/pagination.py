@@ -0,0 +1,74 @@
+"""Opaque cursors for paging through the outfit combination space.
+
+The space of base outfits is the cartesian product of the required-type pools.
+Pages walk that space in the order given by an affine permutation
+``i -> (a * i + c) mod N`` derived from a seed, so a cursor only needs the
+seed, the current position and a digest of the space it belongs to.
+"""
+import base64
+import binascii
+import hashlib
+import math
+import random
+import struct
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+CURSOR_VERSION = 1
+_CURSOR_FORMAT = '>BIQ8s'
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor is malformed or belongs to a different search space"""
+
+
+@dataclass
+class OutfitCursor:
+    seed: int
+    position: int
+    space_digest: bytes
+
+
+def encode_cursor(cursor: OutfitCursor) -> str:
+    raw = struct.pack(_CURSOR_FORMAT, CURSOR_VERSION, cursor.seed, cursor.position, cursor.space_digest)
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token: str) -> OutfitCursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        version, seed, position, digest = struct.unpack(_CURSOR_FORMAT, raw)
+    except (binascii.Error, struct.error, ValueError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}")
+    if version != CURSOR_VERSION:
+        raise InvalidCursor(f"Unsupported cursor version {version}")
+    return OutfitCursor(seed=seed, position=position, space_digest=digest)
+
+
+def space_digest(pools: Sequence[Sequence[str]], context: str = '') -> bytes:
+    """8-byte digest identifying a combination space (pool item ids + context)"""
+    hasher = hashlib.sha256(context.encode('utf-8'))
+    for pool in pools:
+        hasher.update(b'|')
+        hasher.update(','.join(pool).encode('utf-8'))
+    return hasher.digest()[:8]
+
+
+def permutation_params(seed: int, size: int) -> Tuple[int, int]:
+    """Multiplier and offset of a seeded bijection over ``range(size)``"""
+    if size <= 1:
+        return 1, 0
+    rng = random.Random(seed)
+    multiplier = rng.randrange(1, size)
+    while math.gcd(multiplier, size) != 1:
+        multiplier = rng.randrange(1, size)
+    return multiplier, rng.randrange(size)
+
+
+def unrank(index: int, radices: Sequence[int]) -> List[int]:
+    """Decode a mixed-radix index into one position per pool"""
+    digits = []
+    for radix in radices:
+        index, digit = divmod(index, radix)
+        digits.append(digit)
+    return digits
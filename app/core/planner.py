@@ -0,0 +1,179 @@
+"""Multi-day outfit planning with item reuse limits and laundry gaps.
+
+The inventory is filtered once per distinct (occasion, weather) context in
+the schedule and every day draws from that shared pool. Days are assigned
+most-constrained first (smallest slot pool) by a depth-first search: each day
+is offered a few of its best outfits that avoid items already used up or still
+in the laundry, ranked by confidence minus how much their items are needed by
+the days still open. When a day cannot be filled the search backtracks into
+earlier choices, within a node budget, and keeps the plan that fills the most
+days (ties broken by total confidence). Days that cannot be filled at all are
+left empty rather than failing the whole plan.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from ..models.schemas import ClothingItem, OccasionInfo, Outfit, UserInfo
+
+CANDIDATES_PER_DAY = 12
+BRANCHING = 4
+MAX_NODES = 200
+DEMAND_PENALTY = 0.1
+
+
+class PlanResult:
+    def __init__(self, outfits: List[Optional[Outfit]], nodes: int):
+        self.outfits = outfits
+        self.nodes = nodes
+
+    @property
+    def planned(self) -> int:
+        return sum(outfit is not None for outfit in self.outfits)
+
+    def item_uses(self) -> Dict[str, int]:
+        uses: Dict[str, int] = defaultdict(int)
+        for outfit in self.outfits:
+            for item in outfit.items if outfit else ():
+                uses[item.item_id] += 1
+        return dict(uses)
+
+
+class WeeklyPlanner:
+    def __init__(
+        self,
+        engine,
+        candidates_per_day: int = CANDIDATES_PER_DAY,
+        branching: int = BRANCHING,
+        max_nodes: int = MAX_NODES
+    ):
+        self.engine = engine
+        self.candidates_per_day = candidates_per_day
+        self.branching = branching
+        self.max_nodes = max_nodes
+
+    def plan(
+        self,
+        inventory: List[ClothingItem],
+        user_info: UserInfo,
+        schedule: Sequence[Tuple[date, OccasionInfo]],
+        max_uses_per_item: int = 1,
+        laundry_gap_days: int = 2,
+        exclude_item_ids: Optional[List[str]] = None,
+        seed: int = 0
+    ) -> PlanResult:
+        """One outfit (or ``None``) per schedule entry, in schedule order.
+
+        An item is worn at most ``max_uses_per_item`` times, and after being
+        worn on day ``d`` it is back from the laundry on day
+        ``d + laundry_gap_days + 1`` (so never twice on the same day).
+        """
+        engine = self.engine
+        excluded = set(exclude_item_ids or ())
+
+        # Compile once: filtered pool per distinct context, shared by all its days
+        pools: Dict[Tuple[str, str], List[ClothingItem]] = {}
+        day_pools: List[List[ClothingItem]] = []
+        for _, occasion in schedule:
+            key = (engine._enum_value(occasion.occasion_type), engine._enum_value(occasion.weather))
+            if key not in pools:
+                pools[key] = [
+                    item for item in engine.filter_inventory(inventory, user_info, occasion)
+                    if item.item_id not in excluded
+                ]
+            day_pools.append(pools[key])
+
+        # Scarcity: the smallest required-slot pool of each day
+        slot_sizes: List[Dict] = []
+        for (_, occasion), pool in zip(schedule, day_pools):
+            by_type = engine._categorize_items(pool)
+            slot_sizes.append({t: len(by_type.get(t, ())) for t in engine._required_types(occasion)})
+        order = sorted(range(len(schedule)), key=lambda i: (min(slot_sizes[i].values(), default=0), i))
+
+        # How much each still-open day needs an item: 1 / size of the slot it could fill
+        demand: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for i, pool in enumerate(day_pools):
+            for item in pool:
+                size = slot_sizes[i].get(item.item_type)
+                if size:
+                    demand[item.item_id][i] = 1.0 / size
+
+        days = [day for day, _ in schedule]
+        wears: Dict[str, List[date]] = defaultdict(list)
+        assignment: List[Optional[Outfit]] = [None] * len(schedule)
+        open_days: Set[int] = set(range(len(schedule)))
+        best = {'unplanned': len(schedule) + 1, 'confidence': -1.0, 'outfits': list(assignment)}
+        nodes = 0
+
+        def blocked(i: int) -> List[str]:
+            gap = laundry_gap_days + 1
+            return [
+                item_id for item_id, worn in wears.items()
+                if len(worn) >= max_uses_per_item or any(abs((days[i] - d).days) < gap for d in worn)
+            ]
+
+        def options(i: int, limit: int) -> List[Outfit]:
+            occasion = schedule[i][1]
+            outfits, _, _ = engine.generate_outfit_page(
+                day_pools[i], user_info, occasion,
+                page_size=self.candidates_per_day,
+                seed=seed + i,
+                exclude_item_ids=blocked(i)
+            )
+            # Every slot the wardrobe can fill for this day must still be filled
+            needed = {t for t, size in slot_sizes[i].items() if size}
+            outfits = [o for o in outfits if needed <= {item.item_type for item in o.items}]
+
+            def rank(outfit: Outfit) -> float:
+                pressure = sum(
+                    need for item in outfit.items
+                    for j, need in demand.get(item.item_id, {}).items() if j != i and j in open_days
+                )
+                return outfit.confidence_score - DEMAND_PENALTY * pressure
+
+            return sorted(outfits, key=rank, reverse=True)[:limit]
+
+        def exhausted() -> bool:
+            # Out of budget with at least one complete plan recorded
+            return nodes >= self.max_nodes and best['unplanned'] <= len(schedule)
+
+        def search(position: int, unplanned: int) -> bool:
+            """True once a plan filling every day is found"""
+            nonlocal nodes
+            if unplanned > best['unplanned']:
+                return False
+            if position == len(order):
+                confidence = sum(o.confidence_score for o in assignment if o is not None)
+                if unplanned < best['unplanned'] or confidence > best['confidence']:
+                    best.update(unplanned=unplanned, confidence=confidence, outfits=list(assignment))
+                return unplanned == 0
+            # Past the node budget, finish the current branch greedily
+            greedy = nodes >= self.max_nodes
+            nodes += 1
+            i = order[position]
+            open_days.discard(i)
+            try:
+                choices = options(i, 1 if greedy else self.branching)
+                for outfit in choices:
+                    assignment[i] = outfit
+                    for item in outfit.items:
+                        wears[item.item_id].append(days[i])
+                    done = search(position + 1, unplanned)
+                    for item in outfit.items:
+                        wears[item.item_id].pop()
+                    assignment[i] = None
+                    if done or greedy or exhausted():
+                        return done
+                if choices and exhausted():
+                    return False
+                # Leave this day empty and plan the rest
+                return search(position + 1, unplanned + 1)
+            finally:
+                open_days.add(i)
+
+        search(0, 0)
+        outfits = best['outfits']
+        for i, outfit in enumerate(outfits):
+            if outfit is not None:
+                outfits[i] = outfit.model_copy(update={'outfit_id': f"plan_{days[i].isoformat()}_{i + 1}"})
+        return PlanResult(outfits, nodes)
@@ -0,0 +1,259 @@
+"""Off-peak precomputation of upcoming recommendations.
+
+Users register a request template (profile, inventory, options) and the
+occasions coming up on their calendar. During the configured off-peak window
+a scheduler thread computes the recommendations for the next
+``horizon_days`` on a small bounded pool and stores them in the
+``RecommendationCache``. Cache keys cover the whole request except the
+inventory, and each entry is stamped with the digest of the inventory it was
+computed from and of the user's learned preference weights at the time. A
+live request is answered from the cache only when both still match (and the
+entry has not expired), so feedback takes effect immediately; anything else
+falls back to live generation.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, datetime, time as clock_time, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..models.schemas import OccasionInfo, Outfit, OutfitRecommendationRequest
+from .cache import LRUCache
+from .fingerprint import inventory_digest, model_fingerprint
+from .items import Wardrobe, item_table
+
+logger = logging.getLogger(__name__)
+
+
+def parse_window(spec: str) -> Tuple[clock_time, clock_time]:
+    """``"01:00-05:00"`` -> (01:00, 05:00); the end may be earlier than the start (wraps past midnight)"""
+    try:
+        start, end = (clock_time.fromisoformat(part.strip()) for part in spec.split('-'))
+    except ValueError:
+        raise ValueError(f"Invalid precompute window {spec!r}, expected HH:MM-HH:MM")
+    return start, end
+
+
+class RecommendationCache:
+    """Precomputed outfits keyed by request (minus inventory).
+
+    Entries are stamped with the inventory digest and, when ``scoring_state``
+    is given, the digest of the user's scoring state (learned preference
+    weights); a change to either makes the entry stale.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl_seconds: float = 36 * 3600,
+        scoring_state: Optional[Callable[[str], str]] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.scoring_state = scoring_state
+        self._entries = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @staticmethod
+    def key(request: OutfitRecommendationRequest) -> str:
+        return model_fingerprint(request, exclude=('inventory',))
+
+    def state(self, request: OutfitRecommendationRequest) -> str:
+        return self.scoring_state(request.user_info.user_id) if self.scoring_state else ''
+
+    def put(
+        self,
+        request: OutfitRecommendationRequest,
+        outfits: List[Outfit],
+        inventory_version: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> None:
+        """Store outfits; pass the ``state`` read before computing them so feedback meanwhile makes them stale"""
+        version = inventory_version or inventory_digest(request.inventory)
+        state = self.state(request) if state is None else state
+        self._entries.put(self.key(request), (version, state, time.time(), outfits))
+
+    def is_fresh(self, request: OutfitRecommendationRequest, inventory_version: str) -> bool:
+        entry = self._entries.get(self.key(request))
+        return (
+            entry is not None and entry[0] == inventory_version and entry[1] == self.state(request)
+            and time.time() - entry[2] < self.ttl_seconds
+        )
+
+    def lookup(self, request: OutfitRecommendationRequest) -> Optional[List[Outfit]]:
+        """Precomputed outfits for this exact request, inventory and scoring state, if any"""
+        entry = self._entries.get(self.key(request))
+        if entry is None or time.time() - entry[2] >= self.ttl_seconds:
+            self.misses += 1
+            return None
+        # Only hash the inventory when there is a candidate entry
+        if entry[1] != self.state(request) or entry[0] != inventory_digest(request.inventory):
+            self.stale += 1
+            return None
+        self.hits += 1
+        return entry[3]
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'stale': self.stale}
+
+
+class PrecomputeScheduler:
+    def __init__(
+        self,
+        cache: RecommendationCache,
+        compute: Callable[[OutfitRecommendationRequest], List[Outfit]],
+        window: Tuple[clock_time, clock_time],
+        workers: int = 2,
+        horizon_days: int = 1,
+        interval_seconds: float = 300.0,
+        registry_path: Optional[str] = None
+    ):
+        self.cache = cache
+        self.compute = compute
+        self.window = window
+        self.horizon_days = horizon_days
+        self.interval_seconds = interval_seconds
+        self.registry_path = registry_path
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='precompute')
+        # user_id -> (request template without inventory, wardrobe, [(day, occasion)]); wardrobes
+        # reference the shared item table, so registered users sharing SKUs share their garments
+        self._registry: Dict[str, Tuple[OutfitRecommendationRequest, Wardrobe, List[Tuple[date, OccasionInfo]]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'runs': 0, 'computed': 0, 'skipped_fresh': 0, 'errors': 0}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.registry_path or not os.path.exists(self.registry_path):
+            return
+        with open(self.registry_path) as f:
+            data = json.load(f)
+        for user_id, entry in data.items():
+            template = OutfitRecommendationRequest.model_validate(entry['template'])
+            schedule = [
+                (date.fromisoformat(s['day']), OccasionInfo.model_validate(s['occasion'])) for s in entry['schedule']
+            ]
+            self._registry[user_id] = self._entry(template, schedule)
+
+    @staticmethod
+    def _entry(template: OutfitRecommendationRequest, schedule: List[Tuple[date, OccasionInfo]]):
+        wardrobe = Wardrobe.from_items(item_table, template.inventory)
+        return template.model_copy(update={'inventory': []}), wardrobe, schedule
+
+    def _save(self) -> None:
+        if not self.registry_path:
+            return
+        data = {
+            user_id: {
+                'template': {
+                    **template.model_dump(mode='json'),
+                    'inventory': [item.model_dump(mode='json') for item in wardrobe.items()],
+                },
+                'schedule': [{'day': day.isoformat(), 'occasion': o.model_dump(mode='json')} for day, o in schedule],
+            }
+            for user_id, (template, wardrobe, schedule) in self._registry.items()
+        }
+        tmp_path = f"{self.registry_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.registry_path)
+
+    def register(
+        self,
+        template: OutfitRecommendationRequest,
+        schedule: Sequence[Tuple[date, OccasionInfo]]
+    ) -> int:
+        """Replace a user's upcoming occasions (the template's occasion is ignored)"""
+        with self._lock:
+            self._registry[template.user_info.user_id] = self._entry(template, list(schedule))
+            self._save()
+        return len(schedule)
+
+    def in_window(self, now: datetime) -> bool:
+        start, end = self.window
+        current = now.time()
+        if start <= end:
+            return start <= current < end
+        return current >= start or current < end
+
+    def due(self, today: date) -> List[OutfitRecommendationRequest]:
+        """Requests for the coming days that are not already cached for the current inventory"""
+        horizon = today + timedelta(days=self.horizon_days)
+        requests = []
+        with self._lock:
+            for user_id, (template, wardrobe, schedule) in list(self._registry.items()):
+                # Past occasions will never be asked for again
+                schedule[:] = [(day, occasion) for day, occasion in schedule if day >= today]
+                if not schedule:
+                    del self._registry[user_id]
+                    continue
+                if not any(day <= horizon for day, _ in schedule):
+                    continue
+                inventory = wardrobe.items()
+                version = inventory_digest(inventory)
+                for day, occasion in schedule:
+                    if day > horizon:
+                        continue
+                    request = template.model_copy(update={'occasion': occasion, 'inventory': inventory})
+                    if self.cache.is_fresh(request, version):
+                        self._stats['skipped_fresh'] += 1
+                    else:
+                        requests.append(request)
+        return requests
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """Precompute everything due now (regardless of the window); returns how many were computed"""
+        now = now or datetime.now()
+        requests = self.due(now.date())
+        futures = [self._pool.submit(self._precompute, request) for request in requests]
+        wait(futures)
+        computed = sum(1 for future in futures if future.result())
+        self._stats['runs'] += 1
+        if requests:
+            logger.info(f"Precomputed {computed} of {len(requests)} due recommendations")
+        return computed
+
+    def _precompute(self, request: OutfitRecommendationRequest) -> bool:
+        try:
+            state = self.cache.state(request)
+            self.cache.put(request, self.compute(request), state=state)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.warning(f"Precompute failed for user {request.user_info.user_id}: {e}")
+            return False
+        self._stats['computed'] += 1
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='precompute-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            now = datetime.now()
+            if self.in_window(now):
+                try:
+                    self.run_once(now)
+                except Exception as e:
+                    logger.error(f"Precompute run failed: {e}", exc_info=True)
+            self._stop.wait(self.interval_seconds)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            users = len(self._registry)
+            entries = sum(len(schedule) for _, _, schedule in self._registry.values())
+        return {'users': users, 'entries': entries, **self._stats}
@@ -0,0 +1,280 @@
+"""In-memory inverted index for attribute and text search over an inventory.
+
+Every item is tokenized once into ``field:token`` terms (name, color,
+material, style, brand, type, occasion and weather suitability). Each term
+maps to a sorted array of item positions, so a query only touches the
+postings of the terms it mentions. Scores are the sum of ``idf * field
+weight`` over the matched terms, which ranks rare, specific matches (a brand,
+"blazer") above common ones ("casual").
+
+Query syntax::
+
+    navy wool blazer            any of the words, best matches first
+    navy AND wool               both words (``match_all`` makes AND the default)
+    blazer OR jacket            either word
+    formal -jeans  /  NOT jeans exclude a word
+    color:navy  style:formal    restrict a word to one field
+    blaz*                       prefix match
+    (navy OR black) AND wool    grouping
+"""
+import bisect
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.schemas import ClothingItem
+from .color import UNKNOWN, normalize_color
+from .tags import tokenize
+
+FIELD_WEIGHTS = {
+    'name': 2.0,
+    'type': 1.5,
+    'color': 1.5,
+    'material': 1.5,
+    'style': 1.2,
+    'brand': 1.0,
+    'occasion': 1.0,
+    'weather': 1.0,
+}
+FIELD_ALIASES = {'occasions': 'occasion', 'item_type': 'type', 'colour': 'color'}
+
+STOPWORDS = frozenset({'a', 'an', 'the', 'for', 'with', 'in', 'on', 'of', 'to', 'my', 'some'})
+
+_QUERY_RE = re.compile(r'\(|\)|[^\s()]+')
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def normalize_token(token: str) -> str:
+    """Crude plural folding shared by indexing and querying ("blazers" -> "blazer")"""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+@lru_cache(maxsize=65536)
+def _terms(text: Optional[str]) -> Tuple[str, ...]:
+    # Names, colors and materials repeat heavily across a catalog
+    return tuple(normalize_token(t) for t in tokenize(text or ''))
+
+
+def _enum_text(value) -> str:
+    return value.value if hasattr(value, 'value') else str(value)
+
+
+def item_terms(item: ClothingItem) -> Dict[str, Sequence[str]]:
+    """Searchable tokens of an item, per field"""
+    colors = list(_terms(item.color))
+    canonical = normalize_color(item.color)
+    if canonical != UNKNOWN:
+        colors.append(canonical)
+    return {
+        'name': _terms(item.name),
+        'type': _terms(_enum_text(item.item_type)),
+        'color': colors,
+        'material': _terms(item.material),
+        'style': [t for s in item.style for t in _terms(s)] + [s.lower() for s in item.style],
+        'brand': _terms(item.brand),
+        'occasion': [
+            t for o in item.occasion_suitability for t in (_enum_text(o),) + _terms(_enum_text(o))
+        ],
+        'weather': [t for w in item.weather_suitability for t in _terms(_enum_text(w))],
+    }
+
+
+class SearchIndex:
+    def __init__(self, items: Sequence[ClothingItem]):
+        self.items: List[ClothingItem] = list(items)
+        self.size = len(self.items)
+        builder: Dict[str, Dict[str, List[int]]] = {field: {} for field in FIELD_WEIGHTS}
+        for position, item in enumerate(self.items):
+            for field, tokens in item_terms(item).items():
+                postings = builder[field]
+                for token in set(tokens):
+                    postings.setdefault(token, []).append(position)
+
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {
+            field: {token: np.array(positions, dtype=np.int32) for token, positions in postings.items()}
+            for field, postings in builder.items()
+        }
+        # Sorted vocabularies for prefix queries
+        self.vocabulary: Dict[str, List[str]] = {field: sorted(p) for field, p in self.postings.items()}
+
+    def idf(self, document_frequency: int) -> float:
+        return math.log(1.0 + (self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _tokens(self, field: str, word: str, prefix: bool) -> Iterable[str]:
+        if prefix:
+            vocabulary = self.vocabulary[field]
+            start = bisect.bisect_left(vocabulary, word)
+            end = bisect.bisect_left(vocabulary, word + '\uffff')
+            return vocabulary[start:end]
+        tokens = [word]
+        if field == 'color':
+            canonical = normalize_color(word)
+            if canonical != UNKNOWN and canonical != word:
+                tokens.append(canonical)
+        return tokens
+
+    def term(self, word: str, field: Optional[str] = None, prefix: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """(match mask, score) for one query word"""
+        mask = np.zeros(self.size, dtype=bool)
+        scores = np.zeros(self.size, dtype=np.float32)
+        if not prefix:
+            word = normalize_token(word)
+        for name in ([field] if field else FIELD_WEIGHTS):
+            postings = self.postings[name]
+            for token in self._tokens(name, word, prefix):
+                positions = postings.get(token)
+                if positions is None:
+                    continue
+                mask[positions] = True
+                # An item matching in several fields keeps its best field weight
+                weight = FIELD_WEIGHTS[name] * self.idf(len(positions))
+                scores[positions] = np.maximum(scores[positions], weight)
+        return mask, scores
+
+    def search(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = 20,
+        match_all: bool = False
+    ) -> Tuple[List[Tuple[ClothingItem, float]], int]:
+        """Ranked ``(item, score)`` hits for one page, and the total number of matches"""
+        mask, scores = _Parser(self, query, match_all).parse()
+        matches = np.flatnonzero(mask)
+        total = len(matches)
+        if total == 0 or offset >= total:
+            return [], total
+        end = min(offset + limit, total)
+        # Rank by score (ties keep inventory order); only sort what the page needs
+        keys = -scores[matches]
+        if end < total:
+            head = np.argpartition(keys, end - 1)[:end]
+            order = head[np.lexsort((matches[head], keys[head]))]
+        else:
+            order = np.lexsort((matches, keys))
+        page = matches[order[offset:end]]
+        return [(self.items[i], round(float(scores[i]), 4)) for i in page], total
+
+
+class _Parser:
+    """Recursive-descent parser that evaluates the query directly to masks.
+
+    ``or := and ('OR' and)*``, ``and := [NOT | -]* unary ([AND] [NOT | -]* unary)*``,
+    ``unary := '(' or ')' | word``. Negated clauses always act as filters on
+    their group, so ``formal -jeans`` means "formal, but not jeans".
+    """
+
+    def __init__(self, index: SearchIndex, query: str, match_all: bool):
+        self.index = index
+        self.match_all = match_all
+        self.tokens = _QUERY_RE.findall(query or '')
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def parse(self) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.tokens:
+            raise InvalidQuery("Empty query")
+        result = self.parse_or()
+        if self.peek() is not None:
+            raise InvalidQuery(f"Unexpected '{self.peek()}'")
+        if result is None:
+            raise InvalidQuery("Query has no searchable words")
+        return result
+
+    def parse_or(self):
+        result = self.parse_and()
+        while self.peek() == 'OR':
+            self.pos += 1
+            result = _combine(result, self.parse_and(), np.logical_or)
+        return result
+
+    def parse_and(self):
+        result, excluded = None, None
+        first = True
+        while self.peek() not in (None, 'OR', ')'):
+            explicit = not first and self.peek() == 'AND'
+            if explicit:
+                self.pos += 1
+            negated = self.parse_negation()
+            operand = self.parse_unary()
+            first = False
+            if operand is None:
+                continue
+            if negated:
+                excluded = operand[0] if excluded is None else excluded | operand[0]
+                continue
+            op = np.logical_and if explicit or self.match_all else np.logical_or
+            result = _combine(result, operand, op)
+        if excluded is None:
+            return result
+        if result is None:
+            # Only negations: everything except the excluded items
+            result = np.ones(self.index.size, dtype=bool), np.zeros(self.index.size, dtype=np.float32)
+        mask = result[0] & ~excluded
+        return mask, np.where(mask, result[1], 0.0).astype(np.float32)
+
+    def parse_negation(self) -> bool:
+        negated = False
+        while True:
+            token = self.peek()
+            if token in ('NOT', '-'):
+                self.pos += 1
+            elif token is not None and token.startswith('-'):
+                self.tokens[self.pos] = token[1:]
+            else:
+                return negated
+            negated = not negated
+
+    def parse_unary(self):
+        token = self.peek()
+        if token is None:
+            raise InvalidQuery("Query ends unexpectedly")
+        self.pos += 1
+        if token == '(':
+            result = self.parse_or()
+            if self.peek() != ')':
+                raise InvalidQuery("Missing ')'")
+            self.pos += 1
+            return result
+        if token in (')', 'AND', 'OR'):
+            raise InvalidQuery(f"Unexpected '{token}'")
+        return self.word(token)
+
+    def word(self, token: str):
+        field = None
+        if ':' in token:
+            field, token = token.split(':', 1)
+            field = FIELD_ALIASES.get(field.lower(), field.lower())
+            if field not in FIELD_WEIGHTS:
+                raise InvalidQuery(f"Unknown field '{field}'")
+        prefix = token.endswith('*')
+        words = tokenize(token.rstrip('*'))
+        if field is None and not prefix:
+            words = [w for w in words if w not in STOPWORDS]
+        if not words:
+            return None
+        # "t-shirt" matches items containing all of its tokens
+        result = None
+        for i, w in enumerate(words):
+            result = _combine(result, self.index.term(w, field, prefix and i == len(words) - 1), np.logical_and)
+        return result
+
+
+def _combine(left, right, op):
+    """Combine two (mask, score) pairs; ``None`` operands (stopwords) are neutral"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    mask = op(left[0], right[0])
+    return mask, np.where(mask, left[1] + right[1], 0.0).astype(np.float32)
@@ -0,0 +1,172 @@
+"""Stateful styling sessions: incremental re-ranking as a request is tweaked.
+
+A session holds one recommendation request and applies small deltas to it
+(weather or occasion change, excluded or restored items, preference change,
+number of outfits, diversity). Work is cached at two levels, each keyed by
+what it depends on:
+
+* the filtered inventory per (occasion, weather, style and color
+  preferences), so switching back to an earlier context refilters nothing;
+* a scored candidate pool per context, several times larger than the page
+  shown, with an outfit x item incidence matrix.
+
+Excluding an item only masks the candidates containing it, and changing the
+number of outfits or the diversity weight only re-ranks. A pool is
+regenerated when too few candidates survive the exclusions, or when an item
+excluded while it was built is restored; a context is only refiltered when
+it is new.
+"""
+import time
+from typing import Callable, FrozenSet, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..models.schemas import ClothingItem, Outfit, OutfitRecommendationRequest, SessionOutfits, SessionUpdate
+from .cache import LRUCache
+from .diversity import incidence_matrix, mmr_order
+
+POOL_SIZE = 60
+CACHED_CONTEXTS = 8
+
+
+class _CandidatePool:
+    def __init__(self, outfits: List[Outfit], excluded: FrozenSet[str], exhaustive: bool):
+        self.outfits = outfits
+        self.excluded = excluded  # exclusions in force when the pool was generated
+        self.exhaustive = exhaustive  # sampling found fewer outfits than asked for
+        self.scores = np.array([o.confidence_score for o in outfits], dtype=np.float32)
+        self.incidence, self.columns = incidence_matrix([o.items for o in outfits])
+
+    def available(self, excluded: Set[str]) -> np.ndarray:
+        """Mask of candidates containing none of the excluded items"""
+        columns = [self.columns[i] for i in excluded if i in self.columns]
+        if not columns:
+            return np.ones(len(self.outfits), dtype=bool)
+        return ~self.incidence[:, columns].any(axis=1)
+
+
+class StylingSession:
+    def __init__(
+        self,
+        engine,
+        request: OutfitRecommendationRequest,
+        filter_fn: Callable[[OutfitRecommendationRequest], List[ClothingItem]],
+        pool_size: int = POOL_SIZE
+    ):
+        """``filter_fn`` filters the request's inventory (e.g. keeping pinned items)"""
+        self.engine = engine
+        self.request = request
+        self.filter_fn = filter_fn
+        self.pool_size = pool_size
+        self.version = 0
+        self._filtered = LRUCache(maxsize=CACHED_CONTEXTS)
+        self._pools = LRUCache(maxsize=CACHED_CONTEXTS)
+        known = {item.item_id for item in request.inventory}
+        self._check_known(request.exclude_item_ids, known)
+        self._known = known
+
+    def _check_known(self, item_ids: List[str], known: Set[str]) -> None:
+        unknown = sorted(set(item_ids) - known)
+        if unknown:
+            raise ValueError(f"Items not in inventory: {unknown}")
+
+    def _context(self) -> Tuple:
+        request = self.request
+        user = request.user_info
+        return (
+            self.engine._enum_value(request.occasion.occasion_type),
+            self.engine._enum_value(request.occasion.weather),
+            tuple(user.style_preferences),
+            tuple(user.color_preferences),
+        )
+
+    def refresh(self) -> SessionOutfits:
+        """Current outfits, recomputing only what the last changes invalidated"""
+        started = time.perf_counter()
+        request = self.request
+        excluded = set(request.exclude_item_ids)
+        key = self._context()
+        recomputed = 'rerank'
+
+        filtered = self._filtered.get(key)
+        if filtered is None:
+            filtered = self.filter_fn(request)
+            self._filtered.put(key, filtered)
+            recomputed = 'filter'
+
+        pool: Optional[_CandidatePool] = self._pools.get(key)
+        available = pool.available(excluded) if pool is not None else None
+        if (
+            pool is None
+            or pool.excluded - excluded  # a restored item was never sampled
+            or (available.sum() < request.max_outfits and not pool.exhaustive)
+        ):
+            outfits = self.engine.generate_outfits(
+                filtered_inventory=filtered,
+                user_info=request.user_info,
+                occasion=request.occasion,
+                max_outfits=self.pool_size,
+                consider_previous=request.consider_previous_outfits,
+                include_item_ids=request.include_item_ids,
+                exclude_item_ids=sorted(excluded),
+                exclude_worn_within_days=request.exclude_worn_within_days
+            )
+            pool = _CandidatePool(outfits, frozenset(excluded), exhaustive=len(outfits) < self.pool_size)
+            self._pools.put(key, pool)
+            available = pool.available(excluded)
+            if recomputed == 'rerank':
+                recomputed = 'generate'
+
+        outfits = self._rank(pool, available)
+        self.version += 1
+        return SessionOutfits(
+            version=self.version,
+            outfits=outfits,
+            recomputed=recomputed,
+            excluded_item_ids=sorted(excluded),
+            elapsed_ms=round((time.perf_counter() - started) * 1000.0, 2)
+        )
+
+    def _rank(self, pool: _CandidatePool, available: np.ndarray) -> List[Outfit]:
+        request = self.request
+        positions = np.flatnonzero(available)
+        if request.diversity_weight > 0:
+            order = mmr_order(
+                pool.scores[positions], pool.incidence[positions], request.max_outfits, request.diversity_weight
+            )
+        else:
+            # Pools are generated sorted by confidence
+            order = range(min(request.max_outfits, len(positions)))
+        return [pool.outfits[positions[i]] for i in order]
+
+    def apply(self, update: SessionUpdate) -> SessionOutfits:
+        """Apply a delta to the session's request and return the new outfits"""
+        request = self.request
+        changes = {}
+        occasion_changes = {}
+        if update.occasion_type is not None:
+            occasion_changes['occasion_type'] = update.occasion_type
+        if update.weather is not None:
+            occasion_changes['weather'] = update.weather
+        if occasion_changes:
+            changes['occasion'] = request.occasion.model_copy(update=occasion_changes)
+
+        user_changes = {}
+        if update.style_preferences is not None:
+            user_changes['style_preferences'] = update.style_preferences
+        if update.color_preferences is not None:
+            user_changes['color_preferences'] = update.color_preferences
+        if user_changes:
+            changes['user_info'] = request.user_info.model_copy(update=user_changes)
+
+        if update.exclude_item_ids or update.restore_item_ids:
+            self._check_known(update.exclude_item_ids + update.restore_item_ids, self._known)
+            excluded = (set(request.exclude_item_ids) | set(update.exclude_item_ids)) - set(update.restore_item_ids)
+            changes['exclude_item_ids'] = sorted(excluded)
+        if update.max_outfits is not None:
+            changes['max_outfits'] = update.max_outfits
+        if update.diversity_weight is not None:
+            changes['diversity_weight'] = update.diversity_weight
+
+        self.request = request.model_copy(update=changes)
+        return self.refresh()
@@ -0,0 +1,213 @@
+"""Shadow-mode comparison of a candidate engine against the live one.
+
+A configurable fraction of requests is replayed through a candidate engine on
+a small background executor after the primary response has been computed.
+Each comparison is appended as one JSON line to a local report file with the
+latency delta, the overlap of returned item combinations and the drift in
+confidence scores. The candidate never affects the response: when the
+executor is busy the comparison is dropped.
+"""
+import importlib
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..models.schemas import Outfit, OutfitRecommendationRequest
+from .fingerprint import request_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def load_engine(spec: str) -> Any:
+    """Instantiate an engine from a ``package.module:ClassName`` spec"""
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"Engine spec must look like 'package.module:ClassName', got {spec!r}")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _combos(outfits: List[Outfit]) -> set:
+    return {tuple(sorted(item.item_id for item in outfit.items)) for outfit in outfits}
+
+
+def compare_outfits(primary: List[Outfit], candidate: List[Outfit]) -> Dict[str, Any]:
+    """Overlap and confidence drift between two recommendation lists"""
+    primary_combos, candidate_combos = _combos(primary), _combos(candidate)
+    union = primary_combos | candidate_combos
+    primary_items = {item.item_id for outfit in primary for item in outfit.items}
+    candidate_items = {item.item_id for outfit in candidate for item in outfit.items}
+    item_union = primary_items | candidate_items
+
+    def mean_confidence(outfits):
+        return sum(o.confidence_score for o in outfits) / len(outfits) if outfits else None
+
+    primary_conf, candidate_conf = mean_confidence(primary), mean_confidence(candidate)
+    return {
+        'primary_count': len(primary),
+        'candidate_count': len(candidate),
+        'combo_overlap': len(primary_combos & candidate_combos) / len(union) if union else 1.0,
+        'item_overlap': len(primary_items & candidate_items) / len(item_union) if item_union else 1.0,
+        'primary_mean_confidence': primary_conf,
+        'candidate_mean_confidence': candidate_conf,
+        'confidence_drift': (
+            candidate_conf - primary_conf
+            if primary_conf is not None and candidate_conf is not None else None
+        ),
+    }
+
+
+class ShadowRunner:
+    def __init__(
+        self,
+        candidate_engine: Any,
+        fraction: float,
+        report_path: str,
+        max_pending: int = 4
+    ):
+        self.candidate_engine = candidate_engine
+        self.fraction = fraction
+        self.report_path = report_path
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            'sampled': 0,
+            'completed': 0,
+            'dropped': 0,
+            'errors': 0,
+        }
+
+    def maybe_submit(
+        self,
+        request: OutfitRecommendationRequest,
+        primary_outfits: List[Outfit],
+        primary_seconds: float,
+        constraints: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Schedule a shadow comparison for a sampled request; never blocks.
+
+        ``constraints`` are the ``generate_outfits`` keyword arguments the
+        primary engine ran with (seed, item constraints after substitution),
+        so differences in the report come from the engines, not from sampling.
+        """
+        if self.fraction <= 0 or random.random() >= self.fraction:
+            return False
+        with self._lock:
+            self._stats['sampled'] += 1
+            if self._pending >= self.max_pending:
+                self._stats['dropped'] += 1
+                return False
+            self._pending += 1
+        self._executor.submit(self._run, request, primary_outfits, primary_seconds, constraints or {})
+        return True
+
+    def _run(
+        self,
+        request: OutfitRecommendationRequest,
+        primary_outfits: List[Outfit],
+        primary_seconds: float,
+        constraints: Dict[str, Any]
+    ) -> None:
+        record: Dict[str, Any] = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'request_fingerprint': request_fingerprint(request),
+            'inventory_size': len(request.inventory),
+            'primary_ms': round(primary_seconds * 1000, 3),
+        }
+        try:
+            started = time.perf_counter()
+            filtered = self.candidate_engine.filter_inventory(
+                inventory=request.inventory,
+                user_info=request.user_info,
+                occasion=request.occasion
+            )
+            # Pinned items stay available even when the filters drop them, as on the live path
+            pinned = set(constraints.get('include_item_ids') or ())
+            kept = {item.item_id for item in filtered}
+            filtered = filtered + [item for item in request.inventory if item.item_id in pinned and item.item_id not in kept]
+            candidate_outfits = self.candidate_engine.generate_outfits(
+                filtered_inventory=filtered,
+                user_info=request.user_info,
+                occasion=request.occasion,
+                max_outfits=request.max_outfits,
+                consider_previous=request.consider_previous_outfits,
+                **constraints
+            )
+            candidate_seconds = time.perf_counter() - started
+            record['candidate_ms'] = round(candidate_seconds * 1000, 3)
+            record['latency_delta_ms'] = round((candidate_seconds - primary_seconds) * 1000, 3)
+            record.update(compare_outfits(primary_outfits, candidate_outfits))
+            outcome = 'completed'
+        except Exception as e:
+            logger.error(f"Shadow engine failed: {type(e).__name__}: {e}", exc_info=True)
+            record['error'] = f"{type(e).__name__}: {e}"
+            outcome = 'errors'
+
+        try:
+            with self._lock:
+                with open(self.report_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+        except OSError as e:
+            logger.error(f"Could not write shadow report to {self.report_path}: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._stats[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'pending': self._pending,
+                'fraction': self.fraction,
+                'report_path': self.report_path,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def create_shadow_runner(spec: Optional[str], fraction: float, report_path: str) -> Optional[ShadowRunner]:
+    """Build a runner from settings, or ``None`` when shadow mode is off"""
+    if not spec or fraction <= 0:
+        return None
+    logger.info(f"Shadow mode enabled: {spec} on {fraction:.1%} of requests -> {report_path}")
+    return ShadowRunner(load_engine(spec), fraction, report_path)
+
+
+def summarize_report(path: str) -> Dict[str, Any]:
+    """Aggregate a shadow report file into averages"""
+    records = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    ok = [r for r in records if 'error' not in r]
+
+    def mean(key):
+        values = [r[key] for r in ok if r.get(key) is not None]
+        return sum(values) / len(values) if values else None
+
+    return {
+        'comparisons': len(records),
+        'errors': len(records) - len(ok),
+        'mean_latency_delta_ms': mean('latency_delta_ms'),
+        'mean_primary_ms': mean('primary_ms'),
+        'mean_candidate_ms': mean('candidate_ms'),
+        'mean_combo_overlap': mean('combo_overlap'),
+        'mean_item_overlap': mean('item_overlap'),
+        'mean_confidence_drift': mean('confidence_drift'),
+    }
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) != 2:
+        raise SystemExit("usage: python -m app.core.shadow <shadow_report.jsonl>")
+    print(json.dumps(summarize_report(sys.argv[1]), indent=2))
@@ -0,0 +1,235 @@
+"""Approximate nearest-neighbor "similar items" index.
+
+Items are embedded as signed hashed bag-of-attributes vectors (type, name
+words, color, material, style, occasion and weather suitability), so cosine
+similarity counts shared attributes. Vectors are indexed with random
+hyperplane LSH: each of ``n_tables`` tables buckets items by the sign pattern
+of ``n_bits`` projections. A query re-ranks only the items sharing a bucket
+with it (probing buckets one bit away when those are too few) by exact cosine
+similarity, scanning everything only when the buckets hold fewer than the
+requested number of results. Items can be added at any time; each clothing
+type has its own partition because substitutes are almost always wanted of
+the same type.
+"""
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.schemas import ClothingItem, ClothingType
+from .learned import OutfitFeatureExtractor
+from .items import item_table
+from .tags import tokenize
+
+DEFAULT_DIM = 128
+DEFAULT_TABLES = 32
+DEFAULT_BITS = 10
+# Probe neighboring buckets until at least this many candidates per requested result
+CANDIDATES_PER_RESULT = 8
+
+
+class ItemEmbedder(OutfitFeatureExtractor):
+    """Item attribute vectors for similarity (the learned scorer's tokens plus name words)"""
+
+    def item_tokens(self, item: ClothingItem) -> List[str]:
+        return super().item_tokens(item) + [f"name={token}" for token in tokenize(item.name)]
+
+    def item_matrix(self, items: Sequence[ClothingItem]) -> np.ndarray:
+        """Signed hashed vectors (rows L2-normalised), so collisions cancel out on average.
+
+        Rows of canonical items are computed once per garment and reused
+        across wardrobes.
+        """
+        matrix = np.zeros((len(items), self.dim), dtype=np.float32)
+        for row, item in enumerate(items):
+            cid = item_table.canonical_id(item)
+            if cid is None:
+                matrix[row] = self._vector(item)
+            else:
+                matrix[row] = item_table.derived(('embedding', self.dim), cid, lambda: self._vector(item))
+        return matrix
+
+    def _vector(self, item: ClothingItem) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in self.item_tokens(item):
+            h = zlib.crc32(token.encode('utf-8'))
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        return vector / max(float(np.linalg.norm(vector)), 1e-6)
+
+
+class LSHIndex:
+    """Random-hyperplane LSH over unit vectors, with incremental inserts"""
+
+    def __init__(self, dim: int, n_tables: int = DEFAULT_TABLES, n_bits: int = DEFAULT_BITS, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self._planes = rng.standard_normal((dim, n_tables * n_bits)).astype(np.float32)
+        self._weights = (1 << np.arange(n_bits)).astype(np.int64)
+        self._buckets: List[Dict[int, List[int]]] = [dict() for _ in range(n_tables)]
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self.size = 0
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        bits = (vectors @ self._planes).reshape(len(vectors), self.n_tables, self.n_bits) > 0
+        return bits @ self._weights
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Insert vectors; returns their positions"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        start, end = self.size, self.size + len(vectors)
+        if end > len(self._vectors):
+            # Grow geometrically so repeated small inserts stay amortised O(1)
+            grown = np.zeros((max(end, 2 * len(self._vectors), 64), self.dim), dtype=np.float32)
+            grown[:start] = self._vectors[:start]
+            self._vectors = grown
+        self._vectors[start:end] = vectors
+        for offset, codes in enumerate(self._codes(vectors).tolist()):
+            for table, code in zip(self._buckets, codes):
+                table.setdefault(code, []).append(start + offset)
+        self.size = end
+        return np.arange(start, end)
+
+    def candidates(
+        self,
+        vector: np.ndarray,
+        wanted: int,
+        allowed: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> np.ndarray:
+        codes = self._codes(vector.reshape(1, -1))[0].tolist()
+        found = set()
+        for table, code in zip(self._buckets, codes):
+            found.update(table.get(code, ()))
+        positions = self._filter(found, allowed)
+        if len(positions) < wanted:
+            # Multi-probe: buckets whose code differs in one bit
+            for table, code in zip(self._buckets, codes):
+                for bit in range(self.n_bits):
+                    found.update(table.get(code ^ (1 << bit), ()))
+            positions = self._filter(found, allowed)
+        return positions
+
+    @staticmethod
+    def _filter(found, allowed) -> np.ndarray:
+        positions = np.fromiter(found, dtype=np.int64, count=len(found))
+        if allowed is not None and len(positions):
+            positions = positions[allowed(positions)]
+        return positions
+
+    def query(
+        self,
+        vector: np.ndarray,
+        k: int,
+        allowed: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions and cosine similarities of (approximately) the k nearest vectors.
+
+        ``allowed`` maps an array of candidate positions to a boolean mask of
+        the ones that may be returned. Falls back to an exact scan when the
+        probed buckets hold fewer than ``k`` allowed vectors.
+        """
+        candidates = self.candidates(vector, k * CANDIDATES_PER_RESULT, allowed)
+        if len(candidates) < k:
+            # Too few hashed near the query (e.g. a strict filter): scan everything
+            return self.brute_force(vector, k, allowed)
+        sims = self._vectors[candidates] @ vector
+        # Highest similarity first; ties in insertion order
+        order = np.lexsort((candidates, -sims))[:k]
+        return candidates[order], sims[order]
+
+    def brute_force(
+        self,
+        vector: np.ndarray,
+        k: int,
+        allowed: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact k nearest neighbors"""
+        positions = np.arange(self.size)
+        if allowed is not None:
+            positions = positions[allowed(positions)]
+        sims = self._vectors[positions] @ vector
+        order = np.lexsort((positions, -sims))[:k]
+        return positions[order], sims[order]
+
+
+class SimilarItemsIndex:
+    def __init__(
+        self,
+        items: Iterable[ClothingItem] = (),
+        dim: int = DEFAULT_DIM,
+        n_tables: int = DEFAULT_TABLES,
+        n_bits: int = DEFAULT_BITS,
+        seed: int = 0
+    ):
+        self.embedder = ItemEmbedder(dim)
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self._partitions: Dict[ClothingType, LSHIndex] = {}
+        self._items: Dict[ClothingType, List[ClothingItem]] = {}
+        self.position: Dict[str, Tuple[ClothingType, int]] = {}
+        self.add(items)
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def add(self, items: Iterable[ClothingItem]) -> int:
+        """Insert items not already indexed (by item_id); returns how many were added"""
+        by_type: Dict[ClothingType, List[ClothingItem]] = {}
+        for item in items:
+            if item.item_id in self.position:
+                continue
+            self.position[item.item_id] = (item.item_type, -1)
+            by_type.setdefault(item.item_type, []).append(item)
+        for item_type, new_items in by_type.items():
+            partition = self._partitions.get(item_type)
+            if partition is None:
+                partition = LSHIndex(self.embedder.dim, self.n_tables, self.n_bits, self.seed)
+                self._partitions[item_type] = partition
+                self._items[item_type] = []
+            positions = partition.add(self.embedder.item_matrix(new_items))
+            self._items[item_type].extend(new_items)
+            for item, position in zip(new_items, positions.tolist()):
+                self.position[item.item_id] = (item_type, position)
+        return sum(len(new_items) for new_items in by_type.values())
+
+    def similar(
+        self,
+        item: ClothingItem,
+        k: int = 5,
+        same_type: bool = True,
+        predicate: Optional[Callable[[ClothingItem], bool]] = None,
+        exact: bool = False
+    ) -> List[Tuple[ClothingItem, float]]:
+        """Most similar indexed items to ``item`` (which need not be indexed itself).
+
+        ``predicate`` restricts which items may be returned, e.g. to clean
+        items; ``exact`` scans the whole partition instead of using LSH.
+        """
+        vector = self.embedder.item_matrix([item])[0]
+        types = [item.item_type] if same_type else list(self._partitions)
+        results: List[Tuple[ClothingItem, float]] = []
+        for item_type in types:
+            partition = self._partitions.get(item_type)
+            if partition is None:
+                continue
+            items = self._items[item_type]
+
+            own = self.position.get(item.item_id)
+            own_position = own[1] if own is not None and own[0] == item_type else -1
+
+            def allowed(positions: np.ndarray) -> np.ndarray:
+                if predicate is None:
+                    mask = np.ones(len(positions), dtype=bool)
+                else:
+                    mask = np.fromiter(
+                        (predicate(items[p]) for p in positions.tolist()), dtype=bool, count=len(positions)
+                    )
+                return mask & (positions != own_position)
+
+            search = partition.brute_force if exact else partition.query
+            positions, sims = search(vector, k, allowed)
+            results.extend((items[p], round(float(s), 4)) for p, s in zip(positions.tolist(), sims.tolist()))
+        results.sort(key=lambda result: -result[1])
+        return results[:k]
@@ -0,0 +1,79 @@
+"""Single-flight coalescing of identical concurrent computations.
+
+The first caller for a key (the "leader") starts the computation; every caller
+that arrives with the same key while it is still running awaits the same
+result instead of starting its own copy.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    def __init__(self, default_timeout: Optional[float] = None):
+        self.default_timeout = default_timeout
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'max_waiters': 0,
+        }
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run ``fn`` once per key and share its result with concurrent callers.
+
+        ``timeout`` applies to the shared computation, so every caller coalesced
+        onto a key fails with ``asyncio.TimeoutError`` at the same moment and
+        the key is free to be retried. The timeout cancels ``fn`` but cannot
+        stop work it handed to a thread (``AdmissionController.run`` keeps
+        such work on its slot until it returns).
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        self._stats['calls'] += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            self._stats['executions'] += 1
+            task = asyncio.ensure_future(asyncio.wait_for(fn(), timeout))
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self._stats['coalesced'] += 1
+            self._waiters[key] += 1
+            self._stats['max_waiters'] = max(self._stats['max_waiters'], self._waiters[key])
+            logger.debug(f"Coalescing request onto in-flight key {key[:12]} ({self._waiters[key]} waiters)")
+
+        # Shield so one caller disconnecting does not cancel the shared work
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._waiters.pop(key, None)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if isinstance(exc, asyncio.TimeoutError):
+            self._stats['timeouts'] += 1
+        elif exc is not None:
+            self._stats['errors'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the coalescing counters"""
+        return {
+            **self._stats,
+            'inflight_keys': len(self._inflight),
+            'inflight_waiters': sum(self._waiters.values()),
+        }
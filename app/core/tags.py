@@ -0,0 +1,126 @@
+"""Garment tags derived from item names.
+
+Names are tokenized once per item and matched against keyword phrases to
+produce normalized tags that validation rules consume directly, instead of
+running substring checks on every candidate. Matching is on whole tokens and
+phrases, so "Short Sleeve Shirt" is tagged ``short_sleeve`` rather than
+``shorts``; compound words are matched by prefix or suffix ("Peacoat",
+"Rainboots"). Results are cached by a hash of the item's content, so the same
+item seen in later requests is not re-tokenized.
+"""
+import hashlib
+import re
+from typing import FrozenSet, List, Sequence, Tuple
+
+from ..models.schemas import ClothingItem
+from .cache import LRUCache
+
+RAIN_GEAR = 'rain_gear'
+SHORT_SLEEVE = 'short_sleeve'
+SHORTS = 'shorts'
+HEAVY_OUTERWEAR = 'heavy_outerwear'
+
+# (phrase tokens, tag); longer phrases are matched first and consume their tokens
+KEYWORD_TAGS: List[Tuple[Tuple[str, ...], str]] = [
+    (('short', 'sleeve'), SHORT_SLEEVE),
+    (('short', 'sleeved'), SHORT_SLEEVE),
+    (('t', 'shirt'), SHORT_SLEEVE),
+    (('tee',), SHORT_SLEEVE),
+    (('tshirt',), SHORT_SLEEVE),
+    (('tank',), SHORT_SLEEVE),
+    (('shorts',), SHORTS),
+    (('short',), SHORTS),
+    (('rain',), RAIN_GEAR),
+    (('raincoat',), RAIN_GEAR),
+    (('rainproof',), RAIN_GEAR),
+    (('coat',), HEAVY_OUTERWEAR),
+    (('overcoat',), HEAVY_OUTERWEAR),
+    (('jacket',), HEAVY_OUTERWEAR),
+    (('parka',), HEAVY_OUTERWEAR),
+    (('puffer',), HEAVY_OUTERWEAR),
+]
+_PHRASES = sorted(KEYWORD_TAGS, key=lambda entry: -len(entry[0]))
+
+# Compound words left over after phrase matching ("Peacoat", "Rainboots")
+COMPOUND_SUFFIX_TAGS: List[Tuple[Tuple[str, ...], str]] = [
+    (('coat', 'coats', 'jacket', 'jackets'), HEAVY_OUTERWEAR),
+]
+COMPOUND_PREFIX_TAGS: List[Tuple[Tuple[str, ...], str]] = [
+    (('rain',), RAIN_GEAR),
+]
+# Compounds that only look like garment words
+COMPOUND_EXCEPTIONS = frozenset({'rainbow', 'rainbows', 'waistcoat', 'waistcoats', 'petticoat', 'petticoats'})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_cache = LRUCache(maxsize=100_000)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens ("T-Shirt" -> ["t", "shirt"])"""
+    tokens = []
+    for token in _TOKEN_RE.findall((text or '').lower()):
+        # Plural garment words: "tees", "jackets" -> "tee", "jacket"
+        if token.endswith('s') and token[:-1] in {'tee', 'jacket', 'coat', 'parka', 'tank'}:
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def extract_tags(name: str) -> FrozenSet[str]:
+    tokens = tokenize(name)
+    consumed = [False] * len(tokens)
+    tags = set()
+    for phrase, tag in _PHRASES:
+        size = len(phrase)
+        for start in range(len(tokens) - size + 1):
+            if any(consumed[start:start + size]):
+                continue
+            if tuple(tokens[start:start + size]) == phrase:
+                tags.add(tag)
+                for i in range(start, start + size):
+                    consumed[i] = True
+    for token, used in zip(tokens, consumed):
+        if used or token in COMPOUND_EXCEPTIONS:
+            continue
+        tags.update(tag for suffixes, tag in COMPOUND_SUFFIX_TAGS if token.endswith(suffixes))
+        tags.update(tag for prefixes, tag in COMPOUND_PREFIX_TAGS if token.startswith(prefixes))
+    # A rain jacket is protective, not heavy
+    if RAIN_GEAR in tags:
+        tags.discard(HEAVY_OUTERWEAR)
+    return frozenset(tags)
+
+
+def item_content_hash(item: ClothingItem) -> str:
+    """Hash of the attributes that describe the garment itself"""
+    key = '\x1f'.join((item.item_type.value, item.name or '', item.brand or '', item.color, item.material))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def garment_tags(item: ClothingItem) -> FrozenSet[str]:
+    """Tags for an item, extracted once per distinct item content.
+
+    The tags are also pinned on the item instance, so validation of later
+    candidates containing the same item is a plain attribute read. The pinned
+    value remembers the name it was derived from, so a renamed copy of the
+    item is re-tagged.
+    """
+    pinned = item._garment_tags
+    if pinned is not None and pinned[0] is item.name:
+        return pinned[1]
+    key = item_content_hash(item)
+    tags = _cache.get(key)
+    if tags is None:
+        tags = extract_tags(item.name)
+        _cache.put(key, tags)
+    item._garment_tags = (item.name, tags)
+    return tags
+
+
+def ingest(items: Sequence[ClothingItem]) -> List[FrozenSet[str]]:
+    """Tag a batch of items up front (e.g. when an inventory is received)"""
+    return [garment_tags(item) for item in items]
+
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,118 @@
+"""
+Offline training for the learned compatibility scorer.
+
+Reads logged outfits as JSONL, one record per line:
+
+    {"items": [<ClothingItem>, ...], "occasion": <OccasionInfo>,
+     "user_info": <UserInfo, optional>, "label": 1}
+
+``label`` may be replaced by ``event`` ("liked", "worn", "skipped",
+"disliked"), so feedback logs can be used directly. Writes a ``.npz`` model
+that the API loads via ``OUTFIT_SCORER_MODEL_PATH``.
+
+Usage:
+    python -m app.core.train_scorer logged_outfits.jsonl --out scorer.npz
+"""
+import argparse
+import json
+import logging
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..models.schemas import ClothingItem, OccasionInfo, UserInfo
+from .color import ColorHarmony
+from .learned import (
+    DEFAULT_DIM,
+    NEGATIVE_EVENTS,
+    POSITIVE_EVENTS,
+    LearnedScorer,
+    OutfitFeatureExtractor
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _label(record: dict) -> Optional[int]:
+    if 'label' in record:
+        return int(bool(record['label']))
+    event = record.get('event')
+    if event in POSITIVE_EVENTS:
+        return 1
+    if event in NEGATIVE_EVENTS:
+        return 0
+    return None
+
+
+def load_dataset(path: str, extractor: OutfitFeatureExtractor) -> Tuple[np.ndarray, np.ndarray]:
+    """Featurize a log, batching records that share a request context"""
+    harmony = ColorHarmony()
+    groups = defaultdict(list)
+    skipped = 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            label = _label(record)
+            if label is None or not record.get('items') or not record.get('occasion'):
+                skipped += 1
+                continue
+            key = json.dumps([record['occasion'], record.get('user_info')], sort_keys=True)
+            groups[key].append((record, label))
+
+    features: List[np.ndarray] = []
+    labels: List[int] = []
+    for entries in groups.values():
+        first = entries[0][0]
+        occasion = OccasionInfo(**first['occasion'])
+        user_info = UserInfo(**first['user_info']) if first.get('user_info') else None
+        candidates = [[ClothingItem(**item) for item in record['items']] for record, _ in entries]
+        palettes = harmony.score_palettes(
+            harmony.index_matrix([[item.color for item in items] for items in candidates])
+        )
+        features.append(extractor.transform(candidates, user_info, occasion, palettes))
+        labels.extend(label for _, label in entries)
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} records without a usable label, items or occasion")
+    if not features:
+        raise SystemExit(f"No usable training records in {path}")
+    return np.vstack(features), np.array(labels)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data', help='JSONL file of logged outfits or feedback events')
+    parser.add_argument('--out', default='scorer.npz', help='where to write the model')
+    parser.add_argument('--dim', type=int, default=DEFAULT_DIM, help='hashed feature dimension')
+    parser.add_argument('--C', type=float, default=1.0, help='inverse regularisation strength')
+    args = parser.parse_args(argv)
+
+    try:
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import train_test_split
+    except ImportError:
+        raise SystemExit("Training requires scikit-learn: pip install -r requirements.txt")
+
+    extractor = OutfitFeatureExtractor(args.dim)
+    X, y = load_dataset(args.data, extractor)
+    logger.info(f"Loaded {len(y)} examples ({int(y.sum())} positive)")
+    if len(set(y.tolist())) < 2:
+        raise SystemExit("Training data needs both positive and negative examples")
+
+    stratify = y if min(np.bincount(y)) >= 2 else None
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=0, stratify=stratify)
+    model = LogisticRegression(C=args.C, max_iter=1000)
+    model.fit(X_train, y_train)
+    logger.info(f"Held-out accuracy: {model.score(X_test, y_test):.3f}")
+
+    scorer = LearnedScorer(weights=model.coef_[0], bias=float(model.intercept_[0]), dim=args.dim)
+    scorer.save(args.out)
+    logger.info(f"Wrote model to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,14 @@ import logging
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from app.api.endpoints import router as api_router
+from app.api.endpoints import router as api_router, jobs, precompute
+from app.core import config
+from app.core.compression import CompressionMiddleware
+from app.core.httpcache import HashedStaticFiles
 
 # Configure logging
 logging.basicConfig(
@@ -19,12 +22,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume background jobs a previous run left unfinished
+    jobs.start()
+    precompute.start()
+    yield
+    precompute.stop(timeout=5)
+    jobs.stop(timeout=5)
+
 app = FastAPI(
     title="Outfit Curation Engine API",
     description="An intelligent outfit recommendation system that curates outfits based on user preferences, inventory, and occasion.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# Negotiated gzip/brotli for everything above the size threshold
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=config.GZIP_LEVEL,
+    brotli_quality=config.BROTLI_QUALITY
 )
 
 # CORS middleware configuration
@@ -39,8 +60,9 @@ app.add_middleware(
 # Include API routers
 app.include_router(api_router, prefix="/api/v1", tags=["outfits"])
 
-# Mount static frontend at /ui (serve index.html when requesting /ui)
-app.mount("/ui", StaticFiles(directory="app/static", html=True), name="ui")
+# Mount static frontend at /ui (serve index.html when requesting /ui). Assets are
+# referenced by content-hashed names and cached for a year; index.html is revalidated.
+app.mount("/ui", HashedStaticFiles(directory="app/static", prefix="/ui"), name="ui")
 
 @app.get("/")
 @app.get("/health", tags=["health"])
@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, HttpUrl
-from datetime import datetime
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
+from pydantic import BaseModel, Field, HttpUrl, PrivateAttr
+from datetime import date, datetime
 
 # Enums for various attributes
 class BodyType(str, Enum):
@@ -46,6 +46,19 @@ class WeatherType(str, Enum):
     RAINY = "rainy"
     SNOWY = "snowy"
 
+class FeedbackType(str, Enum):
+    LIKED = "liked"
+    WORN = "worn"
+    SKIPPED = "skipped"
+    DISLIKED = "disliked"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
 # Core Models
 class UserInfo(BaseModel):
     user_id: str
@@ -81,6 +94,10 @@ class ClothingItem(BaseModel):
     last_worn: Optional[datetime] = None
     is_clean: bool = True
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    # (name, tags) filled by app.core.tags at ingest; not part of the API
+    _garment_tags: Optional[Tuple[str, FrozenSet[str]]] = PrivateAttr(default=None)
+    # Id in app.core.items.item_table once the item shares its canonical garment
+    _canonical_id: Optional[int] = PrivateAttr(default=None)
 
 class Outfit(BaseModel):
     outfit_id: str
@@ -99,3 +116,185 @@ class OutfitRecommendationRequest(BaseModel):
     consider_previous_outfits: bool = True
     style_preferences: Optional[List[str]] = None
     color_preferences: Optional[List[str]] = None
+    include_item_ids: List[str] = Field(default_factory=list)  # every outfit must contain these
+    exclude_item_ids: List[str] = Field(default_factory=list)
+    exclude_worn_within_days: Optional[int] = Field(default=None, ge=0)
+    substitute_unavailable: bool = False  # swap pinned items that are not clean for their closest clean match
+    diversity_weight: float = Field(default=0.0, ge=0.0, le=1.0)  # 0 ranks by confidence only; higher spreads items across outfits
+    seed: Optional[int] = None  # same seed and request give the same outfits; drawn by the server if omitted
+
+class OutfitPageRequest(OutfitRecommendationRequest):
+    page_size: int = Field(default=5, ge=1, le=100)
+    cursor: Optional[str] = None  # opaque token from a previous OutfitPage
+    seed: Optional[int] = None  # only used for the first page
+
+class OutfitPage(BaseModel):
+    outfits: List[Outfit]
+    next_cursor: Optional[str] = None
+    total_combinations: int
+
+class FeedbackEvent(BaseModel):
+    user_id: str
+    event: FeedbackType
+    items: List[ClothingItem]
+    outfit_id: Optional[str] = None
+    occasion: Optional[OccasionInfo] = None
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class CompleteLookRequest(BaseModel):
+    user_info: UserInfo
+    occasion: OccasionInfo
+    inventory: List[ClothingItem]
+    anchor_item_id: str
+    suggestions_per_slot: int = Field(default=3, ge=1, le=25)
+    # Opaque client version of the inventory; lets the server reuse its index without hashing every item
+    inventory_version: Optional[str] = Field(default=None, max_length=128)
+
+class SlotSuggestions(BaseModel):
+    item_type: ClothingType
+    items: List[ClothingItem]
+
+class CompleteLookResponse(BaseModel):
+    anchor: ClothingItem
+    outfit: Optional[Outfit] = None
+    suggestions: List[SlotSuggestions]
+
+class OutfitCountRequest(BaseModel):
+    user_info: UserInfo
+    occasion: OccasionInfo
+    inventory: List[ClothingItem]
+    include_optional: bool = False  # also count outerwear/accessory variants
+
+class OutfitCountResponse(BaseModel):
+    count: int
+    exact: bool
+    lower: int
+    upper: int
+    method: str
+    total_combinations: int
+    slots: Dict[str, int]
+    missing_types: List[ClothingType]
+    samples: Optional[int] = None
+
+class PlanEntry(BaseModel):
+    day: date
+    occasion: OccasionInfo
+    label: Optional[str] = None  # e.g. "office", "dinner"
+
+class WeeklyPlanRequest(BaseModel):
+    user_info: UserInfo
+    inventory: List[ClothingItem]
+    schedule: List[PlanEntry] = Field(min_length=1, max_length=62)
+    max_uses_per_item: int = Field(default=1, ge=1)
+    laundry_gap_days: int = Field(default=2, ge=0)  # days an item is unavailable after being worn
+    exclude_item_ids: List[str] = Field(default_factory=list)
+    seed: int = 0
+
+class PlannedDay(BaseModel):
+    day: date
+    label: Optional[str] = None
+    occasion: OccasionInfo
+    outfit: Optional[Outfit] = None  # None if the constraints leave no valid outfit
+
+class WeeklyPlanResponse(BaseModel):
+    days: List[PlannedDay]
+    planned: int
+    unplanned: int
+    item_uses: Dict[str, int]
+
+class PackingRequest(BaseModel):
+    user_info: UserInfo
+    inventory: List[ClothingItem]
+    itinerary: List[PlanEntry] = Field(min_length=1, max_length=62)
+    time_limit_ms: Optional[int] = Field(default=None, ge=10)  # capped by the server's own limit
+
+class PackingResponse(BaseModel):
+    items: List[ClothingItem]  # the packing list
+    days: List[PlannedDay]
+    uncovered: List[str]  # "<day>:<type>" slots no item in the wardrobe can fill
+    greedy_size: int  # packing list size before local search
+    timed_out: bool
+    elapsed_ms: float
+
+class SimilarItemsRequest(BaseModel):
+    inventory: List[ClothingItem]
+    item_id: str
+    k: int = Field(default=5, ge=1, le=50)
+    same_type: bool = True
+    clean_only: bool = False
+    inventory_version: Optional[str] = Field(default=None, max_length=128)  # see CompleteLookRequest
+
+class SimilarItem(BaseModel):
+    item: ClothingItem
+    similarity: float
+
+class SimilarItemsResponse(BaseModel):
+    item: ClothingItem
+    similar: List[SimilarItem]
+
+class SearchRequest(BaseModel):
+    inventory: List[ClothingItem]
+    query: str  # e.g. "navy wool blazer", "color:navy AND style:formal -jeans", "blaz*"
+    offset: int = Field(default=0, ge=0)
+    limit: int = Field(default=20, ge=1, le=100)
+    match_all: bool = False  # treat adjacent words as AND instead of OR
+    inventory_version: Optional[str] = Field(default=None, max_length=128)  # see CompleteLookRequest
+
+class SearchHit(BaseModel):
+    item: ClothingItem
+    score: float
+
+class SearchResponse(BaseModel):
+    hits: List[SearchHit]
+    total: int
+    offset: int
+    next_offset: Optional[int] = None
+
+class PrecomputeRegistration(BaseModel):
+    # Everything a user's upcoming requests share; one request per schedule entry is precomputed
+    user_info: UserInfo
+    inventory: List[ClothingItem]
+    schedule: List[PlanEntry] = Field(min_length=1, max_length=62)
+    max_outfits: int = 5
+    consider_previous_outfits: bool = True
+    diversity_weight: float = Field(default=0.0, ge=0.0, le=1.0)
+
+class SessionUpdate(BaseModel):
+    # A delta to a styling session; every field is optional
+    occasion_type: Optional[OccasionType] = None
+    weather: Optional[WeatherType] = None
+    exclude_item_ids: List[str] = Field(default_factory=list)  # added to the exclusions
+    restore_item_ids: List[str] = Field(default_factory=list)  # removed from the exclusions
+    style_preferences: Optional[List[str]] = None
+    color_preferences: Optional[List[str]] = None
+    max_outfits: Optional[int] = Field(default=None, ge=1, le=50)
+    diversity_weight: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+class SessionOutfits(BaseModel):
+    type: str = "outfits"
+    version: int  # increases with every update the session answers
+    outfits: List[Outfit]
+    recomputed: str  # deepest stage redone: "filter", "generate" or "rerank"
+    excluded_item_ids: List[str]
+    elapsed_ms: float
+
+class JobSubmitRequest(BaseModel):
+    # Exactly one of: inline recommendation requests, or a local JSONL file of them
+    requests: Optional[List[OutfitRecommendationRequest]] = None
+    input_path: Optional[str] = None
+
+class JobInfo(BaseModel):
+    job_id: str
+    status: JobStatus
+    total: Optional[int] = None  # unknown until a file-backed job starts
+    completed: int
+    failed: int
+    created_at: datetime
+    updated_at: datetime
+    error: Optional[str] = None
+
+class JobResultsPage(BaseModel):
+    job: JobInfo
+    results: List[Dict[str, Any]]  # {"index": n, "outfits": [...]} or {"index": n, "error": "..."}
+    offset: int
+    next_offset: Optional[int] = None  # None once the job is finished and every result was returned
@@ -1,487 +1,368 @@
 document.addEventListener('DOMContentLoaded', () => {
   const form = document.getElementById('request-form');
+  const statusEl = document.getElementById('status');
   const resultsEl = document.getElementById('results');
+  const excludedEl = document.getElementById('excluded');
   const inventoryEl = document.getElementById('inventory');
+  const editorEl = document.getElementById('inventory-editor');
+  const summaryEl = document.getElementById('inventory-summary');
 
-  // Prefill inventory with the same items used in tests
-  const defaultInventory = [
-    // Business casual / formal set
-    {
-      item_id: 'top1',
-      item_type: 'top',
-      name: 'Blue Dress Shirt',
-      color: 'blue',
-      material: 'cotton',
-      size: 'M',
-      style: ['formal', 'business'],
-      weather_suitability: ['cool', 'mild', 'warm'],
-      occasion_suitability: ['business_casual', 'casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'bottom1',
-      item_type: 'bottom',
-      name: 'Black Dress Pants',
-      color: 'black',
-      material: 'wool',
-      size: '32',
-      style: ['formal', 'business'],
-      weather_suitability: ['cool', 'mild'],
-      occasion_suitability: ['business_casual', 'casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'shoes1',
-      item_type: 'shoes',
-      name: 'Black Leather Shoes',
-      color: 'black',
-      material: 'leather',
-      size: '42',
-      style: ['formal', 'classic'],
-      weather_suitability: ['cool', 'mild'],
-      occasion_suitability: ['business_casual', 'casual'],
-      is_clean: true,
-      metadata: {}
-    },
+  const OVERSCAN = 6;
+  const CACHED_RESPONSES = 32;
 
-    // Casual set
-    {
-      item_id: 'top2',
-      item_type: 'top',
-      name: 'White T-Shirt',
-      color: 'white',
-      material: 'cotton',
-      size: 'M',
-      style: ['casual', 'minimalist'],
-      weather_suitability: ['warm', 'hot', 'mild'],
-      occasion_suitability: ['casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'bottom2',
-      item_type: 'bottom',
-      name: 'Dark Blue Jeans',
-      color: 'blue',
-      material: 'denim',
-      size: '32',
-      style: ['casual'],
-      weather_suitability: ['cool', 'mild', 'warm'],
-      occasion_suitability: ['casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'shoes2',
-      item_type: 'shoes',
-      name: 'White Sneakers',
-      color: 'white',
-      material: 'synthetic',
-      size: '42',
-      style: ['casual', 'minimalist'],
-      weather_suitability: ['mild', 'warm', 'hot'],
-      occasion_suitability: ['casual'],
-      is_clean: true,
-      metadata: {}
-    },
-
-    // Rainy / outerwear
-    {
-      item_id: 'outer1',
-      item_type: 'outerwear',
-      name: 'Navy Raincoat',
-      color: 'navy',
-      material: 'polyester',
-      size: 'M',
-      style: ['casual', 'classic'],
-      weather_suitability: ['rainy', 'cool', 'cold'],
-      occasion_suitability: ['casual', 'business_casual'],
-      is_clean: true,
-      metadata: {}
-    },
+  // Renders only the rows in (or near) the viewport, so lists of thousands of
+  // items cost the same as a screenful. Rows have a fixed height.
+  class VirtualList {
+    constructor(container, rowHeight, renderRow) {
+      this.container = container;
+      this.rowHeight = rowHeight;
+      this.renderRow = renderRow;
+      this.rows = [];
+      this.visible = new Map();  // row index -> node
+      this.frame = null;
+      this.spacer = document.createElement('div');
+      this.spacer.className = 'virtual-spacer';
+      container.appendChild(this.spacer);
+      container.hidden = true;
+      container.addEventListener('scroll', () => this.schedule(), { passive: true });
+      window.addEventListener('resize', () => this.schedule());
+    }
 
-    // Party set
-    {
-      item_id: 'top3',
-      item_type: 'top',
-      name: 'Black Silk Shirt',
-      color: 'black',
-      material: 'silk',
-      size: 'M',
-      style: ['party', 'formal'],
-      weather_suitability: ['mild', 'warm'],
-      occasion_suitability: ['party', 'formal'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'bottom3',
-      item_type: 'bottom',
-      name: 'Slim Chinos',
-      color: 'khaki',
-      material: 'cotton',
-      size: '32',
-      style: ['casual', 'smart_casual'],
-      weather_suitability: ['mild', 'warm'],
-      occasion_suitability: ['party', 'business_casual', 'casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'shoes3',
-      item_type: 'shoes',
-      name: 'Brown Brogues',
-      color: 'brown',
-      material: 'leather',
-      size: '42',
-      style: ['classic', 'business'],
-      weather_suitability: ['mild', 'cool'],
-      occasion_suitability: ['business_casual', 'party'],
-      is_clean: true,
-      metadata: {}
-    },
+    setRows(rows) {
+      this.rows = rows;
+      this.visible.forEach(node => node.remove());
+      this.visible.clear();
+      this.spacer.style.height = `${rows.length * this.rowHeight}px`;
+      this.container.hidden = rows.length === 0;
+      this.container.scrollTop = 0;
+      this.schedule();
+    }
 
-    // Sport set
-    {
-      item_id: 'top4',
-      item_type: 'top',
-      name: 'Moisture-Wicking Tee',
-      color: 'gray',
-      material: 'polyester',
-      size: 'M',
-      style: ['sport'],
-      weather_suitability: ['warm', 'hot'],
-      occasion_suitability: ['sporty'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'bottom4',
-      item_type: 'bottom',
-      name: 'Running Shorts',
-      color: 'black',
-      material: 'synthetic',
-      size: 'M',
-      style: ['sport'],
-      weather_suitability: ['warm', 'hot'],
-      occasion_suitability: ['sporty'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'shoes4',
-      item_type: 'shoes',
-      name: 'Running Shoes',
-      color: 'blue',
-      material: 'mesh',
-      size: '42',
-      style: ['sport'],
-      weather_suitability: ['mild', 'warm', 'hot'],
-      occasion_suitability: ['sporty'],
-      is_clean: true,
-      metadata: {}
-    },
+    schedule() {
+      if (this.frame === null) {
+        this.frame = requestAnimationFrame(() => {
+          this.frame = null;
+          this.render();
+        });
+      }
+    }
 
-    // Cold weather boots
-    {
-      item_id: 'shoes5',
-      item_type: 'shoes',
-      name: 'Black Chelsea Boots',
-      color: 'black',
-      material: 'leather',
-      size: '42',
-      style: ['classic'],
-      weather_suitability: ['cold', 'cool', 'mild'],
-      occasion_suitability: ['business_casual', 'casual', 'party'],
-      is_clean: true,
-      metadata: {}
-    },
+    render() {
+      const { scrollTop, clientHeight } = this.container;
+      const first = Math.max(0, Math.floor(scrollTop / this.rowHeight) - OVERSCAN);
+      const last = Math.min(this.rows.length, Math.ceil((scrollTop + clientHeight) / this.rowHeight) + OVERSCAN);
+      this.visible.forEach((node, index) => {
+        if (index < first || index >= last) {
+          node.remove();
+          this.visible.delete(index);
+        }
+      });
+      for (let i = first; i < last; i++) {
+        if (this.visible.has(i)) continue;
+        const node = this.renderRow(this.rows[i], i);
+        node.classList.add('virtual-row');
+        node.style.height = `${this.rowHeight}px`;
+        node.style.transform = `translateY(${i * this.rowHeight}px)`;
+        this.spacer.appendChild(node);
+        this.visible.set(i, node);
+      }
+    }
+  }
 
-    // Evening set
-    {
-      item_id: 'top5',
-      item_type: 'top',
-      name: 'Navy Dress Shirt',
-      color: 'navy',
-      material: 'cotton',
-      size: 'M',
-      style: ['formal', 'evening'],
-      weather_suitability: ['cool', 'mild', 'warm'],
-      occasion_suitability: ['evening', 'formal'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'bottom5',
-      item_type: 'bottom',
-      name: 'Charcoal Dress Pants',
-      color: 'gray',
-      material: 'wool',
-      size: '32',
-      style: ['formal', 'evening'],
-      weather_suitability: ['cool', 'mild'],
-      occasion_suitability: ['evening', 'formal'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'shoes6',
-      item_type: 'shoes',
-      name: 'Patent Leather Oxfords',
-      color: 'black',
-      material: 'leather',
-      size: '42',
-      style: ['formal', 'evening'],
-      weather_suitability: ['cool', 'mild', 'warm'],
-      occasion_suitability: ['evening', 'formal'],
-      is_clean: true,
-      metadata: {}
-    },
+  // Least recently used responses by request body digest (see InventoryCore.bodyKey)
+  class ResponseCache {
+    constructor(limit) {
+      this.limit = limit;
+      this.entries = new Map();
+    }
 
-    // Beach set
-    {
-      item_id: 'top6',
-      item_type: 'top',
-      name: 'White Linen Shirt',
-      color: 'white',
-      material: 'linen',
-      size: 'M',
-      style: ['casual', 'beach'],
-      weather_suitability: ['warm', 'hot'],
-      occasion_suitability: ['beach', 'casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'bottom6',
-      item_type: 'bottom',
-      name: 'Beige Shorts',
-      color: 'beige',
-      material: 'cotton',
-      size: 'M',
-      style: ['casual', 'beach'],
-      weather_suitability: ['warm', 'hot'],
-      occasion_suitability: ['beach', 'casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'shoes7',
-      item_type: 'shoes',
-      name: 'Flip Flops',
-      color: 'black',
-      material: 'rubber',
-      size: '42',
-      style: ['casual', 'beach'],
-      weather_suitability: ['warm', 'hot'],
-      occasion_suitability: ['beach'],
-      is_clean: true,
-      metadata: {}
-    },
+    get(key) {
+      if (!this.entries.has(key)) return undefined;
+      const value = this.entries.get(key);
+      this.entries.delete(key);
+      this.entries.set(key, value);
+      return value;
+    }
 
-    // Rainy footwear
-    {
-      item_id: 'shoes8',
-      item_type: 'shoes',
-      name: 'Rain Boots',
-      color: 'black',
-      material: 'rubber',
-      size: '42',
-      style: ['casual', 'classic'],
-      weather_suitability: ['rainy', 'cold', 'cool'],
-      occasion_suitability: ['casual', 'business_casual'],
-      is_clean: true,
-      metadata: {}
-    },
+    put(key, value) {
+      this.entries.delete(key);
+      this.entries.set(key, value);
+      if (this.entries.size > this.limit) this.entries.delete(this.entries.keys().next().value);
+    }
+  }
 
-    // Cold outerwear
-    {
-      item_id: 'outer2',
-      item_type: 'outerwear',
-      name: 'Wool Overcoat',
-      color: 'black',
-      material: 'wool',
-      size: 'M',
-      style: ['classic', 'formal'],
-      weather_suitability: ['cold', 'cool'],
-      occasion_suitability: ['formal', 'evening', 'business_casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    // Casual cold-weather top and outerwear
-    {
-      item_id: 'top_casual_cold',
-      item_type: 'top',
-      name: 'Fleece Hoodie',
-      color: 'navy',
-      material: 'fleece',
-      size: 'M',
-      style: ['casual'],
-      weather_suitability: ['cold', 'cool'],
-      occasion_suitability: ['casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    {
-      item_id: 'outer_casual_cold',
-      item_type: 'outerwear',
-      name: 'Puffer Jacket',
-      color: 'black',
-      material: 'synthetic',
-      size: 'M',
-      style: ['casual'],
-      weather_suitability: ['cold', 'cool'],
-      occasion_suitability: ['casual'],
-      is_clean: true,
-      metadata: {}
-    },
-    // Accessory
-    {
-      item_id: 'acc1',
-      item_type: 'accessory',
-      name: 'Leather Belt',
-      color: 'black',
-      material: 'leather',
-      size: 'L',
-      style: ['classic', 'minimalist'],
-      weather_suitability: ['cool', 'mild', 'warm', 'hot', 'cold', 'rainy'],
-      occasion_suitability: ['business_casual', 'casual', 'formal', 'party'],
-      is_clean: true,
-      metadata: {}
-    },
+  // Inventory parsing and request serialization run in a worker; the inline
+  // store is the fallback for browsers without workers.
+  const inventory = (() => {
+    let nextId = 0;
+    const pending = new Map();
+    if (!window.Worker) {
+      const store = window.InventoryCore.createStore();
+      return { call: (message) => store.handle(message) };
+    }
+    const worker = new Worker('/ui/inventory-worker.js');
+    worker.onmessage = (event) => {
+      const resolve = pending.get(event.data.id);
+      pending.delete(event.data.id);
+      if (resolve) resolve(event.data);
+    };
+    return {
+      call(message) {
+        const id = ++nextId;
+        return new Promise((resolve) => {
+          pending.set(id, resolve);
+          worker.postMessage({ ...message, id });
+        });
+      }
+    };
+  })();
 
-    // ==============================
-    // All-occasion, all-weather core
-    // These ensure at least one valid outfit for every combination
-    // ==============================
+  function element(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
 
-    // Formal core
-    { item_id: 'top_formal_all', item_type: 'top', name: 'All-Weather Formal Shirt', color: 'white', material: 'performance_cotton', size: 'M', style: ['formal'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['formal'], is_clean: true, metadata: {} },
-    { item_id: 'bottom_formal_all', item_type: 'bottom', name: 'All-Weather Formal Trousers', color: 'charcoal', material: 'tech_wool', size: '32', style: ['formal'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['formal'], is_clean: true, metadata: {} },
-    { item_id: 'shoes_formal_all', item_type: 'shoes', name: 'Waterproof Formal Oxfords', color: 'black', material: 'treated_leather', size: '42', style: ['formal'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['formal'], is_clean: true, metadata: {} },
+  const inventoryList = new VirtualList(document.getElementById('inventory-list'), 28, (item) => {
+    const row = element('div', 'inventory-row');
+    row.append(element('strong', null, item.name), ' ', element('span', 'muted', `${item.item_type} · ${item.color} · ${item.item_id}`));
+    return row;
+  });
 
-    // Business Casual core
-    { item_id: 'top_biz_all', item_type: 'top', name: 'All-Weather Oxford', color: 'light_blue', material: 'performance_cotton', size: 'M', style: ['business','classic'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['business_casual'], is_clean: true, metadata: {} },
-    { item_id: 'bottom_biz_all', item_type: 'bottom', name: 'Stretch Chinos', color: 'navy', material: 'tech_cotton', size: '32', style: ['business','classic'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['business_casual'], is_clean: true, metadata: {} },
-    { item_id: 'shoes_biz_all', item_type: 'shoes', name: 'All-Weather Derbies', color: 'brown', material: 'treated_leather', size: '42', style: ['classic','business'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['business_casual'], is_clean: true, metadata: {} },
+  const outfitList = new VirtualList(resultsEl, 120, (outfit, i) => {
+    const card = element('div', 'outfit-card');
+    const score = (typeof outfit.confidence_score === 'number') ? `${Math.round(outfit.confidence_score * 100)}%` : '—';
+    const title = element('h3', null, `Outfit #${i + 1} `);
+    title.appendChild(element('span', 'badge', score));
+    const items = element('ul', 'outfit-items');
+    for (const it of outfit.items || []) {
+      const li = element('li');
+      li.append(element('strong', null, it.name || it.item_id), ' ', element('span', 'muted', `(${it.item_type})`));
+      if ('WebSocket' in window) {
+        // Dropping an item opens (or reuses) the styling session
+        const drop = element('button', 'chip', '×');
+        drop.type = 'button';
+        drop.title = 'Exclude this item';
+        drop.dataset.exclude = it.item_id;
+        li.append(' ', drop);
+      }
+      items.appendChild(li);
+    }
+    card.append(title, items);
+    return card;
+  });
 
-    // Casual core
-    { item_id: 'top_casual_all', item_type: 'top', name: 'Tech Tee', color: 'gray', material: 'performance_poly', size: 'M', style: ['casual','minimalist'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['casual'], is_clean: true, metadata: {} },
-    { item_id: 'bottom_casual_all', item_type: 'bottom', name: 'All-Weather Jeans', color: 'dark_blue', material: 'tech_denim', size: '32', style: ['casual'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['casual'], is_clean: true, metadata: {} },
-    { item_id: 'shoes_casual_all', item_type: 'shoes', name: 'Weatherproof Sneakers', color: 'white', material: 'treated_mesh', size: '42', style: ['casual','minimalist'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['casual'], is_clean: true, metadata: {} },
+  const responses = new ResponseCache(CACHED_RESPONSES);
+  let session = null;  // open styling-session WebSocket, if any
+  let connecting = null;  // styling-session WebSocket not open yet
+  let current = null;  // { body, key } of the last submitted request
+  let inFlight = null;  // AbortController of a pending one-shot request
+  let generation = 0;  // bumped on every submit; stale replies are dropped
+  let excluded = [];
+  let editorDirty = false;
+  let editorLoaded = false;
 
-    // Sporty core
-    { item_id: 'top_sporty_all', item_type: 'top', name: 'All-Weather Training Tee', color: 'black', material: 'performance_poly', size: 'M', style: ['sport'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['sporty'], is_clean: true, metadata: {} },
-    { item_id: 'bottom_sporty_all', item_type: 'bottom', name: 'All-Weather Joggers', color: 'black', material: 'tech_poly', size: 'M', style: ['sport'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['sporty'], is_clean: true, metadata: {} },
-    { item_id: 'shoes_sporty_all', item_type: 'shoes', name: 'Trail Running Shoes', color: 'gray', material: 'treated_mesh', size: '42', style: ['sport'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['sporty'], is_clean: true, metadata: {} },
+  function setStatus(message, className) {
+    statusEl.className = className || '';
+    statusEl.textContent = message || '';
+  }
 
-    // Evening core
-    { item_id: 'top_evening_all', item_type: 'top', name: 'Evening Dress Shirt (All-Weather)', color: 'black', material: 'performance_cotton', size: 'M', style: ['evening','formal'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['evening'], is_clean: true, metadata: {} },
-    { item_id: 'bottom_evening_all', item_type: 'bottom', name: 'Evening Dress Trousers', color: 'black', material: 'tech_wool', size: '32', style: ['evening','formal'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['evening'], is_clean: true, metadata: {} },
-    { item_id: 'shoes_evening_all', item_type: 'shoes', name: 'Evening Oxfords (Waterproof)', color: 'black', material: 'treated_leather', size: '42', style: ['evening','formal'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['evening'], is_clean: true, metadata: {} },
+  function showError(message) {
+    outfitList.setRows([]);
+    setStatus(message, 'error');
+  }
 
-    // Beach core
-    { item_id: 'top_beach_all', item_type: 'top', name: 'All-Weather Beach Shirt', color: 'white', material: 'quick_dry', size: 'M', style: ['beach','casual'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['beach'], is_clean: true, metadata: {} },
-    { item_id: 'bottom_beach_all', item_type: 'bottom', name: 'Hybrid Swim Shorts', color: 'navy', material: 'quick_dry', size: 'M', style: ['beach','casual'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['beach'], is_clean: true, metadata: {} },
-    { item_id: 'shoes_beach_all', item_type: 'shoes', name: 'Water Sandals', color: 'black', material: 'rubber', size: '42', style: ['beach','casual'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['beach'], is_clean: true, metadata: {} },
+  function renderOutfits(outfits) {
+    if (!outfits || outfits.length === 0) {
+      outfitList.setRows([]);
+      setStatus('No outfits found. Try adjusting inputs or inventory.', 'empty');
+      return;
+    }
+    setStatus('');
+    outfitList.setRows(outfits);
+  }
 
-    // Party core
-    { item_id: 'top_party_all', item_type: 'top', name: 'All-Weather Party Shirt', color: 'burgundy', material: 'performance_blend', size: 'M', style: ['party','classic'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['party'], is_clean: true, metadata: {} },
-    { item_id: 'bottom_party_all', item_type: 'bottom', name: 'Party Trousers', color: 'black', material: 'tech_wool', size: '32', style: ['party','classic'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['party'], is_clean: true, metadata: {} },
-    { item_id: 'shoes_party_all', item_type: 'shoes', name: 'Party Loafers (Weatherproof)', color: 'black', material: 'treated_leather', size: '42', style: ['party','classic'], weather_suitability: ['cool','mild','warm','hot','cold','rainy'], occasion_suitability: ['party'], is_clean: true, metadata: {} }
-  ];
-  inventoryEl.value = JSON.stringify(defaultInventory, null, 2);
+  function renderExcluded() {
+    excludedEl.replaceChildren(...excluded.map(id => {
+      const chip = element('button', 'chip', `${id} ↺`);
+      chip.type = 'button';
+      chip.title = 'Bring back';
+      chip.dataset.restore = id;
+      return chip;
+    }));
+  }
 
-  form.addEventListener('submit', async (e) => {
-    e.preventDefault();
-    resultsEl.innerHTML = '';
+  function showInventory(result, source) {
+    if (!result.count && result.errors && result.errors.length) {
+      summaryEl.textContent = `Invalid inventory (${source}): ${result.errors.join('; ')}`;
+      summaryEl.className = 'error';
+      return false;
+    }
+    summaryEl.textContent = `${result.count} items`;
+    summaryEl.className = 'muted';
+    inventoryList.setRows(result.items);
+    return true;
+  }
 
-    const occasion_type = document.getElementById('occasion_type').value;
-    const weather = document.getElementById('weather').value;
-    const max_outfits = parseInt(document.getElementById('max_outfits').value, 10) || 2;
-    const consider_previous = document.getElementById('consider_previous').checked;
+  // The editor is only filled when opened: pretty-printing a large wardrobe
+  // into a textarea is the expensive part, and it happens in the worker.
+  async function fillEditor() {
+    if (editorLoaded || !editorEl.open) return;
+    editorLoaded = true;
+    inventoryEl.value = (await inventory.call({ type: 'text' })).text;
+    editorDirty = false;
+  }
 
-    let inventory;
-    try {
-      inventory = JSON.parse(inventoryEl.value);
-      if (!Array.isArray(inventory)) throw new Error('Inventory must be an array');
-    } catch (err) {
-      resultsEl.innerHTML = `<div class="error">Invalid inventory JSON: ${err.message}</div>`;
-      return;
+  async function loadInventory(message, source) {
+    const ok = showInventory(await inventory.call({ type: 'load', ...message }), source);
+    if (ok) {
+      editorLoaded = false;
+      editorDirty = false;
+      fillEditor();
     }
+    return ok;
+  }
 
-    const payload = {
-      user_info: {
-        user_id: 'demo-user',
-        body_type: 'rectangle',
-        skin_tone: 'medium',
-        height_cm: 170,
-        style_preferences: ['casual', 'minimalist'],
-        color_preferences: ['blue', 'white', 'black'],
-        fit_preferences: {}
-      },
-      occasion: {
-        occasion_type,
-        weather,
-        time_of_day: 'afternoon',
-        location: 'office',
-        dress_code: occasion_type,
-        additional_notes: null
-      },
-      inventory,
-      max_outfits,
-      consider_previous_outfits: consider_previous
+  function readParams() {
+    return {
+      occasion_type: document.getElementById('occasion_type').value,
+      weather: document.getElementById('weather').value,
+      max_outfits: parseInt(document.getElementById('max_outfits').value, 10) || 2,
+      consider_previous: document.getElementById('consider_previous').checked
     };
+  }
 
-    // Simple loader
-    const loading = document.createElement('div');
-    loading.className = 'loading';
-    loading.textContent = 'Generating recommendations...';
-    resultsEl.appendChild(loading);
-
-    try {
-      const res = await fetch('/api/v1/recommend-outfits', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
+  // Abandon whatever the previous submit started
+  function cancelInFlight() {
+    if (inFlight) inFlight.abort();
+    inFlight = null;
+    if (connecting) connecting.close();
+    if (session) session.close();
+    connecting = null;
+    session = null;
+  }
 
-      resultsEl.removeChild(loading);
+  // Open a styling session: the server keeps the inventory and candidate pool,
+  // so later tweaks only send small deltas. Resolves false if WebSockets are unavailable.
+  function startSession(request) {
+    return new Promise((resolve) => {
+      if (!('WebSocket' in window)) return resolve(false);
+      cancelInFlight();
+      const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+      const ws = new WebSocket(`${scheme}://${location.host}/api/v1/styling-session`);
+      connecting = ws;
+      let opened = false;
+      ws.onopen = () => {
+        opened = true;
+        connecting = null;
+        session = ws;
+        // The body is already serialized; splice it in instead of re-encoding
+        ws.send(`{"type":"start","request":${request.body}}`);
+        resolve(true);
+      };
+      ws.onmessage = (event) => {
+        if (session !== ws) return;
+        const message = JSON.parse(event.data);
+        if (message.type === 'error') {
+          showError(`Request failed: ${message.detail}`);
+          return;
+        }
+        // The first result answers the submitted request as is
+        if (message.version === 1) responses.put(request.key, message.outfits);
+        excluded = message.excluded_item_ids || [];
+        renderExcluded();
+        renderOutfits(message.outfits);
+      };
+      ws.onclose = () => {
+        if (session === ws) session = null;
+        if (connecting === ws) connecting = null;
+        if (!opened) resolve(false);
+      };
+    });
+  }
 
-      if (!res.ok) {
-        const errText = await res.text();
-        resultsEl.innerHTML = `<div class="error">Request failed: ${res.status} - ${errText}</div>`;
-        return;
-      }
+  async function recommendOnce(request, submitted) {
+    inFlight = new AbortController();
+    const res = await fetch('/api/v1/recommend-outfits', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: request.body,
+      signal: inFlight.signal
+    });
+    if (submitted !== generation) return;
+    if (!res.ok) {
+      const errText = await res.text();
+      showError(`Request failed: ${res.status} - ${errText}`);
+      return;
+    }
+    const outfits = await res.json();
+    responses.put(request.key, outfits);
+    if (submitted === generation) renderOutfits(outfits);
+  }
 
-      const outfits = await res.json();
-      if (!outfits || outfits.length === 0) {
-        resultsEl.innerHTML = '<div class="empty">No outfits found. Try adjusting inputs or inventory.</div>';
-        return;
-      }
+  // Tweaks go to the session as deltas. A request answered from the client
+  // cache has no session yet, so the first tweak opens one.
+  async function sendUpdate(update) {
+    if (!session && current && !(await startSession(current))) return;
+    if (session && session.readyState === WebSocket.OPEN) {
+      session.send(JSON.stringify({ type: 'update', ...update }));
+    }
+  }
 
-      outfits.forEach((outfit, i) => {
-        const card = document.createElement('div');
-        card.className = 'outfit-card';
-        const scorePct = (typeof outfit.confidence_score === 'number') 
-          ? Math.round(outfit.confidence_score * 100) 
-          : null;
-        const score = (scorePct !== null) ? `${scorePct}%` : '—';
+  form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const submitted = ++generation;
+    cancelInFlight();
+    excluded = [];
+    renderExcluded();
 
-        const itemsList = (outfit.items || [])
-          .map(it => `<li><strong>${it.name || it.item_id}</strong> <span class="muted">(${it.item_type})</span></li>`) 
-          .join('');
+    if (editorDirty && !(await loadInventory({ text: inventoryEl.value }, 'editor'))) {
+      showError('Fix the inventory JSON first.');
+      return;
+    }
+    const request = await inventory.call({ type: 'prepare', params: readParams() });
+    if (submitted !== generation) return;
+    current = request;
 
-        card.innerHTML = `
-          <h3>Outfit #${i + 1} <span class="badge">${score}</span></h3>
-          <ul>${itemsList}</ul>
-        `;
-        resultsEl.appendChild(card);
-      });
+    const cached = responses.get(request.key);
+    if (cached) {
+      renderOutfits(cached);
+      return;
+    }
+    outfitList.setRows([]);
+    setStatus('Generating recommendations...', 'loading');
+    try {
+      if (!(await startSession(request)) && submitted === generation) {
+        await recommendOnce(request, submitted);
+      }
     } catch (err) {
-      resultsEl.innerHTML = `<div class="error">Unexpected error: ${err.message}</div>`;
+      if (err.name !== 'AbortError' && submitted === generation) showError(`Unexpected error: ${err.message}`);
     }
   });
+
+  document.getElementById('weather').addEventListener('change', (e) => sendUpdate({ weather: e.target.value }));
+  document.getElementById('occasion_type').addEventListener('change', (e) => sendUpdate({ occasion_type: e.target.value }));
+  document.getElementById('max_outfits').addEventListener('change', (e) => {
+    const value = parseInt(e.target.value, 10);
+    if (value > 0) sendUpdate({ max_outfits: value });
+  });
+  resultsEl.addEventListener('click', (e) => {
+    const id = e.target.dataset && e.target.dataset.exclude;
+    if (id) sendUpdate({ exclude_item_ids: [id] });
+  });
+  excludedEl.addEventListener('click', (e) => {
+    const id = e.target.dataset && e.target.dataset.restore;
+    if (id) sendUpdate({ restore_item_ids: [id] });
+  });
+
+  inventoryEl.addEventListener('input', () => { editorDirty = true; });
+  editorEl.addEventListener('toggle', fillEditor);
+  document.getElementById('inventory-file').addEventListener('change', (e) => {
+    const file = e.target.files && e.target.files[0];
+    if (file) loadInventory({ file }, file.name);
+  });
+
+  // Prefill with the same items used in tests
+  loadInventory({ url: '/ui/default-inventory.json' }, 'default');
 });
@@ -0,0 +1,13 @@
+// Parses, validates and serializes inventories off the page's main thread
+importScripts('/ui/inventory.js');
+
+const store = self.InventoryCore.createStore();
+
+self.onmessage = async (event) => {
+  const { id } = event.data;
+  try {
+    self.postMessage({ id, ...(await store.handle(event.data)) });
+  } catch (err) {
+    self.postMessage({ id, errors: [err.message] });
+  }
+};
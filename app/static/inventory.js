@@ -0,0 +1,123 @@
+// Inventory parsing, validation and request building. Loaded by
+// inventory-worker.js, and by the page itself when Web Workers are unavailable.
+(function (root) {
+  const ITEM_TYPES = ['top', 'bottom', 'dress', 'outerwear', 'shoes', 'accessory'];
+  const WEATHER = ['hot', 'warm', 'mild', 'cool', 'cold', 'rainy', 'snowy'];
+  const OCCASIONS = ['formal', 'casual', 'business_casual', 'sporty', 'evening', 'beach', 'party'];
+  const REQUIRED = ['item_id', 'item_type', 'name', 'color', 'material', 'size'];
+  const MAX_ERRORS = 20;
+
+  function validateItem(item, index, seen, errors) {
+    const where = `item ${index}${item && typeof item.item_id === 'string' ? ` (${item.item_id})` : ''}`;
+    if (item === null || typeof item !== 'object' || Array.isArray(item)) {
+      errors.push(`${where}: not an object`);
+      return;
+    }
+    for (const field of REQUIRED) {
+      if (typeof item[field] !== 'string' || item[field] === '') errors.push(`${where}: missing ${field}`);
+    }
+    if (typeof item.item_type === 'string' && !ITEM_TYPES.includes(item.item_type)) {
+      errors.push(`${where}: unknown item_type "${item.item_type}"`);
+    }
+    for (const [field, allowed] of [['weather_suitability', WEATHER], ['occasion_suitability', OCCASIONS], ['style', null]]) {
+      const value = item[field];
+      if (value === undefined) continue;
+      if (!Array.isArray(value)) {
+        errors.push(`${where}: ${field} must be a list`);
+      } else if (allowed) {
+        const unknown = value.filter(v => !allowed.includes(v));
+        if (unknown.length) errors.push(`${where}: unknown ${field} ${unknown.join(', ')}`);
+      }
+    }
+    if (seen.has(item.item_id)) errors.push(`${where}: duplicate item_id`);
+    seen.add(item.item_id);
+  }
+
+  // Parse and validate inventory JSON text; returns { inventory, errors }
+  function parseInventory(text) {
+    let inventory;
+    try {
+      inventory = JSON.parse(text);
+    } catch (err) {
+      return { inventory: null, errors: [`Invalid JSON: ${err.message}`] };
+    }
+    if (!Array.isArray(inventory)) return { inventory: null, errors: ['Inventory must be an array'] };
+    const errors = [];
+    const seen = new Set();
+    for (let i = 0; i < inventory.length && errors.length < MAX_ERRORS; i++) {
+      validateItem(inventory[i], i, seen, errors);
+    }
+    return { inventory: errors.length ? null : inventory, errors };
+  }
+
+  // The few fields the inventory list shows
+  function summarize(inventory) {
+    return inventory.map(it => ({ item_id: it.item_id, name: it.name, item_type: it.item_type, color: it.color }));
+  }
+
+  // Response cache key for a request body: its SHA-256, or the body itself
+  // where SubtleCrypto is unavailable (plain-HTTP origins other than localhost)
+  async function bodyKey(text) {
+    const subtle = root.crypto && root.crypto.subtle;
+    if (!subtle) return text;
+    const digest = await subtle.digest('SHA-256', new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+  }
+
+  function buildPayload(params, inventory) {
+    return {
+      user_info: {
+        user_id: 'demo-user',
+        body_type: 'rectangle',
+        skin_tone: 'medium',
+        height_cm: 170,
+        style_preferences: ['casual', 'minimalist'],
+        color_preferences: ['blue', 'white', 'black'],
+        fit_preferences: {}
+      },
+      occasion: {
+        occasion_type: params.occasion_type,
+        weather: params.weather,
+        time_of_day: 'afternoon',
+        location: 'office',
+        dress_code: params.occasion_type,
+        additional_notes: null
+      },
+      inventory,
+      max_outfits: params.max_outfits,
+      consider_previous_outfits: params.consider_previous
+    };
+  }
+
+  // Holds the current inventory so a submit only re-parses after an edit.
+  // Messages: load ({text} | {url} | {file}), text (pretty JSON for the editor),
+  // prepare ({params} -> request body string and its cache key).
+  function createStore() {
+    let current = [];
+    return {
+      async handle(message) {
+        switch (message.type) {
+          case 'load': {
+            let text = message.text;
+            if (message.url) text = await (await fetch(message.url)).text();
+            if (message.file) text = await message.file.text();
+            const { inventory, errors } = parseInventory(text);
+            if (!inventory) return { errors };
+            current = inventory;
+            return { errors, count: inventory.length, items: summarize(inventory) };
+          }
+          case 'text':
+            return { text: JSON.stringify(current, null, 2) };
+          case 'prepare': {
+            const body = JSON.stringify(buildPayload(message.params, current));
+            return { body, key: await bodyKey(body) };
+          }
+          default:
+            return { errors: [`Unknown message type ${message.type}`] };
+        }
+      }
+    };
+  }
+
+  root.InventoryCore = { parseInventory, summarize, bodyKey, buildPayload, createStore };
+})(typeof self !== 'undefined' ? self : this);
@@ -0,0 +1,97 @@
+"""
+Recall and latency of the LSH similar-items index against brute force.
+
+Builds a SimilarItemsIndex over a synthetic catalog, then answers the same
+queries with LSH and with an exact scan of the item's type partition and
+reports recall@k (a result counts if its similarity reaches the exact k-th
+best, so ties are not penalised), per-query latency percentiles and the
+average number of re-ranked candidates.
+
+Examples:
+    python -m benchmarks.ann_benchmark --items 100000 --queries 500
+    python -m benchmarks.ann_benchmark --items 20000 --tables 16 --bits 8 --json
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.similar import DEFAULT_BITS, DEFAULT_DIM, DEFAULT_TABLES, SimilarItemsIndex
+from app.models.schemas import ClothingItem
+from benchmarks.synthetic import synthetic_inventory
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _percentiles(seconds: List[float]) -> Dict[str, float]:
+    ms = np.array(seconds) * 1000.0
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+    }
+
+
+def run(items: int, queries: int, k: int, dim: int, tables: int, bits: int, seed: int) -> Dict:
+    catalog = [ClothingItem(**data) for data in synthetic_inventory(items, seed)]
+    started = time.perf_counter()
+    index = SimilarItemsIndex(catalog, dim=dim, n_tables=tables, n_bits=bits, seed=seed)
+    build_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed)
+    sample = [catalog[i] for i in rng.choice(len(catalog), size=min(queries, len(catalog)), replace=False)]
+    ann_times, exact_times, recalls, candidates = [], [], [], []
+    for item in sample:
+        started = time.perf_counter()
+        approx = index.similar(item, k)
+        ann_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        exact = index.similar(item, k, exact=True)
+        exact_times.append(time.perf_counter() - started)
+
+        if exact:
+            threshold = exact[-1][1] - 1e-4
+            recalls.append(sum(1 for _, sim in approx if sim >= threshold) / len(exact))
+        partition = index._partitions[item.item_type]
+        candidates.append(len(partition.candidates(index.embedder.item_matrix([item])[0], k * 8)))
+
+    return {
+        'config': {'items': items, 'queries': len(sample), 'k': k, 'dim': dim, 'tables': tables, 'bits': bits},
+        'build_seconds': round(build_seconds, 3),
+        'recall_at_k': round(float(np.mean(recalls)), 4) if recalls else None,
+        'mean_candidates': round(float(np.mean(candidates)), 1),
+        'ann': _percentiles(ann_times),
+        'brute_force': _percentiles(exact_times),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=50_000, help='synthetic catalog size')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--dim', type=int, default=DEFAULT_DIM)
+    parser.add_argument('--tables', type=int, default=DEFAULT_TABLES)
+    parser.add_argument('--bits', type=int, default=DEFAULT_BITS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.items, args.queries, args.k, args.dim, args.tables, args.bits, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    logger.info(f"Built index over {args.items} items in {report['build_seconds']}s")
+    logger.info(f"recall@{args.k}: {report['recall_at_k']}  (avg {report['mean_candidates']} candidates re-ranked)")
+    for name in ('ann', 'brute_force'):
+        stats = report[name]
+        logger.info(f"{name:>11}: p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  mean {stats['mean_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+Local HTTP load test for the Outfit Curation Engine API.
+
+Starts the app under uvicorn (unless --url points at a running server), replays
+recorded request bodies from a JSONL file or synthetic wardrobes at a fixed
+concurrency or a target request rate, and reports throughput, latency
+percentiles, error rates and server CPU time.
+
+Examples:
+    python -m benchmarks.loadtest --synthetic 50 --items 200 --concurrency 16 --duration 30
+    python -m benchmarks.loadtest --requests-file recorded.jsonl --rps 100 --workers 4 \\
+        --save-baseline baseline.json
+    python -m benchmarks.loadtest --synthetic 50 --concurrency 16 --baseline baseline.json
+
+Each line of a requests file is either a recommendation request body, or an
+object ``{"path": "/api/v1/...", "body": {...}}`` to target another endpoint.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.synthetic import synthetic_request
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATH = '/api/v1/recommend-outfits'
+# Metrics compared against a baseline, and whether higher is better
+COMPARED_METRICS = {
+    'throughput_rps': True,
+    'latency_p50_ms': False,
+    'latency_p95_ms': False,
+    'latency_p99_ms': False,
+    'error_rate': False,
+    'server_cpu_seconds_per_request': False,
+}
+
+
+def load_payloads(args) -> List[Tuple[str, Dict[str, Any]]]:
+    if args.requests_file:
+        payloads = []
+        with open(args.requests_file) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if 'path' in record and 'body' in record:
+                    payloads.append((record['path'], record['body']))
+                else:
+                    payloads.append((DEFAULT_PATH, record))
+        if not payloads:
+            raise SystemExit(f"No requests found in {args.requests_file}")
+        return payloads
+    return [
+        (DEFAULT_PATH, synthetic_request(args.items, seed=args.seed + i))
+        for i in range(args.synthetic)
+    ]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable, '-m', 'uvicorn', 'app.main:app',
+        '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--log-level', 'warning',
+    ]
+    logger.info(f"Starting server: {' '.join(cmd)}")
+    return subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Server at {base_url} did not become healthy within {timeout}s")
+
+
+def process_tree_cpu_seconds(pid: int) -> Optional[float]:
+    """User+system CPU of a process and its descendants (Linux /proc only)"""
+    proc = Path('/proc')
+    if not proc.exists():
+        return None
+    ticks = os.sysconf('SC_CLK_TCK')
+    stats = {}
+    for stat_file in proc.glob('[0-9]*/stat'):
+        try:
+            raw = stat_file.read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces, fields start after the last ')'
+        fields = raw[raw.rindex(')') + 2:].split()
+        stats[int(stat_file.parent.name)] = (int(fields[1]), int(fields[11]) + int(fields[12]))
+    if pid not in stats:
+        return None
+    tree = {pid}
+    changed = True
+    while changed:
+        changed = False
+        for child, (ppid, _) in stats.items():
+            if ppid in tree and child not in tree:
+                tree.add(child)
+                changed = True
+    return sum(stats[p][1] for p in tree) / ticks
+
+
+async def run_load(
+    base_url: str,
+    payloads: List[Tuple[str, Dict[str, Any]]],
+    concurrency: int,
+    rps: Optional[float],
+    duration: Optional[float],
+    total_requests: Optional[int],
+    timeout: float
+) -> Tuple[List[float], Counter, float]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = itertools.count()
+    source = itertools.cycle(payloads)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    def should_stop(sent: int) -> bool:
+        if total_requests is not None and sent >= total_requests:
+            return True
+        return duration is not None and time.perf_counter() - started >= duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def one(path: str, body: Dict[str, Any], t0: Optional[float] = None) -> None:
+            t0 = time.perf_counter() if t0 is None else t0
+            try:
+                response = await client.post(path, json=body)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - t0)
+
+        if rps:
+            # Open loop: fire on schedule, concurrency only caps outstanding requests
+            tasks = []
+
+            async def limited(path, body, scheduled):
+                async with semaphore:
+                    # Latency counts from the scheduled send time, so time queued behind
+                    # the concurrency cap is not omitted when the server falls behind
+                    await one(path, body, scheduled)
+
+            sent = 0
+            while not should_stop(sent):
+                path, body = next(source)
+                tasks.append(asyncio.create_task(limited(path, body, started + sent / rps)))
+                sent += 1
+                next_at = started + sent / rps
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            await asyncio.gather(*tasks)
+        else:
+            # Closed loop: each worker sends its next request as soon as the last one returns
+            async def worker():
+                while True:
+                    sent = next(counter)
+                    if should_stop(sent):
+                        return
+                    path, body = next(source)
+                    await one(path, body)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return latencies, statuses, time.perf_counter() - started
+
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float, cpu_seconds: Optional[float]) -> Dict[str, Any]:
+    total = sum(statuses.values())
+    errors = sum(count for code, count in statuses.items() if not (isinstance(code, int) and code < 400))
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': total,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'latency_p50_ms': round(float(np.percentile(lat_ms, 50)), 2),
+        'latency_p95_ms': round(float(np.percentile(lat_ms, 95)), 2),
+        'latency_p99_ms': round(float(np.percentile(lat_ms, 99)), 2),
+        'latency_max_ms': round(float(lat_ms.max()), 2),
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'status_counts': {str(code): count for code, count in sorted(statuses.items(), key=str)},
+        'server_cpu_seconds': None if cpu_seconds is None else round(cpu_seconds, 3),
+        'server_cpu_seconds_per_request': None if cpu_seconds is None or not total else round(cpu_seconds / total, 5),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """Print metric deltas against a baseline; return False on regression"""
+    ok = True
+    logger.info(f"Comparison against baseline (tolerance {tolerance:.0%}):")
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        new, old = report.get(metric), baseline.get(metric)
+        if new is None or old is None:
+            continue
+        delta = (new - old) / old if old else (0.0 if new == old else float('inf'))
+        regressed = -delta > tolerance if higher_is_better else delta > tolerance
+        # An absolute error rate below 0.1% is noise, not a regression
+        if metric == 'error_rate' and new < 0.001:
+            regressed = False
+        ok &= not regressed
+        logger.info(f"  {metric:34s} {old:>12} -> {new:>12} ({delta:+.1%}){'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--requests-file', help='JSONL file of recorded request bodies')
+    source.add_argument('--synthetic', type=int, default=20, help='number of distinct synthetic requests')
+    parser.add_argument('--items', type=int, default=100, help='items per synthetic wardrobe')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help='target a running server instead of starting one')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rps', type=float, help='open-loop target request rate')
+    parser.add_argument('--duration', type=float, default=None, help='seconds to run (default 20 unless --requests)')
+    parser.add_argument('--requests', type=int, default=None, help='total requests to send')
+    parser.add_argument('--warmup', type=int, default=10, help='requests sent before measuring')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per-request timeout in seconds')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--save-baseline', help='write the JSON report as a baseline file')
+    parser.add_argument('--baseline', help='compare against this baseline report')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed relative regression')
+    args = parser.parse_args(argv)
+    if args.duration is None and args.requests is None:
+        args.duration = 20.0
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    payloads = load_payloads(args)
+    logger.info(f"Loaded {len(payloads)} request payloads")
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(port, args.workers)
+    try:
+        wait_until_healthy(base_url)
+        if args.warmup:
+            asyncio.run(run_load(base_url, payloads, args.concurrency, None, None, args.warmup, args.timeout))
+
+        cpu_before = process_tree_cpu_seconds(server.pid) if server else None
+        latencies, statuses, elapsed = asyncio.run(run_load(
+            base_url, payloads, args.concurrency, args.rps, args.duration, args.requests, args.timeout
+        ))
+        cpu_after = process_tree_cpu_seconds(server.pid) if server else None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    report = summarize(latencies, statuses, elapsed, cpu)
+    report['config'] = {
+        'workers': args.workers,
+        'concurrency': args.concurrency,
+        'rps': args.rps,
+        'payloads': len(payloads),
+        'source': args.requests_file or f"synthetic:{args.synthetic}x{args.items}",
+    }
+    print(json.dumps(report, indent=2))
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).write_text(json.dumps(report, indent=2))
+        logger.info(f"Wrote report to {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if not compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
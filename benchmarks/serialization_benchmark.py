@@ -0,0 +1,139 @@
+"""
+CPU time and size of request/response bodies per wire format.
+
+Compares, for a synthetic /recommend-outfits request and a list of outfits:
+
+* ``fastapi``: the default FastAPI path (``json.loads`` + ``validate_python``
+  for requests; re-validation, JSON-mode dump and ``json.dumps`` for
+  responses);
+* ``json``: the negotiated JSON path (orjson ``loads`` + ``validate_python`` /
+  ``dump_json``);
+* ``msgpack``: the negotiated MessagePack path (when msgpack is installed).
+
+Each format's decoded output is checked against the default path, so the
+numbers compare the same data.
+
+Examples:
+    python -m benchmarks.serialization_benchmark --items 5000 --outfits 50
+    python -m benchmarks.serialization_benchmark --items 500 --repeat 50 --json
+"""
+import argparse
+import gzip
+import json
+import logging
+import random
+import time
+from typing import Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from app.core import serialization
+from app.models.schemas import Outfit, OutfitRecommendationRequest
+from benchmarks.synthetic import synthetic_request
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+OUTFITS = TypeAdapter(List[Outfit])
+
+
+def _cpu_ms(fn: Callable[[], object], repeat: int) -> float:
+    """Best-of-three mean CPU milliseconds per call"""
+    best = float('inf')
+    for _ in range(3):
+        started = time.process_time()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.process_time() - started) / repeat)
+    return round(best * 1000.0, 3)
+
+
+def _fastapi_dumps(outfits: List[Outfit]) -> bytes:
+    # What FastAPI 0.10x does for response_model=List[Outfit] and JSONResponse.render
+    data = OUTFITS.dump_python(OUTFITS.validate_python(outfits, from_attributes=True), mode='json')
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')).encode('utf-8')
+
+
+def _outfits(request: OutfitRecommendationRequest, count: int, seed: int) -> List[Outfit]:
+    rng = random.Random(seed)
+    return [
+        Outfit(
+            outfit_id=f"outfit_{i + 1}",
+            items=rng.sample(request.inventory, min(5, len(request.inventory))),
+            occasion=request.occasion.occasion_type,
+            confidence_score=round(rng.random(), 4)
+        )
+        for i in range(count)
+    ]
+
+
+def run(items: int, outfits: int, repeat: int, seed: int) -> Dict:
+    payload = synthetic_request(items, seed, max_outfits=outfits)
+    raw_json = json.dumps(payload).encode('utf-8')
+    request = OutfitRecommendationRequest.model_validate(payload)
+    response = _outfits(request, outfits, seed)
+    formats = ['fastapi', 'json'] + (['msgpack'] if serialization.msgpack is not None else [])
+
+    bodies = {'fastapi': raw_json, 'json': raw_json}
+    if 'msgpack' in formats:
+        bodies['msgpack'] = serialization.msgpack.packb(payload)
+    decoders = {
+        'fastapi': lambda: OutfitRecommendationRequest.model_validate(json.loads(raw_json)),
+        'json': lambda: serialization.decode(raw_json, 'json', OutfitRecommendationRequest),
+        'msgpack': lambda: serialization.decode(bodies['msgpack'], 'msgpack', OutfitRecommendationRequest),
+    }
+    encoders = {
+        'fastapi': lambda: _fastapi_dumps(response),
+        'json': lambda: serialization.encode(response, List[Outfit]),
+        'msgpack': lambda: serialization.encode(response, List[Outfit], serialization.MSGPACK),
+    }
+
+    # Same data on every path
+    reference = json.loads(_fastapi_dumps(response))
+    assert json.loads(encoders['json']()) == reference
+    assert decoders['json']() == decoders['fastapi']()
+    if 'msgpack' in formats:
+        assert serialization.msgpack.unpackb(encoders['msgpack']()) == reference
+        assert decoders['msgpack']() == decoders['fastapi']()
+
+    report = {'config': {'items': items, 'outfits': outfits, 'repeat': repeat}, 'request': {}, 'response': {}}
+    for fmt in formats:
+        encoded = encoders[fmt]()
+        report['request'][fmt] = {
+            'bytes': len(bodies[fmt]),
+            'gzip_bytes': len(gzip.compress(bodies[fmt], 6)),
+            'decode_cpu_ms': _cpu_ms(decoders[fmt], repeat),
+        }
+        report['response'][fmt] = {
+            'bytes': len(encoded),
+            'gzip_bytes': len(gzip.compress(encoded, 6)),
+            'encode_cpu_ms': _cpu_ms(encoders[fmt], repeat),
+        }
+    return report
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=5000, help='inventory size of the request')
+    parser.add_argument('--outfits', type=int, default=50, help='outfits in the response')
+    parser.add_argument('--repeat', type=int, default=10, help='calls per timing run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run(args.items, args.outfits, args.repeat, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for part, timing in (('request', 'decode_cpu_ms'), ('response', 'encode_cpu_ms')):
+        baseline = report[part]['fastapi']
+        for fmt, stats in report[part].items():
+            speedup = baseline[timing] / stats[timing] if stats[timing] else float('inf')
+            logger.info(
+                f"{part:>8} {fmt:>7}: {stats[timing]:8.3f} ms CPU ({speedup:4.1f}x)  "
+                f"{stats['bytes']:>9} bytes  {stats['gzip_bytes']:>8} gzipped"
+            )
+
+
+if __name__ == '__main__':
+    main()
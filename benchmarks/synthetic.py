@@ -0,0 +1,72 @@
+"""Synthetic wardrobes and recommendation requests for benchmarks."""
+import random
+from typing import Any, Dict, List, Optional
+
+from app.models.schemas import ClothingType, OccasionType, WeatherType
+
+COLORS = ['black', 'white', 'navy', 'gray', 'blue', 'beige', 'brown', 'red', 'green', 'burgundy', 'olive', 'pink']
+MATERIALS = ['cotton', 'wool', 'linen', 'denim', 'leather', 'silk', 'polyester', 'cashmere']
+STYLES = ['casual', 'formal', 'business', 'classic', 'minimalist', 'sporty', 'evening', 'party', 'beach']
+BRANDS = ['Acme', 'Northwind', 'Contoso', 'Fabrikam', None]
+NAMES = {
+    ClothingType.TOP: ['Oxford Shirt', 'Crew Tee', 'Polo', 'Blouse', 'Knit Sweater', 'Linen Shirt'],
+    ClothingType.BOTTOM: ['Chinos', 'Jeans', 'Dress Pants', 'Shorts', 'Pleated Skirt', 'Joggers'],
+    ClothingType.DRESS: ['Wrap Dress', 'Slip Dress', 'Shirt Dress'],
+    ClothingType.OUTERWEAR: ['Blazer', 'Rain Jacket', 'Wool Coat', 'Denim Jacket', 'Cardigan'],
+    ClothingType.SHOES: ['Loafers', 'Sneakers', 'Oxfords', 'Rain Boots', 'Sandals'],
+    ClothingType.ACCESSORY: ['Leather Belt', 'Silk Scarf', 'Watch', 'Cap', 'Tote Bag'],
+}
+TYPE_WEIGHTS = {
+    ClothingType.TOP: 0.3,
+    ClothingType.BOTTOM: 0.2,
+    ClothingType.DRESS: 0.05,
+    ClothingType.OUTERWEAR: 0.1,
+    ClothingType.SHOES: 0.15,
+    ClothingType.ACCESSORY: 0.2,
+}
+
+
+def synthetic_item(rng: random.Random, index: int) -> Dict[str, Any]:
+    item_type = rng.choices(list(TYPE_WEIGHTS), weights=list(TYPE_WEIGHTS.values()))[0]
+    color = rng.choice(COLORS)
+    return {
+        'item_id': f"{item_type.value}_{index}",
+        'item_type': item_type.value,
+        'name': f"{color.title()} {rng.choice(NAMES[item_type])}",
+        'brand': rng.choice(BRANDS),
+        'color': color,
+        'material': rng.choice(MATERIALS),
+        'size': rng.choice(['S', 'M', 'L', '32', '42']),
+        'style': rng.sample(STYLES, rng.randint(1, 3)),
+        'weather_suitability': [w.value for w in rng.sample(list(WeatherType), rng.randint(2, 5))],
+        'occasion_suitability': [o.value for o in rng.sample(list(OccasionType), rng.randint(1, 4))],
+        'is_clean': rng.random() > 0.1,
+        'metadata': {},
+    }
+
+
+def synthetic_inventory(size: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [synthetic_item(rng, i) for i in range(size)]
+
+
+def synthetic_request(inventory_size: int, seed: Optional[int] = None, max_outfits: int = 5) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        'user_info': {
+            'user_id': f"user_{rng.randrange(10_000)}",
+            'body_type': 'rectangle',
+            'skin_tone': 'medium',
+            'height_cm': 170,
+            'style_preferences': rng.sample(STYLES, 2),
+            'color_preferences': rng.sample(COLORS, 3),
+        },
+        'occasion': {
+            'occasion_type': rng.choice(list(OccasionType)).value,
+            'weather': rng.choice(list(WeatherType)).value,
+            'time_of_day': rng.choice(['morning', 'afternoon', 'evening']),
+        },
+        'inventory': synthetic_inventory(inventory_size, seed=rng.randrange(2 ** 32)),
+        'max_outfits': max_outfits,
+        'consider_previous_outfits': True,
+    }
@@ -0,0 +1,97 @@
+import pytest
+from app.models.schemas import (
+    UserInfo, 
+    OccasionInfo, 
+    ClothingItem,
+    BodyType, 
+    SkinTone, 
+    ClothingType, 
+    OccasionType, 
+    WeatherType
+)
+
+# Test data
+@pytest.fixture
+def sample_user():
+    return UserInfo(
+        user_id="user123",
+        body_type=BodyType.RECTANGLE,
+        skin_tone=SkinTone.MEDIUM,
+        height_cm=170,
+        style_preferences=["casual", "minimalist"],
+        color_preferences=["blue", "white", "black"]
+    )
+
+@pytest.fixture
+def sample_occasion():
+    return OccasionInfo(
+        occasion_type=OccasionType.BUSINESS_CASUAL,
+        weather=WeatherType.MILD,
+        time_of_day="afternoon",
+        location="office",
+        dress_code="business_casual"
+    )
+
+@pytest.fixture
+def sample_inventory():
+    return [
+        # Tops
+        ClothingItem(
+            item_id="top1",
+            item_type=ClothingType.TOP,
+            name="Blue Dress Shirt",
+            color="blue",
+            material="cotton",
+            size="M",
+            style=["formal", "business"],
+            weather_suitability=[WeatherType.COOL, WeatherType.MILD, WeatherType.WARM],
+            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
+        ),
+        ClothingItem(
+            item_id="top2",
+            item_type=ClothingType.TOP,
+            name="White Blouse",
+            color="white",
+            material="silk",
+            size="S",
+            style=["formal", "elegant"],
+            weather_suitability=[WeatherType.MILD, WeatherType.WARM],
+            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
+        ),
+        # Bottoms
+        ClothingItem(
+            item_id="bottom1",
+            item_type=ClothingType.BOTTOM,
+            name="Black Dress Pants",
+            color="black",
+            material="wool",
+            size="32",
+            style=["formal", "business"],
+            weather_suitability=[WeatherType.COOL, WeatherType.MILD],
+            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
+        ),
+        # Shoes
+        ClothingItem(
+            item_id="shoes1",
+            item_type=ClothingType.SHOES,
+            name="Black Leather Shoes",
+            color="black",
+            material="leather",
+            size="42",
+            style=["formal", "classic"],
+            weather_suitability=[WeatherType.COOL, WeatherType.MILD],
+            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
+        ),
+        # Outerwear
+        ClothingItem(
+            item_id="outer1",
+            item_type=ClothingType.OUTERWEAR,
+            name="Navy Blazer",
+            color="navy",
+            material="wool",
+            size="L",
+            style=["formal", "business"],
+            weather_suitability=[WeatherType.COOL, WeatherType.MILD],
+            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
+        )
+    ]
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.admission import AdmissionController, Overloaded
+
+
+def test_sheds_when_queue_is_full():
+    controller = AdmissionController(max_concurrency=1, max_queue=1)
+
+    async def hold(seconds):
+        async with controller.slot(deadline=1.0):
+            await asyncio.sleep(seconds)
+
+    async def run():
+        holder = asyncio.create_task(hold(0.05))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(hold(0))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            async with controller.slot(deadline=1.0):
+                pass
+        await asyncio.gather(holder, queued)
+
+    asyncio.run(run())
+    stats = controller.stats()
+    assert stats['admitted'] == 2
+    assert stats['shed_queue_full'] == 1
+    assert stats['active'] == 0 and stats['waiting'] == 0
+
+
+def test_deadline_expiry_and_degraded_admission():
+    controller = AdmissionController(max_concurrency=1, max_queue=4, degrade_queue_depth=1)
+    tickets = []
+
+    async def hold(seconds, deadline):
+        async with controller.slot(deadline=deadline) as ticket:
+            tickets.append(ticket)
+            await asyncio.sleep(seconds)
+
+    async def run():
+        holder = asyncio.create_task(hold(0.05, 1.0))
+        await asyncio.sleep(0)
+        first = asyncio.create_task(hold(0, 1.0))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(hold(0, 1.0))
+        with pytest.raises(Overloaded):
+            await hold(0, 0.01)
+        await asyncio.gather(holder, first, second)
+
+    asyncio.run(run())
+    assert [t.degraded for t in tickets] == [False, False, True]
+    assert controller.stats()['shed_deadline'] == 1
+    assert controller.stats()['degraded'] == 1
+
+
+def test_slot_is_held_until_a_timed_out_run_finishes():
+    controller = AdmissionController(max_concurrency=1, max_queue=4)
+    finished = threading.Event()
+
+    def engine(ticket):
+        time.sleep(0.2)
+        finished.set()
+        return "outfits"
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(controller.run(engine), 0.05)
+        # The engine thread is still running, so the slot is still taken
+        assert controller.stats()['active'] == 1
+        with pytest.raises(Overloaded):
+            await controller.run(lambda ticket: "too early", deadline=0.05)
+        result, _ = await controller.run(lambda ticket: finished.is_set(), deadline=1.0)
+        assert result is True
+
+    asyncio.run(run())
+    assert controller.stats()['active'] == 0
+
+
+def test_engine_endpoints_are_shed_when_overloaded(monkeypatch, sample_user, sample_occasion, sample_inventory):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import endpoints
+
+    monkeypatch.setattr(endpoints, "admission", AdmissionController(max_concurrency=0, max_queue=0))
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    client = TestClient(app)
+    inventory = [item.model_dump(mode="json") for item in sample_inventory]
+    context = {"user_info": sample_user.model_dump(mode="json"), "occasion": sample_occasion.model_dump(mode="json")}
+
+    for path, body in [
+        ("/count-outfits", {**context, "inventory": inventory}),
+        ("/similar-items", {"inventory": inventory, "item_id": "top1"}),
+        ("/search", {"inventory": inventory, "query": "blue"}),
+        ("/complete-look", {**context, "inventory": inventory, "anchor_item_id": "top1"}),
+    ]:
+        response = client.post(f"/api/v1{path}", json=body)
+        assert response.status_code == 503 and "Retry-After" in response.headers, path
@@ -0,0 +1,30 @@
+import numpy as np
+
+from app.core.color import ColorHarmony, normalize_color, UNKNOWN
+
+
+def test_normalize_color_aliases_and_fallback():
+    assert normalize_color("Light-Blue") == "light_blue"
+    assert normalize_color("grey") == "gray"
+    assert normalize_color("pale pink") == "pink"
+    assert normalize_color("chartreuse-ish") == UNKNOWN
+
+
+def test_palette_scores_follow_color_rules():
+    harmony = ColorHarmony({'complementary': [('red', 'green')], 'analogous': 3, 'monochromatic': True})
+
+    assert harmony.palette_score(["black"]) == 1.0
+    assert harmony.palette_score(["red", "green"]) > harmony.palette_score(["red", "purple"])
+    assert harmony.is_harmonious(["navy", "white", "red"])
+    assert not harmony.is_harmonious(["red", "purple"])
+
+
+def test_batched_scores_match_single_palette_scores():
+    harmony = ColorHarmony()
+    palettes = [["red", "green"], ["navy", "blue", "lightblue"], ["black"], ["orange", "pink", "teal", "gray"]]
+
+    batched = harmony.score_palettes(harmony.index_matrix(palettes))
+    single = [harmony.palette_score(p) for p in palettes]
+
+    assert np.allclose(batched, single, atol=1e-6)
+    assert list(harmony.harmonious_mask(harmony.index_matrix(palettes))) == [harmony.is_harmonious(p) for p in palettes]
@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+
+from app.core.diversity import incidence_matrix, mmr_order
+from app.core.engine import OutfitCurationEngine
+
+
+def _outfits(sample_inventory, *id_sets):
+    by_id = {item.item_id: item for item in sample_inventory}
+    return [[by_id[i] for i in ids] for ids in id_sets]
+
+
+def test_incidence_matrix_overlaps(sample_inventory):
+    candidates = _outfits(
+        sample_inventory,
+        ("top1", "bottom1", "shoes1"),
+        ("top1", "bottom1", "shoes1", "outer1"),
+        ("top2", "outer1"),
+    )
+    incidence, columns = incidence_matrix(candidates)
+    assert incidence.shape == (3, 5) and set(columns) == {"top1", "top2", "bottom1", "shoes1", "outer1"}
+    # Shared items between outfits are the off-diagonal products of the rows
+    intersections = incidence @ incidence.T
+    np.testing.assert_allclose(np.diag(intersections), [3, 4, 2])
+    np.testing.assert_allclose([intersections[0, 1], intersections[0, 2], intersections[1, 2]], [3, 0, 1])
+
+
+def test_mmr_trades_relevance_for_novelty(sample_inventory):
+    candidates = _outfits(
+        sample_inventory,
+        ("top1", "bottom1", "shoes1"),
+        ("top1", "bottom1", "shoes1", "outer1"),  # near-duplicate of the best
+        ("top2", "bottom1", "shoes1"),
+    )
+    incidence, _ = incidence_matrix(candidates)
+    relevance = [0.9, 0.85, 0.7]
+    assert mmr_order(relevance, incidence, 2, 0.0) == [0, 1]
+    assert mmr_order(relevance, incidence, 2, 0.5) == [0, 2]
+    assert mmr_order(relevance, incidence, 5, 0.5) == [0, 2, 1]
+
+
+def test_generate_outfits_with_diversity(sample_inventory, sample_user, sample_occasion):
+    random.seed(0)
+    outfits = OutfitCurationEngine().generate_outfits(
+        sample_inventory, sample_user, sample_occasion, max_outfits=2, diversity_weight=0.7
+    )
+    assert len(outfits) == 2
+    # Both tops fit the occasion, so the two picks should not share one
+    tops = [item.item_id for outfit in outfits for item in outfit.items if item.item_type.value == "top"]
+    assert sorted(tops) == ["top1", "top2"]
@@ -12,92 +12,6 @@ from app.models.schemas import (
 )
 from app.core.engine import OutfitCurationEngine
 
-# Test data
-@pytest.fixture
-def sample_user():
-    return UserInfo(
-        user_id="user123",
-        body_type=BodyType.RECTANGLE,
-        skin_tone=SkinTone.MEDIUM,
-        height_cm=170,
-        style_preferences=["casual", "minimalist"],
-        color_preferences=["blue", "white", "black"]
-    )
-
-@pytest.fixture
-def sample_occasion():
-    return OccasionInfo(
-        occasion_type=OccasionType.BUSINESS_CASUAL,
-        weather=WeatherType.MILD,
-        time_of_day="afternoon",
-        location="office",
-        dress_code="business_casual"
-    )
-
-@pytest.fixture
-def sample_inventory():
-    return [
-        # Tops
-        ClothingItem(
-            item_id="top1",
-            item_type=ClothingType.TOP,
-            name="Blue Dress Shirt",
-            color="blue",
-            material="cotton",
-            size="M",
-            style=["formal", "business"],
-            weather_suitability=[WeatherType.COOL, WeatherType.MILD, WeatherType.WARM],
-            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
-        ),
-        ClothingItem(
-            item_id="top2",
-            item_type=ClothingType.TOP,
-            name="White Blouse",
-            color="white",
-            material="silk",
-            size="S",
-            style=["formal", "elegant"],
-            weather_suitability=[WeatherType.MILD, WeatherType.WARM],
-            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
-        ),
-        # Bottoms
-        ClothingItem(
-            item_id="bottom1",
-            item_type=ClothingType.BOTTOM,
-            name="Black Dress Pants",
-            color="black",
-            material="wool",
-            size="32",
-            style=["formal", "business"],
-            weather_suitability=[WeatherType.COOL, WeatherType.MILD],
-            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
-        ),
-        # Shoes
-        ClothingItem(
-            item_id="shoes1",
-            item_type=ClothingType.SHOES,
-            name="Black Leather Shoes",
-            color="black",
-            material="leather",
-            size="42",
-            style=["formal", "classic"],
-            weather_suitability=[WeatherType.COOL, WeatherType.MILD],
-            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
-        ),
-        # Outerwear
-        ClothingItem(
-            item_id="outer1",
-            item_type=ClothingType.OUTERWEAR,
-            name="Navy Blazer",
-            color="navy",
-            material="wool",
-            size="L",
-            style=["formal", "business"],
-            weather_suitability=[WeatherType.COOL, WeatherType.MILD],
-            occasion_suitability=[OccasionType.BUSINESS_CASUAL, OccasionType.FORMAL]
-        )
-    ]
-
 def test_filter_inventory(sample_user, sample_occasion, sample_inventory):
     engine = OutfitCurationEngine()
     filtered = engine.filter_inventory(sample_inventory, sample_user, sample_occasion)
@@ -149,3 +63,153 @@ def test_color_compatibility():
     
     # Test monochromatic
     assert engine._check_color_compatibility(["navy", "blue", "lightblue"]) == True
+
+def test_outfit_pages_do_not_repeat(sample_user, sample_occasion):
+    engine = OutfitCurationEngine()
+    inventory = [
+        ClothingItem(
+            item_id=f"{item_type.value}{i}",
+            item_type=item_type,
+            name=f"Item {i}",
+            color="black",
+            material="cotton",
+            size="M",
+            style=["business"],
+            weather_suitability=[WeatherType.MILD],
+            occasion_suitability=[OccasionType.BUSINESS_CASUAL]
+        )
+        for item_type in (ClothingType.TOP, ClothingType.BOTTOM, ClothingType.SHOES)
+        for i in range(3)
+    ]
+
+    seen = set()
+    cursor = None
+    pages = 0
+    while True:
+        outfits, cursor, total = engine.generate_outfit_page(
+            inventory, sample_user, sample_occasion, page_size=4, cursor=cursor, seed=7
+        )
+        pages += 1
+        for outfit in outfits:
+            base = tuple(sorted(it.item_id for it in outfit.items if it.item_type != ClothingType.ACCESSORY))
+            assert base not in seen
+            seen.add(base)
+        if cursor is None:
+            break
+
+    assert total == 27
+    assert len(seen) == 27
+    assert pages == 7
+
+def test_outfit_page_cursor_rejects_other_inventory(sample_user, sample_occasion, sample_inventory):
+    from app.core.pagination import InvalidCursor
+
+    engine = OutfitCurationEngine()
+    inventory = sample_inventory + [sample_inventory[0].model_copy(update={"item_id": "top3"})]
+    _, cursor, _ = engine.generate_outfit_page(inventory, sample_user, sample_occasion, page_size=1, seed=1)
+    assert cursor is not None
+    with pytest.raises(InvalidCursor):
+        engine.generate_outfit_page(sample_inventory, sample_user, sample_occasion, cursor=cursor)
+
+def test_complete_look_around_anchor(sample_user, sample_occasion, sample_inventory):
+    engine = OutfitCurationEngine()
+    anchor, outfit, suggestions = engine.complete_look(
+        sample_inventory, sample_user, sample_occasion, anchor_item_id="bottom1"
+    )
+
+    assert anchor.item_id == "bottom1"
+    assert outfit is not None
+    assert {item.item_type for item in outfit.items} == {ClothingType.TOP, ClothingType.BOTTOM, ClothingType.SHOES}
+    assert engine._is_valid_outfit(outfit.items, sample_occasion)
+    assert [item.item_id for item in suggestions[ClothingType.OUTERWEAR]] == ["outer1"]
+
+    with pytest.raises(KeyError):
+        engine.complete_look(sample_inventory, sample_user, sample_occasion, anchor_item_id="missing")
+
+def test_inventory_version_keys_the_neighbor_index(monkeypatch, sample_user, sample_occasion, sample_inventory):
+    from app.core import fingerprint
+
+    engine = OutfitCurationEngine()
+    engine.complete_look(sample_inventory, sample_user, sample_occasion, "bottom1")
+    # A versioned lookup does not serialize the inventory
+    monkeypatch.setattr(fingerprint, "_INVENTORY", None)
+    for version in ("v1", "v1", "v2"):
+        engine.complete_look(sample_inventory, sample_user, sample_occasion, "bottom1", inventory_version=version)
+    assert len(engine._neighbor_indexes) == 3
+
+    # The same version over different items is a different inventory
+    engine.complete_look(sample_inventory[:-1], sample_user, sample_occasion, "bottom1", inventory_version="v1")
+    assert len(engine._neighbor_indexes) == 4
+
+def test_item_constraints_prune_pools(sample_user, sample_occasion, sample_inventory):
+    engine = OutfitCurationEngine()
+    worn = sample_inventory[1].model_copy(update={"last_worn": datetime.utcnow() - timedelta(days=1)})
+    inventory = [sample_inventory[0], worn] + sample_inventory[2:]
+
+    outfits = engine.generate_outfits(
+        inventory, sample_user, sample_occasion, max_outfits=3,
+        include_item_ids=["outer1"], exclude_worn_within_days=3
+    )
+
+    assert outfits
+    for outfit in outfits:
+        ids = {item.item_id for item in outfit.items}
+        assert "outer1" in ids
+        assert "top2" not in ids
+
+    outfits = engine.generate_outfits(
+        sample_inventory, sample_user, sample_occasion, max_outfits=3, exclude_item_ids=["top1"]
+    )
+    assert all("top1" not in {item.item_id for item in o.items} for o in outfits)
+
+    with pytest.raises(ValueError):
+        engine.generate_outfits(
+            sample_inventory, sample_user, sample_occasion, include_item_ids=["top1"], exclude_item_ids=["top1"]
+        )
+
+def test_count_valid_outfits_matches_enumeration(sample_occasion):
+    import itertools
+    from benchmarks.synthetic import synthetic_inventory
+
+    engine = OutfitCurationEngine()
+    inventory = [ClothingItem(**item) for item in synthetic_inventory(60, seed=5)]
+    counter_result = engine.count_valid_outfits(inventory, sample_occasion)
+
+    pools = [
+        [it for it in inventory if it.item_type == t and engine._is_item_weather_appropriate(it, "mild")]
+        for t in engine._required_types(sample_occasion)
+    ]
+    brute = sum(1 for combo in itertools.product(*pools) if engine._is_valid_outfit(list(combo), sample_occasion))
+
+    assert counter_result['exact']
+    assert counter_result['count'] == brute
+
+    estimate = engine.count_valid_outfits(inventory, sample_occasion, max_states=1, samples=20000)
+    assert not estimate['exact']
+    assert estimate['lower'] <= brute <= estimate['upper']
+
+def test_batched_confidence_matches_scalar(tmp_path, sample_user, sample_occasion, sample_inventory):
+    import random
+
+    import numpy as np
+
+    from app.core.feedback import PreferenceStore
+    from app.models.schemas import FeedbackEvent, FeedbackType
+
+    store = PreferenceStore(str(tmp_path / "events.jsonl"), str(tmp_path / "weights.json"))
+    store.record(FeedbackEvent(user_id=sample_user.user_id, event=FeedbackType.LIKED, items=sample_inventory[:2]))
+    engine = OutfitCurationEngine(preference_store=store)
+    rng = random.Random(0)
+    candidates = [rng.sample(sample_inventory, rng.randint(1, len(sample_inventory))) for _ in range(50)] + [[]]
+    palettes = engine.color_harmony.score_palettes(
+        engine.color_harmony.index_matrix([[item.color for item in items] for items in candidates])
+    )
+    weights = store.weights(sample_user.user_id)
+
+    for user in (sample_user, sample_user.model_copy(update={"color_preferences": []})):
+        batched = engine._confidence_matrix(candidates, user, sample_occasion, palettes, weights)
+        scalar = [
+            engine._calculate_confidence(items, user, sample_occasion, palette_score=float(palette), preference_weights=weights)
+            for items, palette in zip(candidates, palettes)
+        ]
+        np.testing.assert_allclose(batched, scalar, atol=1e-12)
@@ -0,0 +1,73 @@
+from app.core.engine import OutfitCurationEngine
+from app.core.feedback import PreferenceStore, preference_score
+from app.models.schemas import FeedbackEvent, FeedbackType
+
+
+def _store(tmp_path, **kwargs):
+    return PreferenceStore(
+        log_path=str(tmp_path / "events.jsonl"),
+        snapshot_path=str(tmp_path / "weights.json"),
+        **kwargs
+    )
+
+
+def test_events_update_weights_incrementally(tmp_path, sample_inventory):
+    store = _store(tmp_path, learning_rate=0.5)
+    store.record(FeedbackEvent(user_id="u1", event=FeedbackType.LIKED, items=[sample_inventory[0]]))
+    store.record(FeedbackEvent(user_id="u1", event=FeedbackType.DISLIKED, items=[sample_inventory[2]]))
+
+    weights = store.weights("u1")
+    assert weights["color:blue"] == 0.5
+    assert weights["color:black"] == -0.5
+    assert preference_score([sample_inventory[0]], weights) > 0
+    assert store.weights("someone-else") == {}
+
+
+def test_restart_restores_snapshot_and_log_tail(tmp_path, sample_inventory):
+    store = _store(tmp_path, snapshot_every=2)
+    for item in sample_inventory:
+        store.record(FeedbackEvent(user_id="u1", event=FeedbackType.WORN, items=[item]))
+
+    restored = _store(tmp_path, snapshot_every=2)
+
+    assert restored.weights("u1") == store.weights("u1")
+    assert restored.stats()['events'] == len(sample_inventory)
+    assert restored.stats()['since_snapshot'] == len(sample_inventory) % 2
+
+
+def test_torn_log_line_is_truncated_before_appending(tmp_path, sample_inventory):
+    store = _store(tmp_path, snapshot_every=2)
+    store.record(FeedbackEvent(user_id="u1", event=FeedbackType.LIKED, items=[sample_inventory[0]]))
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"user_id": "u1", "event": "li')
+
+    restarted = _store(tmp_path, snapshot_every=2)
+    restarted.record(FeedbackEvent(user_id="u1", event=FeedbackType.LIKED, items=[sample_inventory[1]]))
+    restored = _store(tmp_path, snapshot_every=2)
+
+    assert restored.weights("u1") == restarted.weights("u1")
+    assert restored.stats()['events'] == 2
+
+
+def test_malformed_log_line_is_skipped_on_load(tmp_path, sample_inventory):
+    store = _store(tmp_path)
+    store.record(FeedbackEvent(user_id="u1", event=FeedbackType.LIKED, items=[sample_inventory[0]]))
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"bad json\n')
+    store.record(FeedbackEvent(user_id="u1", event=FeedbackType.LIKED, items=[sample_inventory[1]]))
+
+    restored = _store(tmp_path)
+    assert restored.weights("u1") == store.weights("u1")
+    assert restored.stats()['events'] == 2
+
+
+def test_feedback_raises_confidence(tmp_path, sample_user, sample_inventory, sample_occasion):
+    store = _store(tmp_path)
+    engine = OutfitCurationEngine(preference_store=store)
+    outfit = sample_inventory[1:2]
+    before = engine._score_candidates([outfit], sample_user, sample_occasion)[0]
+
+    for _ in range(5):
+        store.record(FeedbackEvent(user_id=sample_user.user_id, event=FeedbackType.LIKED, items=outfit))
+
+    assert engine._score_candidates([outfit], sample_user, sample_occasion)[0] > before
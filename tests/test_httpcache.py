@@ -0,0 +1,115 @@
+import re
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api import endpoints
+from app.core.compression import CompressionMiddleware, negotiate
+from app.core.httpcache import IMMUTABLE, HashedStaticFiles, parse_if_none_match
+
+
+def _body(user, occasion, inventory, **extra):
+    return {
+        "user_info": user.model_dump(mode="json"),
+        "occasion": occasion.model_dump(mode="json"),
+        "inventory": [item.model_dump(mode="json") for item in inventory],
+        "max_outfits": 2,
+        **extra,
+    }
+
+
+def test_recommendation_etag_revalidates_without_engine(monkeypatch, sample_user, sample_occasion, sample_inventory):
+    calls = []
+    run = endpoints._run_recommendation_with_constraints
+    monkeypatch.setattr(endpoints, "_run_recommendation_with_constraints", lambda *args: calls.append(1) or run(*args))
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    client = TestClient(app)
+    body = _body(sample_user, sample_occasion, sample_inventory)
+
+    first = client.post("/api/v1/recommend-outfits", json=body)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and re.fullmatch(r'"\d+\.[0-9a-f]{32}"', etag)
+
+    again = client.post("/api/v1/recommend-outfits", json=body, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag and again.content == b""
+    assert len(calls) == 1
+
+    # A changed request, or a tag for another request, runs the engine
+    other = dict(body, max_outfits=1)
+    assert client.post("/api/v1/recommend-outfits", json=other, headers={"If-None-Match": etag}).status_code == 200
+    assert len(calls) == 2
+
+
+def test_same_seed_same_outfits(sample_user, sample_occasion, sample_inventory):
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    client = TestClient(app)
+    body = _body(sample_user, sample_occasion, sample_inventory, seed=7)
+
+    responses = [client.post("/api/v1/recommend-outfits", json=body) for _ in range(2)]
+    ids = [[[item["item_id"] for item in outfit["items"]] for outfit in r.json()] for r in responses]
+    assert ids[0] == ids[1] and responses[0].headers["ETag"] == responses[1].headers["ETag"]
+    assert responses[0].headers["ETag"].startswith('"7.')
+
+    # Any int is a valid seed, negative ones included
+    negative = dict(body, seed=-7)
+    etag = client.post("/api/v1/recommend-outfits", json=negative).headers["ETag"]
+    assert client.post("/api/v1/recommend-outfits", json=negative, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_compression_negotiation_and_threshold():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    big = [{"item_id": f"item{i}", "name": "Blue Dress Shirt"} for i in range(200)]
+
+    @app.get("/big")
+    def get_big():
+        return JSONResponse(big, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def get_small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def get_stream():
+        return StreamingResponse((f"{i}\n".encode() * 50 for i in range(3)), media_type="application/x-ndjson")
+
+    client = TestClient(app)
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip" and response.headers["ETag"] == '"abc-gzip"'
+    assert response.json() == big
+    assert int(response.headers["Content-Length"]) < len(response.content) / 5
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert streamed.headers["Content-Encoding"] == "gzip" and streamed.text.count("\n") == 150
+
+    assert negotiate("gzip;q=0, br", ["br", "gzip"]) == "br"
+    assert negotiate("gzip;q=0", ["gzip"]) is None
+    assert negotiate("*", ["gzip"]) == "gzip"
+    assert parse_if_none_match('W/"abc-gzip", "def"') == {"abc", "def"}
+
+
+def test_hashed_static_assets(tmp_path):
+    (tmp_path / "index.html").write_text('<script src="/ui/app.js"></script>')
+    (tmp_path / "app.js").write_text("new Worker('/ui/worker.js');")
+    (tmp_path / "worker.js").write_text("// v1")
+    app = FastAPI()
+    app.mount("/ui", HashedStaticFiles(directory=str(tmp_path), prefix="/ui"))
+    client = TestClient(app)
+
+    index = client.get("/ui/")
+    assert index.headers["Cache-Control"] == "no-cache"
+    script = re.search(r'/ui/app\.[0-9a-f]{10}\.js', index.text).group(0)
+    asset = client.get(script)
+    assert asset.headers["Cache-Control"] == IMMUTABLE
+    assert re.search(r"/ui/worker\.[0-9a-f]{10}\.js", asset.text)
+    assert client.get(script, headers={"If-None-Match": asset.headers["ETag"]}).status_code == 304
+    assert client.get("/ui/app.js").headers["Cache-Control"] == "no-cache"
+
+    # Changing a leaf renames everything that references it
+    (tmp_path / "worker.js").write_text("// v2")
+    assert re.search(r'/ui/app\.[0-9a-f]{10}\.js', client.get("/ui/").text).group(0) != script
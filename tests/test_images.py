@@ -0,0 +1,49 @@
+import pytest
+
+from app.core.images import ImageIngestor, apply_to_items, dominant_colors, nearest_color_name
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _photo(path, garment_rgb, background=(250, 250, 250)):
+    image = Image.new("RGB", (200, 240), background)
+    image.paste(Image.new("RGB", (120, 160), garment_rgb), (40, 40))
+    image.save(path)
+    return str(path)
+
+
+def test_color_naming_and_background_removal():
+    import numpy as np
+
+    assert nearest_color_name((18, 28, 85)) == "navy"
+    assert nearest_color_name((210, 25, 35)) == "red"
+
+    pixels = np.full((64, 64, 3), 250, dtype=np.uint8)
+    pixels[16:48, 16:48] = (30, 80, 200)
+    colors = dominant_colors(pixels)
+    assert [c["name"] for c in colors] == ["blue"]
+
+
+def test_ingest_caches_by_content_and_fills_colors(tmp_path, sample_inventory):
+    red = _photo(tmp_path / "top1.png", (200, 30, 30))
+    navy = _photo(tmp_path / "bottom1.png", (20, 30, 80))
+    ingestor = ImageIngestor(str(tmp_path / "cache"), str(tmp_path / "thumbs"), workers=0, thumbnail_size=64)
+
+    results = ingestor.ingest([red, navy])
+    assert {r["status"] for r in results.values()} == {"analyzed"}
+    assert results[red]["colors"][0]["name"] == "red"
+    thumb = Image.open(results[red]["thumbnail"])
+    assert max(thumb.size) == 64
+
+    # Unchanged files are skipped; a copy under a new name hits the content cache
+    copy = tmp_path / "copy.png"
+    copy.write_bytes((tmp_path / "top1.png").read_bytes())
+    again = ingestor.ingest([red, str(copy)])
+    assert again[red]["status"] == "unchanged"
+    assert again[str(copy)]["status"] == "cached"
+
+    top = sample_inventory[0].model_copy(update={"color": "mystery"})
+    bottom = sample_inventory[2]
+    filled, checked = apply_to_items([top, bottom], results, {top.item_id: red, bottom.item_id: navy})
+    assert filled.color == "red"
+    assert checked.metadata["image"]["color_matches"] == (bottom.color == "navy")
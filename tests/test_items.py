@@ -0,0 +1,75 @@
+import numpy as np
+
+from app.core.items import ItemTable, Wardrobe
+from app.core.similar import ItemEmbedder
+
+
+def _owned_by(inventory, owner):
+    return [item.model_copy(update={"item_id": f"{owner}-{item.item_id}", "is_clean": owner != "b"}) for item in inventory]
+
+
+def test_equal_garments_share_values_across_owners(sample_inventory):
+    table = ItemTable()
+    first = table.canonicalize(_owned_by(sample_inventory, "a"))
+    second = table.canonicalize(_owned_by(sample_inventory, "b"))
+
+    assert len(table) == len(sample_inventory)
+    assert table.stats()["shared"] == len(sample_inventory)
+    for a, b in zip(first, second):
+        assert a.item_id != b.item_id and a.is_clean and not b.is_clean
+        assert a.weather_suitability is b.weather_suitability and a.name is b.name
+        assert table.canonical_id(a) == table.canonical_id(b) is not None
+        assert a._garment_tags[1] is b._garment_tags[1]
+    # Already canonical items are passed through
+    assert table.canonicalize(first)[0] is first[0]
+
+
+def test_changed_copy_is_no_longer_canonical(sample_inventory):
+    table = ItemTable()
+    item = table.canonicalize(sample_inventory[:1])[0]
+    assert table.canonical_id(item.model_copy(update={"is_clean": False})) is not None
+    assert table.canonical_id(item.model_copy(update={"name": "Renamed"})) is None
+
+
+def test_wardrobe_round_trip(sample_inventory):
+    table = ItemTable()
+    wardrobe = Wardrobe.from_items(table, sample_inventory)
+    assert wardrobe.ids.dtype == np.int32 and len(wardrobe) == len(sample_inventory)
+    assert [item.model_dump() for item in wardrobe.items()] == [item.model_dump() for item in sample_inventory]
+
+
+def test_embedding_rows_computed_once_per_garment(sample_inventory, monkeypatch):
+    from app.core import similar
+
+    table = ItemTable()
+    monkeypatch.setattr(similar, "item_table", table)
+    embedder = ItemEmbedder()
+    calls = []
+    vector = embedder._vector
+    monkeypatch.setattr(embedder, "_vector", lambda item: calls.append(item.item_id) or vector(item))
+
+    first = embedder.item_matrix(table.canonicalize(_owned_by(sample_inventory, "a")))
+    second = embedder.item_matrix(table.canonicalize(_owned_by(sample_inventory, "b")))
+    np.testing.assert_array_equal(first, second)
+    assert len(calls) == len(sample_inventory)
+
+
+def test_table_is_bounded_but_keeps_wardrobe_garments(sample_inventory):
+    table = ItemTable(capacity=3)
+    wardrobe = Wardrobe.from_items(table, sample_inventory[:2])
+    renamed = [item.model_copy(update={"name": f"Garment {i}"}) for i, item in enumerate(sample_inventory * 20)]
+    first = table.canonicalize(renamed[:1])[0]
+    for start in range(0, len(renamed), 5):
+        embedded = table.canonicalize(renamed[start:start + 5])
+        table.derived("tags", table.canonical_id(embedded[-1]), lambda: ("x",))
+
+    assert len(table) == 2 + 3 and table.stats()["evicted"] == len(renamed) - 3
+    assert table.stats()["garments"] == 5 and table.stats()["pinned"] == 2
+    assert sum(len(values) for values in table._derived.values()) <= len(table)
+    assert [item.name for item in wardrobe.items()] == [item.name for item in sample_inventory[:2]]
+    # Items carrying an evicted id are re-interned
+    assert table.canonical_id(first) is None and table.canonicalize([first])[0] is not first
+
+    del wardrobe
+    table.canonicalize(renamed[-1:])
+    assert len(table) == 3 and table.stats()["pinned"] == 0
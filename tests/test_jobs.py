@@ -0,0 +1,116 @@
+import json
+import os
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import endpoints
+from app.core.jobs import FINISHED, JobManager
+from app.models.schemas import JobStatus
+
+
+def _wait(manager, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while manager.info(job_id).status not in FINISHED:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return manager.info(job_id)
+
+
+def _double(record):
+    if record["n"] < 0:
+        raise ValueError("negative")
+    return {"value": record["n"] * 2}
+
+
+def test_job_runs_records_and_pages_results(tmp_path):
+    manager = JobManager(str(tmp_path), _double, workers=2)
+    job = manager.submit([{"n": n} for n in range(5)] + [{"n": -1}])
+    info = _wait(manager, job.job_id)
+    manager.stop()
+
+    assert info.status is JobStatus.COMPLETED
+    assert (info.total, info.completed, info.failed) == (6, 6, 1)
+    page, _ = manager.results(job.job_id, offset=2, limit=3)
+    assert [r["value"] for r in page] == [4, 6, 8]
+    rest, _ = manager.results(job.job_id, offset=5)
+    assert rest[0]["index"] == 5 and "negative" in rest[0]["error"]
+    streamed = [json.loads(line) for line in manager.stream(job.job_id)]
+    assert [r["index"] for r in streamed] == list(range(6))
+
+
+def test_job_resumes_from_checkpoint_after_restart(tmp_path):
+    input_path = tmp_path / "input.jsonl"
+    input_path.write_text("".join(json.dumps({"n": n}) + "\n" for n in range(6)))
+    jobs_dir = str(tmp_path / "jobs")
+
+    # A previous process queued the job and died mid-write of the third result
+    crashed = JobManager(jobs_dir, _double, workers=0, input_root=str(tmp_path))
+    job = crashed.submit(input_path="input.jsonl")
+    state_path = os.path.join(jobs_dir, job.job_id, "job.json")
+    with open(state_path) as f:
+        state = json.load(f)
+    state.update(status="running", total=6)
+    with open(state_path, "w") as f:
+        json.dump(state, f)
+    with open(os.path.join(jobs_dir, job.job_id, "results.jsonl"), "w") as f:
+        f.write('{"index": 0, "value": 0}\n{"index": 1, "value": 2}\n{"index": 2, "val')
+
+    calls = []
+    restarted = JobManager(jobs_dir, lambda record: calls.append(record["n"]) or _double(record), workers=1)
+    restarted.start()
+    info = _wait(restarted, job.job_id)
+    restarted.stop()
+
+    assert calls == [2, 3, 4, 5]
+    assert info.completed == 6 and info.status is JobStatus.COMPLETED
+    results, _ = restarted.results(job.job_id, limit=10)
+    assert [r["value"] for r in results] == [0, 2, 4, 6, 8, 10]
+
+
+def test_job_endpoints(tmp_path, monkeypatch, sample_user, sample_occasion, sample_inventory):
+    manager = JobManager(str(tmp_path), endpoints._run_job_record, workers=1)
+    monkeypatch.setattr(endpoints, "jobs", manager)
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    client = TestClient(app)
+    request = {
+        "user_info": sample_user.model_dump(mode="json"),
+        "occasion": sample_occasion.model_dump(mode="json"),
+        "inventory": [item.model_dump(mode="json") for item in sample_inventory],
+        "max_outfits": 2,
+    }
+
+    response = client.post("/api/v1/jobs", json={"requests": [request, request]})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    _wait(manager, job_id)
+
+    status_response = client.get(f"/api/v1/jobs/{job_id}")
+    assert status_response.json()["status"] == "completed"
+    page = client.get(f"/api/v1/jobs/{job_id}/results", params={"limit": 1}).json()
+    assert len(page["results"]) == 1 and page["results"][0]["outfits"]
+    assert page["next_offset"] == 1
+    last = client.get(f"/api/v1/jobs/{job_id}/results", params={"offset": 1}).json()
+    assert last["next_offset"] is None
+    stream = client.get(f"/api/v1/jobs/{job_id}/results/stream")
+    assert len(stream.text.splitlines()) == 2
+
+    assert client.get("/api/v1/jobs/missing").status_code == 404
+    assert client.post("/api/v1/jobs", json={}).status_code == 422
+    manager.stop()
+
+
+def test_input_path_needs_a_dedicated_root(tmp_path):
+    (tmp_path / "inputs").mkdir()
+    (tmp_path / "inputs" / "batch.jsonl").write_text(json.dumps({"n": 1}) + "\n")
+    (tmp_path / "feedback_events.jsonl").write_text("{}\n")
+
+    with pytest.raises(ValueError, match="disabled"):
+        JobManager(str(tmp_path / "jobs"), _double, workers=0).submit(input_path=str(tmp_path / "inputs" / "batch.jsonl"))
+    manager = JobManager(str(tmp_path / "jobs"), _double, workers=0, input_root=str(tmp_path / "inputs"))
+    assert manager.submit(input_path="batch.jsonl").total is None
+    for escape in ("../feedback_events.jsonl", str(tmp_path / "feedback_events.jsonl")):
+        with pytest.raises(ValueError, match="must be under"):
+            manager.submit(input_path=escape)
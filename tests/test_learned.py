@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.core.engine import OutfitCurationEngine
+from app.core.learned import LearnedScorer, OutfitFeatureExtractor
+
+
+def test_transform_batches_candidates(sample_user, sample_occasion, sample_inventory):
+    extractor = OutfitFeatureExtractor(dim=64)
+    candidates = [sample_inventory[:3], sample_inventory[1:4], [sample_inventory[0]]]
+
+    features = extractor.transform(candidates, sample_user, sample_occasion)
+
+    assert features.shape == (3, extractor.n_features)
+    assert np.allclose(features[0], extractor.transform([sample_inventory[:3]], sample_user, sample_occasion)[0])
+
+
+def test_engine_blends_learned_scores(tmp_path, sample_user, sample_occasion, sample_inventory):
+    extractor = OutfitFeatureExtractor(dim=64)
+    scorer = LearnedScorer(weights=np.zeros(extractor.n_features), bias=0.0, dim=64)
+    path = tmp_path / "scorer.npz"
+    scorer.save(str(path))
+
+    engine = OutfitCurationEngine(learned_scorer=LearnedScorer.load(str(path)), learned_blend=1.0)
+    outfits = engine.generate_outfits(sample_inventory, sample_user, sample_occasion, max_outfits=2)
+
+    # A zero model predicts 0.5 for every outfit
+    assert outfits and all(o.confidence_score == 0.5 for o in outfits)
+
+
+def test_train_scorer_cli(tmp_path, sample_user, sample_occasion, sample_inventory):
+    pytest.importorskip("sklearn")
+    from app.core.train_scorer import main
+
+    log = tmp_path / "outfits.jsonl"
+    with open(log, "w") as f:
+        for i in range(20):
+            items = sample_inventory[:3] if i % 2 else sample_inventory[2:]
+            f.write(json.dumps({
+                "items": [item.model_dump(mode="json") for item in items],
+                "occasion": sample_occasion.model_dump(mode="json"),
+                "user_info": sample_user.model_dump(mode="json"),
+                "event": "liked" if i % 2 else "skipped",
+            }) + "\n")
+
+    out = tmp_path / "model.npz"
+    main([str(log), "--out", str(out), "--dim", "64"])
+
+    scorer = LearnedScorer.load(str(out))
+    scores = scorer.score([sample_inventory[:3], sample_inventory[2:]], sample_user, sample_occasion)
+    assert scores[0] > scores[1]
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import router
+from app.core.engine import OutfitCurationEngine
+from app.core.packing import PackingOptimizer
+from app.models.schemas import ClothingItem, ClothingType, OccasionInfo, OccasionType, WeatherType
+
+MONDAY = date(2024, 1, 1)
+
+
+def _item(item_id, item_type, color, style):
+    return ClothingItem(
+        item_id=item_id,
+        item_type=item_type,
+        name=item_id,
+        color=color,
+        material="cotton",
+        size="M",
+        style=style,
+        weather_suitability=[WeatherType.MILD],
+        occasion_suitability=[OccasionType.CASUAL]
+    )
+
+
+def test_packing_covers_every_day_with_few_items(sample_inventory, sample_user, sample_occasion):
+    itinerary = [(MONDAY + timedelta(days=d), sample_occasion) for d in range(5)]
+    result = PackingOptimizer(OutfitCurationEngine()).optimize(sample_inventory, sample_user, itinerary)
+
+    packed = {item.item_id for item in result.items}
+    assert len(packed) == 3  # one top, the trousers and the shoes dress every day
+    assert not result.uncovered
+    for outfit in result.outfits:
+        assert outfit is not None
+        assert {item.item_id for item in outfit.items} <= packed
+        assert {item.item_type for item in outfit.items} == {ClothingType.TOP, ClothingType.BOTTOM, ClothingType.SHOES}
+
+
+def test_packing_repairs_clashing_cover_and_drops_redundant_items(sample_user):
+    # The cover alone picks the formal top, which clashes with the only bottom
+    inventory = [
+        _item("t1", ClothingType.TOP, "white", ["casual"]),
+        _item("t2", ClothingType.TOP, "white", ["formal"]),
+        _item("b1", ClothingType.BOTTOM, "blue", ["casual"]),
+    ]
+    occasion = OccasionInfo(occasion_type=OccasionType.CASUAL, weather=WeatherType.MILD, time_of_day="day")
+    result = PackingOptimizer(OutfitCurationEngine()).optimize(
+        inventory, sample_user, [(MONDAY, occasion), (MONDAY + timedelta(days=1), occasion)]
+    )
+
+    assert result.greedy_size == 2
+    assert sorted(item.item_id for item in result.items) == ["b1", "t1"]
+    assert all(outfit is not None for outfit in result.outfits)
+
+
+def test_pack_endpoint(sample_inventory, sample_user, sample_occasion):
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+    body = {
+        "user_info": sample_user.model_dump(mode="json"),
+        "inventory": [item.model_dump(mode="json") for item in sample_inventory],
+        "itinerary": [
+            {"day": (MONDAY + timedelta(days=d)).isoformat(), "occasion": sample_occasion.model_dump(mode="json")}
+            for d in range(3)
+        ],
+        "time_limit_ms": 500,
+    }
+    response = client.post("/api/v1/pack", json=body)
+    assert response.status_code == 200
+    packing = response.json()
+    packed = {item["item_id"] for item in packing["items"]}
+    assert len(packed) <= packing["greedy_size"]
+    assert [day["day"] for day in packing["days"]] == [entry["day"] for entry in body["itinerary"]]
+    for day in packing["days"]:
+        assert {item["item_id"] for item in day["outfit"]["items"]} <= packed
@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import router
+from app.core.engine import OutfitCurationEngine
+from app.core.planner import WeeklyPlanner
+
+MONDAY = date(2024, 1, 1)
+
+
+def test_plan_respects_reuse_limits_and_laundry_gaps(sample_inventory, sample_user, sample_occasion):
+    schedule = [(MONDAY + timedelta(days=d), sample_occasion) for d in range(7)]
+    result = WeeklyPlanner(OutfitCurationEngine()).plan(
+        sample_inventory, sample_user, schedule, max_uses_per_item=3, laundry_gap_days=1
+    )
+
+    # One pair of trousers and one pair of shoes, worn every other day at most 3 times
+    assert result.planned == 3
+    worn_on = {}
+    for (day, _), outfit in zip(schedule, result.outfits):
+        for item in outfit.items if outfit else ():
+            worn_on.setdefault(item.item_id, []).append(day)
+    for days in worn_on.values():
+        assert len(days) <= 3
+        assert all((b - a).days >= 2 for a, b in zip(days, days[1:]))
+
+
+def test_plan_week_endpoint(sample_inventory, sample_user, sample_occasion):
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+    body = {
+        "user_info": sample_user.model_dump(mode="json"),
+        "inventory": [item.model_dump(mode="json") for item in sample_inventory],
+        "schedule": [
+            {"day": (MONDAY + timedelta(days=d)).isoformat(), "occasion": sample_occasion.model_dump(mode="json")}
+            for d in range(3)
+        ],
+        "max_uses_per_item": 2,
+        "laundry_gap_days": 0,
+    }
+    response = client.post("/api/v1/plan-week", json=body)
+    assert response.status_code == 200
+    plan = response.json()
+    assert plan["planned"] == 2 and plan["unplanned"] == 1
+    assert max(plan["item_uses"].values()) <= 2
+    assert [day["day"] for day in plan["days"]] == [entry["day"] for entry in body["schedule"]]
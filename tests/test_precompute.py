@@ -0,0 +1,118 @@
+from datetime import date, datetime, time, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import endpoints
+from app.core.precompute import PrecomputeScheduler, RecommendationCache, parse_window
+from app.models.schemas import OutfitRecommendationRequest, WeatherType
+
+
+def test_window_wraps_past_midnight():
+    scheduler = PrecomputeScheduler(RecommendationCache(), lambda r: [], parse_window("23:00-04:30"))
+    assert parse_window("01:00-05:00") == (time(1), time(5))
+    assert scheduler.in_window(datetime(2024, 1, 1, 23, 30))
+    assert scheduler.in_window(datetime(2024, 1, 2, 4, 0))
+    assert not scheduler.in_window(datetime(2024, 1, 2, 8, 0))
+
+
+def test_precompute_fills_cache_stamped_with_inventory(sample_user, sample_occasion, sample_inventory):
+    cache = RecommendationCache()
+    calls = []
+
+    def compute(request):
+        calls.append(request.occasion.weather)
+        return []
+
+    scheduler = PrecomputeScheduler(cache, compute, parse_window("01:00-05:00"), horizon_days=1)
+    template = OutfitRecommendationRequest(user_info=sample_user, occasion=sample_occasion, inventory=sample_inventory)
+    today = date(2024, 1, 10)
+    cool = sample_occasion.model_copy(update={"weather": WeatherType.COOL})
+    scheduler.register(template, [
+        (today - timedelta(days=1), sample_occasion),  # already past
+        (today, sample_occasion),
+        (today + timedelta(days=1), cool),
+        (today + timedelta(days=5), sample_occasion),  # beyond the horizon
+    ])
+
+    assert scheduler.run_once(datetime(2024, 1, 10, 2, 0)) == 2
+    assert scheduler.run_once(datetime(2024, 1, 10, 3, 0)) == 0  # still fresh
+    assert sorted(calls) == [WeatherType.COOL, WeatherType.MILD]
+    assert scheduler.stats()["entries"] == 3
+    assert cache.lookup(template) == []
+
+    worn = sample_inventory[0].model_copy(update={"is_clean": False})
+    changed = template.model_copy(update={"inventory": [worn] + sample_inventory[1:]})
+    assert cache.lookup(changed) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_recommend_serves_precomputed_until_inventory_changes(
+    tmp_path, monkeypatch, sample_user, sample_occasion, sample_inventory
+):
+    cache = RecommendationCache()
+    scheduler = PrecomputeScheduler(
+        cache, endpoints._run_recommendation, parse_window("01:00-05:00"),
+        registry_path=str(tmp_path / "registry.json")
+    )
+    monkeypatch.setattr(endpoints, "recommendations", cache)
+    monkeypatch.setattr(endpoints, "precompute", scheduler)
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    client = TestClient(app)
+
+    user = sample_user.model_dump(mode="json")
+    occasion = sample_occasion.model_dump(mode="json")
+    inventory = [item.model_dump(mode="json") for item in sample_inventory]
+    registration = {
+        "user_info": user,
+        "inventory": inventory,
+        "schedule": [{"day": date.today().isoformat(), "occasion": occasion}],
+        "max_outfits": 2,
+    }
+    assert client.post("/api/v1/precompute/schedule", json=registration).json()["entries"] == 1
+    assert client.post("/api/v1/precompute/run").json() == {"computed": 1}
+    assert (tmp_path / "registry.json").exists()
+
+    body = {"user_info": user, "occasion": occasion, "inventory": inventory, "max_outfits": 2}
+    response = client.post("/api/v1/recommend-outfits", json=body)
+    assert response.status_code == 200 and response.headers.get("X-Precomputed") == "true"
+
+    body["inventory"] = inventory[:-1]
+    response = client.post("/api/v1/recommend-outfits", json=body)
+    assert response.status_code == 200 and "X-Precomputed" not in response.headers
+
+
+def test_feedback_after_precompute_forces_a_live_run(
+    tmp_path, monkeypatch, sample_user, sample_occasion, sample_inventory
+):
+    from app.core.feedback import PreferenceStore
+    from app.core.httpcache import state_digest
+
+    store = PreferenceStore(str(tmp_path / "events.jsonl"), str(tmp_path / "weights.json"))
+    cache = RecommendationCache(scoring_state=lambda user_id: state_digest(store.weights(user_id)))
+    scheduler = PrecomputeScheduler(cache, endpoints._run_recommendation, parse_window("01:00-05:00"))
+    monkeypatch.setattr(endpoints, "preferences", store)
+    monkeypatch.setattr(endpoints, "recommendations", cache)
+    monkeypatch.setattr(endpoints, "precompute", scheduler)
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    client = TestClient(app)
+
+    user = sample_user.model_dump(mode="json")
+    occasion = sample_occasion.model_dump(mode="json")
+    inventory = [item.model_dump(mode="json") for item in sample_inventory]
+    client.post("/api/v1/precompute/schedule", json={
+        "user_info": user, "inventory": inventory, "max_outfits": 2,
+        "schedule": [{"day": date.today().isoformat(), "occasion": occasion}],
+    })
+    assert client.post("/api/v1/precompute/run").json() == {"computed": 1}
+    body = {"user_info": user, "occasion": occasion, "inventory": inventory, "max_outfits": 2}
+    assert client.post("/api/v1/recommend-outfits", json=body).headers.get("X-Precomputed") == "true"
+
+    feedback = {"user_id": sample_user.user_id, "event": "liked", "items": inventory[:1]}
+    assert client.post("/api/v1/feedback", json=feedback).status_code == 202
+    response = client.post("/api/v1/recommend-outfits", json=body)
+    assert response.status_code == 200 and "X-Precomputed" not in response.headers
+    # The next pass recomputes the entry with the new weights
+    assert client.post("/api/v1/precompute/run").json() == {"computed": 1}
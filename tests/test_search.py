@@ -0,0 +1,75 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import router
+from app.core.search import InvalidQuery, SearchIndex
+
+
+def _ids(hits):
+    return [item.item_id for item, _ in hits]
+
+
+def test_ranked_boolean_field_and_prefix_queries(sample_inventory):
+    index = SearchIndex(sample_inventory)
+    first = sample_inventory[0]
+    word = first.name.split()[-1].lower()
+
+    hits, total = index.search(word)
+    assert total >= 1 and first.item_id in _ids(hits)
+
+    # Prefix and field-restricted forms find the same item
+    assert first.item_id in _ids(index.search(word[:3] + '*')[0])
+    assert first.item_id in _ids(index.search(f"color:{first.color}")[0])
+
+    # Negation filters, OR widens, AND narrows
+    assert first.item_id not in _ids(index.search(f"{word} -{word}")[0])
+    either = index.search(f"color:{first.color} OR color:{sample_inventory[1].color}")[1]
+    both = index.search(f"color:{first.color} AND color:{sample_inventory[1].color}")[1]
+    assert either >= max(index.search(f"color:{first.color}")[1], both)
+
+    # Items matching more words rank first
+    hits, _ = index.search(f"{word} {first.material}")
+    assert hits[0][0].item_id == first.item_id
+    assert hits == sorted(hits, key=lambda hit: -hit[1])
+
+    with pytest.raises(InvalidQuery):
+        index.search("(navy")
+    with pytest.raises(InvalidQuery):
+        index.search("size:m")
+
+
+def test_search_endpoint_pages(sample_inventory):
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+    inventory = [item.model_dump(mode="json") for item in sample_inventory]
+
+    body = {"inventory": inventory, "query": "NOT zzz", "limit": 2}
+    first = client.post("/api/v1/search", json=body).json()
+    assert first["total"] == len(sample_inventory)
+    assert len(first["hits"]) == 2 and first["next_offset"] == 2
+
+    rest = client.post("/api/v1/search", json={**body, "offset": 2, "limit": 100}).json()
+    seen = [hit["item"]["item_id"] for hit in first["hits"] + rest["hits"]]
+    assert sorted(seen) == sorted(item.item_id for item in sample_inventory)
+    assert rest["next_offset"] is None
+
+    assert client.post("/api/v1/search", json={**body, "query": "AND"}).status_code == 422
+
+
+def test_versioned_search_reuses_the_index_without_hashing(monkeypatch, sample_inventory):
+    from app.api import endpoints
+    from app.core import fingerprint
+    from app.core.cache import LRUCache
+
+    monkeypatch.setattr(endpoints, "search_indexes", LRUCache(maxsize=4))
+    monkeypatch.setattr(fingerprint, "_INVENTORY", None)
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+    body = {"inventory": [item.model_dump(mode="json") for item in sample_inventory], "inventory_version": "v1"}
+
+    for query in ("blue", "black"):
+        assert client.post("/api/v1/search", json={**body, "query": query}).json()["total"] >= 1
+    assert len(endpoints.search_indexes) == 1
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import endpoints
+from app.core.serialization import JSON, MSGPACK, response_media_type
+
+msgpack = pytest.importorskip("msgpack")
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def _body(user, occasion, inventory, **extra):
+    return {
+        "user_info": user.model_dump(mode="json"),
+        "occasion": occasion.model_dump(mode="json"),
+        "inventory": [item.model_dump(mode="json") for item in inventory],
+        **extra,
+    }
+
+
+def test_msgpack_request_and_response(sample_user, sample_occasion, sample_inventory):
+    client = _client()
+    body = _body(sample_user, sample_occasion, sample_inventory, max_outfits=2, seed=3)
+
+    plain = client.post("/api/v1/recommend-outfits", json=body)
+    packed = client.post(
+        "/api/v1/recommend-outfits",
+        content=msgpack.packb(body),
+        headers={"Content-Type": MSGPACK, "Accept": MSGPACK},
+    )
+    assert plain.status_code == packed.status_code == 200
+    assert plain.headers["Content-Type"] == JSON and packed.headers["Content-Type"] == MSGPACK
+    assert packed.headers["Vary"] == "Accept" and packed.headers["ETag"] == plain.headers["ETag"]
+    # created_at is stamped per run; everything else is the same data
+    strip = lambda outfits: [{k: v for k, v in o.items() if k != "created_at"} for o in outfits]
+    assert strip(msgpack.unpackb(packed.content)) == strip(plain.json())
+
+
+def test_embedded_body_and_validation_errors(sample_user, sample_occasion, sample_inventory):
+    client = _client()
+    body = _body(sample_user, sample_occasion, sample_inventory)
+
+    plain = client.post("/api/v1/filter-inventory", json=body)
+    packed = client.post("/api/v1/filter-inventory", content=msgpack.packb(body), headers={"Content-Type": MSGPACK})
+    assert plain.status_code == packed.status_code == 200 and packed.json() == plain.json()
+
+    del body["occasion"]["occasion_type"]
+    invalid = client.post("/api/v1/filter-inventory", content=msgpack.packb(body), headers={"Content-Type": MSGPACK})
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"][:2] == ["body", "occasion"]
+    garbage = client.post("/api/v1/recommend-outfits", content=b"{not json", headers={"Content-Type": JSON})
+    assert garbage.status_code == 422
+
+
+def test_accept_negotiation():
+    assert response_media_type(None) == JSON
+    assert response_media_type("application/msgpack") == MSGPACK
+    assert response_media_type("application/json, application/msgpack;q=0.5") == JSON
+    assert response_media_type("application/x-msgpack, */*;q=0.1") == MSGPACK
+    assert response_media_type("application/msgpack;q=0") == JSON
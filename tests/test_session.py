@@ -0,0 +1,59 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import _filter_keeping_pins, router
+from app.core.engine import OutfitCurationEngine
+from app.core.session import StylingSession
+from app.models.schemas import OutfitRecommendationRequest, SessionUpdate, WeatherType
+
+
+def _request(sample_user, sample_occasion, sample_inventory, **extra):
+    return OutfitRecommendationRequest(
+        user_info=sample_user, occasion=sample_occasion, inventory=sample_inventory, max_outfits=2, **extra
+    )
+
+
+def test_session_recomputes_only_what_a_delta_invalidates(sample_user, sample_occasion, sample_inventory):
+    session = StylingSession(
+        OutfitCurationEngine(),
+        _request(sample_user, sample_occasion, sample_inventory, exclude_item_ids=["top1"]),
+        _filter_keeping_pins
+    )
+    first = session.refresh()
+    assert first.recomputed == "filter" and first.outfits
+
+    # Restoring an item needs candidates the pool never sampled
+    restored = session.apply(SessionUpdate(restore_item_ids=["top1"]))
+    assert restored.recomputed == "generate" and restored.excluded_item_ids == []
+
+    # Dropping it again only masks the cached pool
+    dropped = session.apply(SessionUpdate(exclude_item_ids=["top1"]))
+    assert dropped.recomputed == "rerank" and dropped.outfits
+    assert all(item.item_id != "top1" for outfit in dropped.outfits for item in outfit.items)
+
+    assert session.apply(SessionUpdate(weather=WeatherType.COOL)).recomputed == "filter"
+    assert session.apply(SessionUpdate(weather=WeatherType.MILD)).recomputed == "rerank"
+    assert session.apply(SessionUpdate(max_outfits=1, diversity_weight=0.5)).recomputed == "rerank"
+    assert session.version == 6
+
+
+def test_styling_session_websocket(sample_user, sample_occasion, sample_inventory):
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+    request = _request(sample_user, sample_occasion, sample_inventory)
+    with client.websocket_connect("/api/v1/styling-session") as ws:
+        ws.send_json({"type": "update", "weather": "rainy"})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "start", "request": request.model_dump(mode="json")})
+        started = ws.receive_json()
+        assert started["type"] == "outfits" and started["version"] == 1
+
+        ws.send_json({"type": "update", "exclude_item_ids": ["nope"]})
+        assert "nope" in ws.receive_json()["detail"]
+
+        ws.send_json({"type": "update", "exclude_item_ids": ["top2"]})
+        update = ws.receive_json()
+        assert update["version"] == 2 and update["excluded_item_ids"] == ["top2"]
+        assert all(item["item_id"] != "top2" for outfit in update["outfits"] for item in outfit["items"])
@@ -0,0 +1,70 @@
+import json
+
+from app.core.shadow import ShadowRunner, compare_outfits, summarize_report
+from app.core.engine import OutfitCurationEngine
+from app.models.schemas import OutfitRecommendationRequest, Outfit, OccasionType
+
+
+def _outfit(outfit_id, item_ids, score, inventory):
+    by_id = {item.item_id: item for item in inventory}
+    return Outfit(
+        outfit_id=outfit_id,
+        items=[by_id[i] for i in item_ids],
+        occasion=OccasionType.BUSINESS_CASUAL,
+        confidence_score=score
+    )
+
+
+def test_compare_outfits_overlap_and_drift(sample_inventory):
+    primary = [
+        _outfit("a", ["top1", "bottom1", "shoes1"], 0.8, sample_inventory),
+        _outfit("b", ["top2", "bottom1", "shoes1"], 0.6, sample_inventory),
+    ]
+    candidate = [_outfit("c", ["top1", "bottom1", "shoes1"], 0.9, sample_inventory)]
+
+    result = compare_outfits(primary, candidate)
+
+    assert result['combo_overlap'] == 0.5
+    assert abs(result['confidence_drift'] - 0.2) < 1e-9
+
+
+def test_shadow_runner_writes_report(tmp_path, sample_user, sample_occasion, sample_inventory):
+    report = tmp_path / "shadow.jsonl"
+    runner = ShadowRunner(OutfitCurationEngine(), fraction=1.0, report_path=str(report))
+    request = OutfitRecommendationRequest(
+        user_info=sample_user, occasion=sample_occasion, inventory=sample_inventory, max_outfits=2
+    )
+
+    assert runner.maybe_submit(request, [], 0.01)
+    runner.shutdown()
+
+    record = json.loads(report.read_text().strip())
+    assert 'latency_delta_ms' in record and 'combo_overlap' in record
+    assert runner.stats()['completed'] == 1
+    assert summarize_report(str(report))['comparisons'] == 1
+
+
+def test_identical_engines_fully_overlap(tmp_path, sample_user, sample_occasion, sample_inventory):
+    report = tmp_path / "shadow.jsonl"
+    primary = OutfitCurationEngine()
+    runner = ShadowRunner(OutfitCurationEngine(), fraction=1.0, report_path=str(report))
+    request = OutfitRecommendationRequest(
+        user_info=sample_user, occasion=sample_occasion, inventory=sample_inventory, max_outfits=3
+    )
+    constraints = {
+        "include_item_ids": ["top1"],
+        "exclude_item_ids": ["bottom2"],
+        "exclude_worn_within_days": None,
+        "diversity_weight": 0.5,
+        "seed": 11,
+    }
+    filtered = primary.filter_inventory(request.inventory, request.user_info, request.occasion)
+    outfits = primary.generate_outfits(
+        filtered, request.user_info, request.occasion, request.max_outfits, request.consider_previous_outfits, **constraints
+    )
+
+    assert outfits and runner.maybe_submit(request, outfits, 0.01, constraints)
+    runner.shutdown()
+
+    record = json.loads(report.read_text().strip())
+    assert record['combo_overlap'] == 1.0 and record['confidence_drift'] == 0.0
@@ -0,0 +1,79 @@
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import router
+from app.core.engine import OutfitCurationEngine
+from app.core.similar import LSHIndex, SimilarItemsIndex
+
+
+def test_lsh_matches_brute_force_with_incremental_inserts():
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((50, 64))
+    vectors = centers[rng.integers(0, 50, 4000)] + 0.3 * rng.standard_normal((4000, 64))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    index = LSHIndex(64, n_tables=16, n_bits=8)
+    for chunk in np.array_split(vectors, 7):
+        index.add(chunk)
+    assert index.size == len(vectors)
+
+    recall = []
+    for query in vectors[:50]:
+        approx, _ = index.query(query, 10)
+        exact, _ = index.brute_force(query, 10)
+        recall.append(len(set(approx.tolist()) & set(exact.tolist())) / 10)
+    assert np.mean(recall) >= 0.9
+
+
+def test_similar_items_prefers_same_type_and_attributes(sample_inventory):
+    index = SimilarItemsIndex(sample_inventory[:-1])
+    shirt = sample_inventory[0]
+    twin = shirt.model_copy(update={'item_id': 'top_twin', 'size': 'L'})
+    assert index.add([twin, shirt]) == 1
+
+    matches = index.similar(shirt, k=3)
+    assert matches[0][0].item_id == 'top_twin'
+    assert all(item.item_type == shirt.item_type and item.item_id != shirt.item_id for item, _ in matches)
+    assert index.similar(shirt, k=3, predicate=lambda item: item.item_id != 'top_twin')[0][0].item_id != 'top_twin'
+
+
+def test_dirty_pins_are_substituted(sample_inventory):
+    engine = OutfitCurationEngine()
+    dirty = sample_inventory[0].model_copy(update={'is_clean': False})
+    inventory = [dirty] + sample_inventory[1:]
+
+    substitutions = engine.substitute_unavailable(inventory, inventory, [dirty.item_id])
+    substitute = substitutions[dirty.item_id]
+    assert substitute.item_type == dirty.item_type and substitute.is_clean
+
+    # Nothing to do when pins are clean or the only candidates are excluded
+    assert engine.substitute_unavailable(sample_inventory, sample_inventory, [dirty.item_id]) == {}
+    others = [item.item_id for item in inventory if item.item_type == dirty.item_type and item is not dirty]
+    assert engine.substitute_unavailable(inventory, inventory, [dirty.item_id], others) == {}
+
+
+def test_similar_items_endpoint(sample_inventory):
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+    inventory = [item.model_dump(mode="json") for item in sample_inventory]
+
+    response = client.post("/api/v1/similar-items", json={"inventory": inventory, "item_id": "top1", "k": 2})
+    assert response.status_code == 200
+    similar = response.json()["similar"]
+    assert 0 < len(similar) <= 2 and all(hit["item"]["item_type"] == "top" for hit in similar)
+
+    missing = client.post("/api/v1/similar-items", json={"inventory": inventory, "item_id": "nope"})
+    assert missing.status_code == 404
+
+
+def test_inventory_version_keys_the_similarity_index(monkeypatch, sample_inventory):
+    from app.core import fingerprint
+    from app.core.engine import OutfitCurationEngine
+
+    engine = OutfitCurationEngine()
+    monkeypatch.setattr(fingerprint, "_INVENTORY", None)
+    for _ in range(2):
+        item, matches = engine.similar_items(sample_inventory, "top1", inventory_version="v1")
+    assert item.item_id == "top1" and matches and len(engine._similar_indexes) == 1
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("same-key", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    stats = flight.stats()
+    assert stats['executions'] == 1
+    assert stats['coalesced'] == 4
+    assert stats['inflight_keys'] == 0
+
+
+def test_timeout_releases_key():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def fast():
+        return "ok"
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.gather(flight.do("k", slow, timeout=0.01), flight.do("k", slow, timeout=0.01))
+        return await flight.do("k", fast)
+
+    assert asyncio.run(run()) == "ok"
+    assert flight.stats()['timeouts'] == 1
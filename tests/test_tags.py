@@ -0,0 +1,37 @@
+from app.core.tags import HEAVY_OUTERWEAR, RAIN_GEAR, SHORT_SLEEVE, SHORTS, extract_tags, garment_tags
+from app.core.engine import OutfitCurationEngine
+from app.models.schemas import ClothingType, WeatherType
+
+
+def test_tags_match_whole_words_and_phrases():
+    assert extract_tags("Short Sleeve Shirt") == {SHORT_SLEEVE}
+    assert extract_tags("White T-Shirt") == {SHORT_SLEEVE}
+    assert extract_tags("Denim Shorts") == {SHORTS}
+    assert extract_tags("Rain Jacket") == {RAIN_GEAR}
+    assert extract_tags("Wool Overcoat") == {HEAVY_OUTERWEAR}
+    assert extract_tags("Steel-Toe Boots") == frozenset()
+
+
+def test_compound_words_keep_their_tags():
+    for name in ("Navy Peacoat", "Trenchcoat", "Wool Topcoat", "Tweed Sportcoat", "Leather Jackets"):
+        assert extract_tags(name) == {HEAVY_OUTERWEAR}, name
+    for name in ("Rainboots", "Yellow Rainjacket", "Raincoats"):
+        assert extract_tags(name) == {RAIN_GEAR}, name
+    assert extract_tags("Rainbow Sweater") == frozenset()
+    assert extract_tags("Wool Waistcoat") == frozenset()
+
+
+def test_weather_rules_use_tags(sample_inventory):
+    engine = OutfitCurationEngine()
+    shirt = sample_inventory[0].model_copy(update={'name': 'Short Sleeve Shirt', 'item_type': ClothingType.TOP, 'weather_suitability': [WeatherType.COLD]})
+
+    # Only bottoms named as shorts are rejected in the cold
+    assert SHORTS not in garment_tags(shirt)
+    bottom = shirt.model_copy(update={'item_type': ClothingType.BOTTOM, 'name': 'Cargo Shorts'})
+    assert not engine._is_item_weather_appropriate(bottom, 'cold')
+
+    # Tags follow a renamed copy instead of the original's pinned value
+    renamed = shirt.model_copy(update={'name': 'Oxford Shirt'})
+    assert garment_tags(renamed) == frozenset()
+    assert engine._is_item_weather_appropriate(renamed, 'cold')
+    assert not engine._is_item_weather_appropriate(shirt, 'cold')